@@ -0,0 +1,56 @@
+# benchmark.py
+import argparse
+import os
+import sys
+
+from loguru import logger
+
+from config import (
+    BENCHMARK_CORPUS_SIZE, BENCHMARK_SENSITIVE_RATIO, BENCHMARK_SEED, BENCHMARK_DIR, BENCHMARK_BASELINE_PATH,
+    BENCHMARK_TOLERANCE
+)
+from src.benchmark import BenchmarkRunner, compare_with_baseline, load_result, save_result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="训练与预测性能基准测试")
+    parser.add_argument("-n", "--size", type=int, default=BENCHMARK_CORPUS_SIZE,
+                        help=f"合成语料条数（默认 {BENCHMARK_CORPUS_SIZE}）")
+    parser.add_argument("--sensitive-ratio", type=float, default=BENCHMARK_SENSITIVE_RATIO,
+                        help=f"敏感样本占比（默认 {BENCHMARK_SENSITIVE_RATIO}）")
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help=f"随机种子（默认 {BENCHMARK_SEED}）")
+    parser.add_argument("-o", "--output", help="结果 JSON 路径，默认写入 benchmarks/ 目录并带时间戳")
+    parser.add_argument("--baseline", default=BENCHMARK_BASELINE_PATH, help="基线 JSON 路径")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为新的基线")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                        help=f"相对变化容忍度，超过即视为性能回退（默认 {BENCHMARK_TOLERANCE}）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # 基准测试期间只输出 INFO 及以上日志，避免 DEBUG 日志本身影响测量结果
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    result = BenchmarkRunner(corpus_size=args.size, sensitive_ratio=args.sensitive_ratio, seed=args.seed).run()
+    output = args.output or os.path.join(BENCHMARK_DIR, f"benchmark_{result['meta']['timestamp'].replace(':', '')}.json")
+    save_result(result, output)
+
+    if args.save_baseline:
+        save_result(result, args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        logger.warning(f"⚠️ 基线不存在，跳过对比（使用 --save-baseline 创建）: {args.baseline}")
+        return 0
+
+    regressions = compare_with_baseline(result, load_result(args.baseline), args.tolerance)
+    if regressions:
+        logger.error(f"❌ 发现 {len(regressions)} 项性能回退: {', '.join(r['metric'] for r in regressions)}")
+        return 1
+    logger.success("✅ 未发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 # config.py
 import os
-from datetime import datetime
 
 # 项目根目录
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -10,15 +9,170 @@ DATA_PATH = os.path.join(ROOT_DIR, 'data', 'sensitive_data.xlsx')
 
 GENERATE_DATA_PATH = os.path.join(ROOT_DIR, 'data', 'sensitive_data.xlsx')
 
+# 数据集格式按扩展名选择：parquet / arrow 为列式格式，读写最快；xlsx 仅为兼容旧数据保留
+DATASET_FORMATS = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+}
+
 # 模型保存目录
 MODEL_DIR = os.path.join(ROOT_DIR, 'models')
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# 本地缓存目录（分词词典缓存等，可随时删除）
+CACHE_DIR = os.path.join(ROOT_DIR, '.cache')
+
 # 最新模型路径
 LATEST_MODEL_PATH = os.path.join(MODEL_DIR, 'sensitive_classifier_latest.pkl')
 
+# 紧凑推理格式的最新模型路径（可内存映射，加载更快）
+LATEST_COMPACT_MODEL_PATH = os.path.join(MODEL_DIR, 'sensitive_classifier_latest.cmodel')
+
+# 压缩导出：最新压缩模型路径、词项裁剪阈值（类别间对数概率差异）、量化方式（float16 / int8）
+LATEST_COMPRESSED_MODEL_PATH = os.path.join(MODEL_DIR, 'sensitive_classifier_latest.min.cmodel')
+COMPRESS_PRUNE_THRESHOLD = 0.25
+COMPRESS_QUANTIZE = 'int8'
+
+
+# 模型注册表：内容寻址的模型文件与 SQLite 元数据索引；自动清理时保留的最近模型数
+REGISTRY_DIR = os.path.join(MODEL_DIR, 'registry')
+REGISTRY_KEEP = 10
+
+
+# 流式预测默认批大小
+PREDICT_BATCH_SIZE = 1000
+
+# 并行预测默认进程数与分片大小
+PREDICT_N_JOBS = os.cpu_count() or 1
+PREDICT_CHUNK_SIZE = 2000
+
+# 预测日志：逐条日志模式（off / hits / all）、逐条日志采样率、延迟统计窗口（批次数）
+PREDICT_ITEM_LOG_MODE = 'hits'
+PREDICT_LOG_SAMPLE_RATE = 1.0
+PREDICT_STATS_WINDOW = 10000
+
+# 常驻预测服务：监听地址、端口、微批次上限、合并窗口（毫秒）、工作线程数
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_MAX_BATCH_SIZE = 256
+SERVER_BATCH_WINDOW_MS = 2
+# 工作线程共享同一个解释器，分词与打分的 Python 部分受 GIL 限制，多个线程不会带来接近线性的吞吐提升；
+# 2 个线程只用于让下一个微批次的合并与当前批次的打分重叠，调大后 CPU 争用反而增加尾延迟，
+# 需要利用多核时应启动多个服务进程（离线批量场景可用 ModelPredictor.predict_parallel 多进程并行预测）
+SERVER_WORKERS = 2
+
+# 模型热更新：文件轮询间隔（秒）及切换前用于校验新模型的金丝雀样本
+MODEL_WATCH_INTERVAL = 5
+MODEL_CANARY_TEXTS = [
+    "密码是123456",
+    "今天天气真好",
+    "import os",
+    "sk-4f9c2a7e1b8d3f6a0c5e9b2d7a1f4c8e",
+]
+
+# 预测结果 LRU 缓存容量（条），0 表示关闭
+PREDICT_CACHE_SIZE = 0
+
+# 模型前的规则预过滤：JWT、sk- 等带前缀的 Token、凭据键名后的 UUID 等独特格式直接判定，其余文本交给模型
+PREDICT_RULE_FILTER = True
+
+# 快速路径：按文本统计量（长度、字符类别熵、空白占比、数字占比）提前判定明显非敏感的文本，
+# 边界在训练时由敏感样本学习并随模型文件一起保存，FAST_PATH_MARGIN 为边界放宽比例（相对取值范围）；
+# 长度边界默认不参与判定（超长的行可能夹带密钥，交给模型），FAST_PATH_LENGTH_BOUNDS = True 时启用
+PREDICT_FAST_PATH = True
+FAST_PATH_MARGIN = 0.1
+FAST_PATH_LENGTH_BOUNDS = False
+
+# TF-IDF + MultinomialNB 模型使用原生推理引擎（分词后一次 NumPy 向量化计算完成加权、归一化与打分）
+PREDICT_NATIVE_ENGINE = True
+
+# TF-IDF 分词方式：chinese 为 jieba 中英文混合分词，default 为 sklearn 默认正则分词（旧版默认）
+# 下列三项默认值相对旧版有变化，评估结果见 README「默认模型配置变更」，设回 default / 5000 / False 即恢复旧版模型
+TFIDF_TOKENIZER = 'chinese'
+# 中文片段分词结果的 LRU 缓存容量
+TOKENIZER_CACHE_SIZE = 100000
+
+# TF-IDF 词表上限（tfidf 特征模式），旧版固定为 5000
+TFIDF_MAX_FEATURES = 2000
+# 是否在 tfidf 特征模式下拼接字符级统计特征（熵、字符类别切换、base64/十六进制占比、长度分桶）及其权重，旧版无统计特征
+TEXT_STATS_FEATURES = True
+TEXT_STATS_WEIGHT = 2.0
+
+# 特征模式：tfidf 为带词表的 TfidfVectorizer；hashing 为特征哈希 + 流式 IDF，不保存词表
+FEATURE_MODE = 'tfidf'
+# hashing 模式的哈希桶数量及是否启用 IDF 加权
+HASHING_N_FEATURES = 2 ** 14
+HASHING_USE_IDF = True
+
+# 增量训练：每块行数、检查点路径及保存间隔（块数）、每块测试集比例、测试集行数上限、类别
+INCREMENTAL_CHUNK_SIZE = 50000
+INCREMENTAL_CHECKPOINT_PATH = os.path.join(MODEL_DIR, 'incremental_checkpoint.pkl')
+INCREMENTAL_CHECKPOINT_EVERY = 10
+INCREMENTAL_TEST_SIZE = 0.2
+INCREMENTAL_EVAL_MAX_ROWS = 100000
+INCREMENTAL_CLASSES = [0, 1]
+
+# 模型搜索：候选向量化配置、分类器族、交叉验证折数、并行进程数、评分方式
+SEARCH_VECTORIZER_GRID = [
+    {'analyzer': 'word', 'ngram_range': (1, 1), 'max_features': 5000},
+    {'analyzer': 'word', 'ngram_range': (1, 2), 'max_features': 5000},
+    {'analyzer': 'word', 'ngram_range': (1, 2), 'max_features': 20000},
+    {'analyzer': 'char_wb', 'ngram_range': (2, 4), 'max_features': 20000},
+    {'analyzer': 'char_wb', 'ngram_range': (2, 5), 'max_features': 50000},
+]
+SEARCH_CLASSIFIERS = ['nb', 'complement_nb', 'linear_svc', 'logistic_regression']
+SEARCH_CV_FOLDS = 3
+SEARCH_N_JOBS = os.cpu_count() or 1
+SEARCH_SCORING = 'f1'
+# 逐次减半：每轮保留比例的倒数、首轮最少样本数、进入最终评估的候选数
+SEARCH_HALVING_FACTOR = 3
+SEARCH_MIN_RESOURCES = 2000
+SEARCH_FINALISTS = 3
+# 从训练集中划出的验证集比例：排行榜指标与模型选择基于验证集，测试集只用于最终评估
+SEARCH_VALIDATION_SIZE = 0.2
+# 选择模型时要求的敏感类召回率，排行榜输出路径
+SEARCH_RECALL_TARGET = 0.9
+SEARCH_LEADERBOARD_PATH = os.path.join(MODEL_DIR, 'search_leaderboard.json')
+
+# 训练特征缓存：清洗后的数据集与训练集特征矩阵按内容哈希缓存，数据和向量化参数未变时直接复用
+FEATURE_CACHE_ENABLED = True
+FEATURE_CACHE_DIR = os.path.join(CACHE_DIR, 'features')
+
+# 性能基准：合成语料规模与构成、随机种子、批大小、单条延迟采样数、重复次数、结果目录、基线及回归容忍度
+BENCHMARK_CORPUS_SIZE = 20000
+BENCHMARK_SENSITIVE_RATIO = 0.2
+BENCHMARK_CODE_RATIO = 5 / 6
+BENCHMARK_SEED = 42
+BENCHMARK_BATCH_SIZES = [1, 16, 128, 1024]
+BENCHMARK_LATENCY_SAMPLES = 1000
+BENCHMARK_REPEATS = 3
+BENCHMARK_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+BENCHMARK_BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+BENCHMARK_TOLERANCE = 0.2
+
+# 批量数据生成（generate_data.py --rows）：敏感样本占比、非敏感样本中代码片段占比、随机种子、每批行数
+GENERATE_SENSITIVE_RATIO = 0.2
+GENERATE_CODE_RATIO = 5 / 6
+GENERATE_SEED = 42
+GENERATE_BATCH_SIZE = 1000000
+# 分片生成（generate_data.py --shard-dir）：并行进程数、分片文件格式（每个分片行数即 GENERATE_BATCH_SIZE）
+GENERATE_N_JOBS = os.cpu_count() or 1
+GENERATE_PART_FORMAT = 'parquet'
+# 批量生成写出时跨批次外部洗牌的内存上限（行）：超过时先按行随机分桶落盘，再逐桶打乱写出
+GENERATE_SHUFFLE_BUFFER_ROWS = 2000000
+# 外部洗牌的桶数量上限：每个桶在分桶阶段占用一个打开的文件句柄，超过上限时每个桶的行数（即内存占用）相应增加
+SHUFFLE_MAX_BUCKETS = 256
 
-# 带时间戳的模型路径格式
-def get_timestamped_model_path():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return os.path.join(MODEL_DIR, f'sensitive_classifier_{timestamp}.pkl')
+# 训练集去重：off 不去重；exact 合并完全重复的样本；near 再用 MinHash + LSH 合并近似重复的样本
+# 合并后的样本带权重，训练时通过 sample_weight 保留原始样本的分布
+TRAIN_DEDUP = 'exact'
+DEDUP_MINHASH_PERMUTATIONS = 64
+DEDUP_LSH_BANDS = 16
+DEDUP_NEAR_THRESHOLD = 0.8
+DEDUP_SHINGLE_SIZE = 3
@@ -1,4 +1,6 @@
 """Main entry point for generating sensitive data"""
+import argparse
+
 from src.generate_sensitive_data.sensitive_data_generator import SensitiveDataGenerator
 from src.generate_sensitive_data.password_style import (
     CommonWeakPassword,
@@ -6,18 +8,57 @@ from src.generate_sensitive_data.password_style import (
     TokenStylePassword,
     DjangoTokenStylePassword
 )
-from config import GENERATE_DATA_PATH
+from config import (
+    GENERATE_DATA_PATH, GENERATE_SENSITIVE_RATIO, GENERATE_SEED, GENERATE_BATCH_SIZE, GENERATE_N_JOBS,
+    GENERATE_PART_FORMAT, GENERATE_SHUFFLE_BUFFER_ROWS
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="生成敏感信息训练数据")
+    parser.add_argument("-o", "--output", default=GENERATE_DATA_PATH,
+                        help="输出文件路径，格式由扩展名决定（.parquet/.arrow/.csv/.jsonl/.xlsx）")
+    parser.add_argument("-n", "--rows", type=int,
+                        help="批量模式：用 NumPy 随机数生成指定行数（可达千万行），不指定则使用原有生成方式")
+    parser.add_argument("--sensitive-ratio", type=float, default=GENERATE_SENSITIVE_RATIO,
+                        help=f"批量模式的敏感样本占比（默认 {GENERATE_SENSITIVE_RATIO}）")
+    parser.add_argument("--seed", type=int, default=GENERATE_SEED, help=f"批量模式的随机种子（默认 {GENERATE_SEED}）")
+    parser.add_argument("--batch-size", type=int, default=GENERATE_BATCH_SIZE,
+                        help=f"批量模式每批行数，分片模式下即每个分片的行数（默认 {GENERATE_BATCH_SIZE}）")
+    parser.add_argument("--no-shuffle", action="store_true", help="批量模式不做跨批次洗牌（各批内部仍是打乱的）")
+    parser.add_argument("--shuffle-buffer-rows", type=int, default=GENERATE_SHUFFLE_BUFFER_ROWS,
+                        help=f"批量模式洗牌时内存中最多保留的行数，超过则借助磁盘外部洗牌（默认 {GENERATE_SHUFFLE_BUFFER_ROWS}）")
+    parser.add_argument("--shard-dir",
+                        help="分片模式：多进程并行生成，每个分片写一个文件并生成 manifest.json（需配合 --rows）")
+    parser.add_argument("--part-format", choices=["parquet", "jsonl", "csv", "arrow"], default=GENERATE_PART_FORMAT,
+                        help=f"分片文件格式（默认 {GENERATE_PART_FORMAT}）")
+    parser.add_argument("-j", "--jobs", type=int, default=GENERATE_N_JOBS,
+                        help=f"分片模式的并行进程数（默认 {GENERATE_N_JOBS}）")
+    return parser.parse_args(argv)
 
 
-def main():
-    generator = SensitiveDataGenerator(output_path=GENERATE_DATA_PATH)
+def main(argv=None):
+    args = parse_args(argv)
+    generator = SensitiveDataGenerator(output_path=args.output)
     generator.add_password_style(CommonWeakPassword(count=1000))
     generator.add_password_style(HuaweiStylePassword(count=1000))
     generator.add_password_style(TokenStylePassword(count=1000))
     generator.add_password_style(DjangoTokenStylePassword(count=1000))  # 添加 Django Token 风格
 
-    generator.generate_dataset()
+    if args.shard_dir:
+        if not args.rows:
+            raise SystemExit("分片模式需要通过 --rows 指定行数")
+        generator.generate_dataset_sharded(args.shard_dir, args.rows, part_format=args.part_format, n_jobs=args.jobs,
+                                           sensitive_ratio=args.sensitive_ratio, seed=args.seed,
+                                           batch_size=args.batch_size)
+    elif args.rows:
+        generator.generate_dataset_bulk(args.rows, shuffle=not args.no_shuffle,
+                                        shuffle_buffer_rows=args.shuffle_buffer_rows,
+                                        sensitive_ratio=args.sensitive_ratio, seed=args.seed,
+                                        batch_size=args.batch_size)
+    else:
+        generator.generate_dataset()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
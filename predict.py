@@ -1,14 +1,88 @@
 # predict.py
-from src.predictor import ModelPredictor
+import argparse
+import json
+import sys
+
+from src.predictor import ModelPredictor, ITEM_LOG_MODES
+from config import PREDICT_BATCH_SIZE, PREDICT_ITEM_LOG_MODE, PREDICT_LOG_SAMPLE_RATE, PREDICT_CACHE_SIZE
 from loguru import logger
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="敏感信息预测")
+    parser.add_argument("-i", "--input",
+                        help="按行分隔的输入文件，'-' 表示从标准输入读取；不指定则运行内置示例")
+    parser.add_argument("-o", "--output",
+                        help="JSONL 输出文件，默认写到标准输出")
+    parser.add_argument("-b", "--batch-size", type=int, default=PREDICT_BATCH_SIZE,
+                        help=f"流式预测批大小（默认 {PREDICT_BATCH_SIZE}）")
+    parser.add_argument("--item-log", choices=ITEM_LOG_MODES, default=PREDICT_ITEM_LOG_MODE,
+                        help="逐条日志模式：off 关闭，hits 仅敏感命中，all 全部（DEBUG 级别）")
+    parser.add_argument("--log-sample-rate", type=float, default=PREDICT_LOG_SAMPLE_RATE,
+                        help="逐条日志采样率 (0, 1]")
+    parser.add_argument("--cache-size", type=int, default=PREDICT_CACHE_SIZE,
+                        help="结果缓存容量（条），0 表示关闭")
+    parser.add_argument("--no-rules", action="store_true",
+                        help="关闭模型前的规则预过滤，所有文本都交给模型")
+    parser.add_argument("--no-native", action="store_true",
+                        help="关闭原生推理引擎，使用 sklearn Pipeline 打分")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="关闭按文本统计量（长度、空白占比等）提前判定的快速路径")
+    parser.add_argument("-m", "--model", help="模型文件路径（pickle 或紧凑格式），默认使用最新模型")
+    return parser.parse_args(argv)
+
+
+def _iter_lines(stream):
+    """逐行读取输入，去掉行尾换行符"""
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def run_stream(predictor, input_path, output_path=None, batch_size=PREDICT_BATCH_SIZE):
+    """流式读取输入并以 JSONL 格式写出预测结果"""
+    in_stream = sys.stdin if input_path == "-" else open(input_path, "r", encoding="utf-8")
+    out_stream = open(output_path, "w", encoding="utf-8") if output_path else sys.stdout
+
+    count = 0
+    try:
+        for result in predictor.predict_stream(_iter_lines(in_stream), batch_size=batch_size):
+            out_stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+        else:
+            out_stream.flush()
+
+    return count
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # 日志输出到文件 + 控制台
     logger.add("logs/predict_log_{time:YYYY-MM-DD}.log", rotation="1 day", level="INFO")
 
     try:
-        predictor = ModelPredictor()
+        predictor = ModelPredictor(
+            model_path=args.model,
+            item_log_mode=args.item_log,
+            log_sample_rate=args.log_sample_rate,
+            cache_size=args.cache_size,
+            use_rules=not args.no_rules,
+            native=not args.no_native,
+            fast_path=not args.no_fast_path,
+        )
+
+        if args.input:
+            logger.info(f"🔍 开始流式预测: {args.input}")
+            count = run_stream(predictor, args.input, args.output, args.batch_size)
+            predictor.log_stats()
+            logger.success(f"✅ 预测完成！共 {count} 条")
+            return count
+
         test_texts = [
             "密码是123456",
             "今天天气真好",
@@ -17,6 +91,7 @@ def main():
         ]
         logger.info("🔍 开始批量预测...")
         results = predictor.predict(test_texts)
+        predictor.log_stats()
         logger.success("✅ 预测完成！")
         return results
     except Exception as e:
@@ -25,4 +100,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,96 @@
+# registry.py
+import argparse
+import glob
+import json
+import os
+import sys
+
+from loguru import logger
+
+from config import MODEL_DIR
+from src.model_registry import ARTIFACT_PATHS, METRICS, ModelRegistry
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="模型注册表管理")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="按注册时间倒序列出模型")
+    list_parser.add_argument("-n", "--limit", type=int, help="最多列出的条数")
+
+    show_parser = sub.add_parser("show", help="查看模型元数据")
+    show_parser.add_argument("ref", help="latest / best / 模型哈希（可为前缀）")
+
+    path_parser = sub.add_parser("path", help="输出模型文件路径，可用于 predict.py --model")
+    path_parser.add_argument("ref", help="latest / best / 模型哈希（可为前缀）")
+    path_parser.add_argument("--artifact", choices=list(ARTIFACT_PATHS),
+                             help="输出该版本附属文件的路径（compact 紧凑格式 / compressed 压缩模型）")
+
+    best_parser = sub.add_parser("best", help="按指标查看最优模型")
+    best_parser.add_argument("--metric", choices=list(METRICS), default="accuracy", help="排序指标（默认 accuracy）")
+
+    promote_parser = sub.add_parser("promote", help="把模型发布为最新版（只替换硬链接，不复制文件）")
+    promote_parser.add_argument("ref", help="best / 模型哈希（可为前缀）")
+
+    sub.add_parser("rollback", help="回滚到上一次发布的模型")
+    sub.add_parser("cleanup", help="按保留策略清理旧模型")
+
+    import_parser = sub.add_parser("import", help="把旧的带时间戳的模型文件导入注册表")
+    import_parser.add_argument("paths", nargs="*", help="模型文件路径，默认导入 models/sensitive_classifier_*.pkl")
+    import_parser.add_argument("--remove", action="store_true", help="导入后删除原文件")
+    return parser.parse_args(argv)
+
+
+def _print(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def import_legacy(registry, paths=None, remove=False):
+    """
+    按修改时间顺序导入旧模型文件，不发布；latest 文件本身由注册表管理，跳过
+    旧文件没有训练配置，版本哈希只由模型参数决定，内容相同的文件只导入一份
+    """
+    paths = paths or glob.glob(os.path.join(MODEL_DIR, 'sensitive_classifier_*.pkl'))
+    paths = sorted((path for path in paths if os.path.abspath(path) != os.path.abspath(registry.latest_path)),
+                   key=os.path.getmtime)
+    digests = set()
+    for path in paths:
+        digest = registry.register(path=path, promote=False)
+        logger.info(f"📥 {os.path.basename(path)} -> {digest[:12]}")
+        digests.add(digest)
+        if remove:
+            os.remove(path)
+    logger.success(f"✅ 已导入 {len(paths)} 个模型文件，去重后 {len(digests)} 个模型")
+    return digests
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    registry = ModelRegistry()
+
+    try:
+        if args.command == "list":
+            _print(registry.list_models(args.limit))
+        elif args.command == "show":
+            _print(registry.get(registry.resolve(args.ref)))
+        elif args.command == "path":
+            digest = registry.resolve(args.ref)
+            print(registry.artifact_path(digest, args.artifact) if args.artifact else registry.blob_path(digest))
+        elif args.command == "best":
+            _print(registry.best(args.metric))
+        elif args.command == "promote":
+            registry.promote(args.ref)
+        elif args.command == "rollback":
+            registry.rollback()
+        elif args.command == "cleanup":
+            registry.cleanup()
+        elif args.command == "import":
+            import_legacy(registry, args.paths, args.remove)
+    except (KeyError, ValueError) as e:
+        logger.error(f"❌ {e.args[0] if e.args else e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# serve.py
+import argparse
+import asyncio
+
+from src.predictor import ModelPredictor
+from src.prediction_server import PredictionServer
+from config import (
+    SERVER_HOST, SERVER_PORT, SERVER_MAX_BATCH_SIZE, SERVER_BATCH_WINDOW_MS, SERVER_WORKERS,
+    PREDICT_CACHE_SIZE
+)
+from loguru import logger
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="常驻敏感信息预测服务")
+    parser.add_argument("--host", default=SERVER_HOST, help=f"监听地址（默认 {SERVER_HOST}）")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help=f"监听端口（默认 {SERVER_PORT}）")
+    parser.add_argument("--unix-socket", help="监听 Unix Socket 路径，指定后不监听 TCP")
+    parser.add_argument("--max-batch-size", type=int, default=SERVER_MAX_BATCH_SIZE,
+                        help=f"微批次最大条数（默认 {SERVER_MAX_BATCH_SIZE}）")
+    parser.add_argument("--batch-window-ms", type=float, default=SERVER_BATCH_WINDOW_MS,
+                        help=f"微批次合并窗口，毫秒（默认 {SERVER_BATCH_WINDOW_MS}）")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS,
+                        help=f"预测工作线程数（默认 {SERVER_WORKERS}，受 GIL 限制，调大不会线性提升吞吐）")
+    parser.add_argument("--watch", action="store_true",
+                        help="监视模型文件，重新训练后自动热更新模型")
+    parser.add_argument("--cache-size", type=int, default=PREDICT_CACHE_SIZE,
+                        help="结果缓存容量（条），0 表示关闭")
+    parser.add_argument("--no-rules", action="store_true",
+                        help="关闭模型前的规则预过滤，所有文本都交给模型")
+    parser.add_argument("--no-native", action="store_true",
+                        help="关闭原生推理引擎，使用 sklearn Pipeline 打分")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="关闭按文本统计量（长度、空白占比等）提前判定的快速路径")
+    parser.add_argument("-m", "--model", help="模型文件路径（pickle 或紧凑格式），默认使用最新模型")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger.add("logs/serve_log_{time:YYYY-MM-DD}.log", rotation="1 day", level="INFO")
+
+    try:
+        # 常驻服务只记录敏感命中，避免逐条日志拖慢吞吐
+        predictor = ModelPredictor(model_path=args.model, item_log_mode='hits', cache_size=args.cache_size,
+                                   use_rules=not args.no_rules, native=not args.no_native,
+                                   fast_path=not args.no_fast_path)
+        if args.watch:
+            predictor.start_watching()
+        server = PredictionServer(
+            predictor,
+            host=args.host,
+            port=args.port,
+            unix_socket=args.unix_socket,
+            max_batch_size=args.max_batch_size,
+            batch_window_ms=args.batch_window_ms,
+            workers=args.workers,
+        )
+        try:
+            asyncio.run(server.serve_forever())
+        finally:
+            predictor.close()
+    except KeyboardInterrupt:
+        logger.info("收到中断信号，服务退出")
+    except Exception as e:
+        logger.critical(f"💥 预测服务启动失败: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# src/benchmark.py
+from datetime import datetime
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from loguru import logger
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+from config import (
+    GENERATE_DATA_PATH, BENCHMARK_CORPUS_SIZE, BENCHMARK_SENSITIVE_RATIO, BENCHMARK_CODE_RATIO, BENCHMARK_SEED,
+    BENCHMARK_BATCH_SIZES, BENCHMARK_LATENCY_SAMPLES, BENCHMARK_REPEATS, BENCHMARK_TOLERANCE
+)
+from src.compact_model import export_compact_model, supports_compact_export
+from src.generate_sensitive_data.password_style import (
+    CommonWeakPassword, HuaweiStylePassword, TokenStylePassword, DjangoTokenStylePassword
+)
+from src.generate_sensitive_data.sensitive_data_generator import SensitiveDataGenerator
+from src.predictor import ModelPredictor
+from src.trainer import ModelTrainer
+
+# 数值越大越好的指标后缀；其余指标（耗时、延迟、内存、体积）越小越好
+_HIGHER_IS_BETTER = ('_per_s', 'accuracy')
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _median_ms(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(float(np.median(timings)), 3)
+
+
+class BenchmarkRunner:
+    """
+    训练与预测性能基准
+    用 SensitiveDataGenerator 按指定规模和构成合成语料，测量训练耗时、模型加载耗时、
+    单条预测 p50/p99 延迟、不同批大小下的吞吐以及峰值内存，结果为可与基线对比的 JSON
+    """
+
+    def __init__(self, corpus_size=None, sensitive_ratio=None, code_ratio=None, seed=None,
+                 batch_sizes=None, latency_samples=None, repeats=None):
+        """
+        :param corpus_size: 语料总条数，默认使用 BENCHMARK_CORPUS_SIZE
+        :param sensitive_ratio: 敏感样本占比，默认使用 BENCHMARK_SENSITIVE_RATIO
+        :param code_ratio: 非敏感样本中代码片段的占比，默认使用 BENCHMARK_CODE_RATIO
+        :param seed: 随机种子，默认使用 BENCHMARK_SEED
+        :param batch_sizes: 吞吐测试的批大小列表，默认使用 BENCHMARK_BATCH_SIZES
+        :param latency_samples: 单条延迟采样数，默认使用 BENCHMARK_LATENCY_SAMPLES
+        :param repeats: 重复次数，训练与加载耗时取中位数、吞吐取最好成绩，默认使用 BENCHMARK_REPEATS
+        """
+        self.corpus_size = corpus_size or BENCHMARK_CORPUS_SIZE
+        self.sensitive_ratio = BENCHMARK_SENSITIVE_RATIO if sensitive_ratio is None else sensitive_ratio
+        self.code_ratio = BENCHMARK_CODE_RATIO if code_ratio is None else code_ratio
+        self.seed = BENCHMARK_SEED if seed is None else seed
+        self.batch_sizes = batch_sizes or BENCHMARK_BATCH_SIZES
+        self.latency_samples = latency_samples or BENCHMARK_LATENCY_SAMPLES
+        self.repeats = repeats or BENCHMARK_REPEATS
+
+    def synthesize_corpus(self):
+        """
+        按规模和构成合成语料
+        生成器内部经过 set 去重，结果顺序受哈希随机化影响，因此先排序再按种子打乱，保证同一种子得到相同语料
+        """
+        random.seed(self.seed)
+        n_sensitive = round(self.corpus_size * self.sensitive_ratio)
+        n_normal = self.corpus_size - n_sensitive
+        n_code = round(n_normal * self.code_ratio)
+
+        generator = SensitiveDataGenerator(GENERATE_DATA_PATH, normal_text_count=n_normal - n_code,
+                                           normal_code_count=n_code)
+        # Token / Django Token 几乎不重复，由它们保证敏感样本数量；其余风格去重后只有几百条
+        random_count = math.ceil(n_sensitive / 2)
+        generator.add_password_style(CommonWeakPassword(count=min(n_sensitive, 1000)))
+        generator.add_password_style(HuaweiStylePassword(count=min(n_sensitive, 1000)))
+        generator.add_password_style(TokenStylePassword(count=random_count))
+        generator.add_password_style(DjangoTokenStylePassword(count=random_count))
+        df = generator.build_dataset(weak_password_count=n_sensitive)
+
+        df = df.sort_values(['is_sensitive', 'text'], kind='stable')
+        sensitive = df[df['is_sensitive'] == 1].sample(n=n_sensitive, random_state=self.seed)
+        df = pd.concat([sensitive, df[df['is_sensitive'] == 0]])
+        return df.sample(frac=1, random_state=self.seed).reset_index(drop=True)
+
+    def _bench_training(self, corpus_path, workdir):
+        trainer = ModelTrainer(data_path=corpus_path, use_cache=False)
+        metrics = {
+            'train_seconds': round(_median_ms(trainer.train, self.repeats) / 1000, 3),
+            'train_accuracy': round(float(trainer.evaluate()), 4),
+            'train_peak_rss_mb': peak_rss_mb(),
+        }
+
+        model_paths = {'': os.path.join(workdir, 'model.pkl')}
+        joblib.dump(trainer.pipeline, model_paths[''])
+        if supports_compact_export(trainer.pipeline):
+            model_paths['compact_'] = export_compact_model(trainer.pipeline, os.path.join(workdir, 'model.cmodel'))
+        for prefix, path in model_paths.items():
+            metrics[f'{prefix}model_size_kb'] = round(os.path.getsize(path) / 1024, 1)
+        return metrics, model_paths
+
+    def _bench_prediction(self, model_path, texts, prefix, use_rules=False, native=False):
+        metrics = {}
+        options = {'item_log_mode': 'off', 'cache_size': 0, 'use_rules': use_rules, 'native': native,
+                   'fast_path': use_rules}
+
+        def load():
+            ModelPredictor(model_path, **options).close()
+
+        metrics[f'{prefix}load_ms'] = _median_ms(load, self.repeats)
+
+        with ModelPredictor(model_path, **options) as predictor:
+            latencies = []
+            for text in texts[:self.latency_samples]:
+                started = time.perf_counter()
+                predictor.predict_proba_only([text])
+                latencies.append((time.perf_counter() - started) * 1000)
+            metrics[f'{prefix}latency_p50_ms'] = round(float(np.percentile(latencies, 50)), 4)
+            metrics[f'{prefix}latency_p99_ms'] = round(float(np.percentile(latencies, 99)), 4)
+
+            # 吞吐取多次重复中的最好成绩，降低调度抖动的影响
+            for batch_size in self.batch_sizes:
+                items = texts[:max(batch_size * 50, self.latency_samples * 5)]
+                best = float('inf')
+                for _ in range(self.repeats):
+                    started = time.perf_counter()
+                    for start in range(0, len(items), batch_size):
+                        predictor.predict_proba_only(items[start:start + batch_size])
+                    best = min(best, time.perf_counter() - started)
+                metrics[f'{prefix}throughput_b{batch_size}_per_s'] = round(len(items) / best, 1)
+        return metrics
+
+    def run(self):
+        """
+        执行基准测试
+        :return: dict，meta 为环境与语料配置，metrics 为各项指标
+        """
+        logger.info(f"⏱️ 开始基准测试: 语料 {self.corpus_size} 条, 敏感占比 {self.sensitive_ratio}, 种子 {self.seed}")
+        started = time.perf_counter()
+        corpus = self.synthesize_corpus()
+        metrics = {'generate_seconds': round(time.perf_counter() - started, 3)}
+
+        with tempfile.TemporaryDirectory() as workdir:
+            corpus_path = os.path.join(workdir, 'corpus.csv')
+            corpus.to_csv(corpus_path, index=False, encoding='utf-8')
+
+            train_metrics, model_paths = self._bench_training(corpus_path, workdir)
+            metrics.update(train_metrics)
+
+            texts = corpus['text'].astype(str).tolist()
+            for prefix, path in model_paths.items():
+                metrics.update(self._bench_prediction(path, texts, prefix))
+            # native_ 为原生推理引擎，rules_ 为规则预过滤 + 快速路径 + 原生推理引擎的端到端指标；无前缀的指标为 sklearn Pipeline
+            metrics.update(self._bench_prediction(model_paths[''], texts, 'native_', native=True))
+            metrics.update(self._bench_prediction(model_paths[''], texts, 'rules_', use_rules=True, native=True))
+
+        metrics['peak_rss_mb'] = peak_rss_mb()
+        result = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'sklearn': sklearn.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'corpus_size': self.corpus_size,
+                'sensitive_ratio': self.sensitive_ratio,
+                'code_ratio': self.code_ratio,
+                'seed': self.seed,
+            },
+            'metrics': metrics,
+        }
+        logger.success(f"✅ 基准测试完成，用时 {time.perf_counter() - started:.1f} 秒")
+        return result
+
+
+def save_result(result, path):
+    """把基准结果写入 JSON 文件"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    logger.info(f"📁 基准结果已保存: {path}")
+
+
+def load_result(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_with_baseline(result, baseline, tolerance=None):
+    """
+    与基线对比，变差幅度超过容忍度的指标视为性能回退
+    :param tolerance: 相对变化容忍度，默认使用 BENCHMARK_TOLERANCE
+    :return: list[dict] 回退的指标
+    """
+    tolerance = BENCHMARK_TOLERANCE if tolerance is None else tolerance
+    for key in ('corpus_size', 'sensitive_ratio', 'code_ratio', 'seed'):
+        if result['meta'].get(key) != baseline['meta'].get(key):
+            logger.warning(f"⚠️ 语料配置与基线不同 ({key}: {baseline['meta'].get(key)} -> {result['meta'].get(key)})，"
+                           f"对比结果仅供参考")
+
+    regressions = []
+    logger.info(f"📊 与基线对比（容忍度 {tolerance:.0%}）:")
+    for name, current in result['metrics'].items():
+        reference = baseline['metrics'].get(name)
+        if current is None or not reference:
+            continue
+        change = (current - reference) / reference
+        worse = -change if name.endswith(_HIGHER_IS_BETTER) else change
+        regressed = worse > tolerance
+        logger.info(f"   {'❌' if regressed else '✅'} {name:<32}{reference:>12}{current:>12}{change:>+9.1%}")
+        if regressed:
+            regressions.append({'metric': name, 'baseline': reference, 'current': current, 'change': round(change, 4)})
+    return regressions
@@ -0,0 +1,323 @@
+# src/compact_model.py
+import json
+import os
+import struct
+import zlib
+
+from loguru import logger
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.fast_path import MODEL_ATTRIBUTE as FAST_PATH_ATTRIBUTE
+from src.features import TextStatsFeaturizer
+from src.inference import feature_parts, nb_predict_proba
+from src.tokenizer import ChineseTokenizer
+
+# 文件格式：
+#   8 字节魔数 | 8 字节小端 uint64 头部长度 | JSON 头部 | 按 64 字节对齐的连续数组区
+# 头部记录向量化参数、类别、快速路径边界以及每个数组的 dtype / shape / 偏移量，数组可直接内存映射
+COMPACT_MAGIC = b'SNBCMP01'
+_ALIGNMENT = 64
+
+# 压缩导出支持的量化方式：float16 半精度；int8 按类别缩放的 8 位整数（附带每个类别的缩放系数）
+QUANTIZE_MODES = ('float16', 'int8')
+
+# 导出时保留的 TfidfVectorizer 参数，推理时据此重建分词器
+_VECTORIZER_PARAMS = (
+    'analyzer', 'lowercase', 'ngram_range', 'token_pattern', 'strip_accents',
+    'stop_words', 'norm', 'use_idf', 'sublinear_tf', 'binary',
+)
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def term_hash(term):
+    """词项的 64 位稳定哈希（CRC32 与 Adler-32 拼接），跨进程、跨平台一致且计算开销低"""
+    data = term.encode('utf-8')
+    return (zlib.crc32(data) << 32) | zlib.adler32(data)
+
+
+def is_compact_model(path):
+    """判断文件是否为紧凑推理格式"""
+    with open(path, 'rb') as f:
+        return f.read(len(COMPACT_MAGIC)) == COMPACT_MAGIC
+
+
+def supports_compact_export(pipeline):
+    """
+    判断 Pipeline 是否可以导出为紧凑格式：
+    TfidfVectorizer + MultinomialNB，或 FeatureUnion[TfidfVectorizer, TextStatsFeaturizer] + MultinomialNB
+    """
+    parts = feature_parts(pipeline)
+    if parts is None or not isinstance(parts[0], TfidfVectorizer):
+        return False
+    params = parts[0].get_params()
+    tokenizer = params['tokenizer']
+    return params['preprocessor'] is None and (tokenizer is None or isinstance(tokenizer, ChineseTokenizer))
+
+
+def _compress_log_prob(feature_log_prob, prune_threshold, quantize):
+    """
+    压缩词项的对数条件概率
+    每个词项先减去各类别的均值：同一词项对所有类别加上相同的常数不改变 softmax 后的概率，
+    中心化后的取值即该词项在类别间的差异，差异小于 prune_threshold 的词项对判定几乎没有影响，直接裁剪；
+    剩余取值范围小，量化误差也更小
+    :return: (保留的特征列掩码, 压缩后的对数概率, int8 缩放系数或 None)
+    """
+    centered = feature_log_prob - feature_log_prob.mean(axis=0)
+    keep = np.ptp(feature_log_prob, axis=0) >= prune_threshold
+    centered = centered[:, keep]
+    if quantize == 'int8':
+        scale = np.abs(centered).max(axis=1, initial=0.0) / 127
+        scale[scale == 0] = 1.0
+        quantized = np.rint(centered / scale[:, None]).astype(np.int8)
+        return keep, quantized, scale.astype(np.float32)
+    return keep, centered.astype(np.float16 if quantize == 'float16' else np.float32), None
+
+
+def export_compact_model(pipeline, path, prune_threshold=None, quantize=None):
+    """
+    把 TF-IDF + MultinomialNB 的 Pipeline 导出为紧凑推理格式
+    词表以排序后的 64 位哈希数组表示（二分查找代替 dict），词项原文另存为字节串 + 偏移量，
+    IDF 与 NB 对数概率存为连续 float32 数组；拼接了字符统计特征时另存统计特征参数与其对数概率。
+    指定 prune_threshold 或 quantize 时为压缩导出：裁剪对判定几乎没有影响的词项、量化对数概率与 IDF，
+    并且不保存词项原文
+    :param pipeline: 已训练的 sklearn Pipeline，结构见 supports_compact_export
+    :param path: 输出文件路径，先写临时文件再原子替换
+    :param prune_threshold: 裁剪类别间对数概率差异小于该值的词项，None 表示不压缩
+    :param quantize: 对数概率与 IDF 的量化方式（QUANTIZE_MODES），None 表示保持 float32
+    :return: 输出文件路径
+    """
+    if quantize is not None and quantize not in QUANTIZE_MODES:
+        raise ValueError(f"不支持的量化方式: {quantize}，可选 {QUANTIZE_MODES}")
+    if not supports_compact_export(pipeline):
+        raise ValueError(
+            f"紧凑格式仅支持 TfidfVectorizer（默认或 ChineseTokenizer 分词，可拼接 TextStatsFeaturizer）+ MultinomialNB，"
+            f"当前为 {' + '.join(type(step).__name__ for _, step in pipeline.steps)}"
+        )
+    vectorizer, _, stats, stats_weight = feature_parts(pipeline)
+    classifier = pipeline[-1]
+    params = vectorizer.get_params()
+    tokenizer = params['tokenizer']
+    vectorizer_params = {name: params[name] for name in _VECTORIZER_PARAMS}
+    # ChineseTokenizer 以配置形式保存，加载时重建
+    vectorizer_params['tokenizer'] = tokenizer.get_config() if tokenizer is not None else None
+    if vectorizer_params['stop_words'] is not None and not isinstance(vectorizer_params['stop_words'], str):
+        vectorizer_params['stop_words'] = sorted(vectorizer_params['stop_words'])
+
+    n_terms = len(vectorizer.vocabulary_)
+    feature_log_prob = classifier.feature_log_prob_[:, :n_terms]
+    compressed = prune_threshold is not None or quantize is not None
+    scale = None
+    keep = np.ones(n_terms, dtype=bool)
+    if compressed:
+        keep, feature_log_prob, scale = _compress_log_prob(feature_log_prob, prune_threshold or 0.0, quantize)
+    # 压缩后的对数概率只包含保留的词项，列号映射到保留后的位置
+    kept_column = np.cumsum(keep) - 1
+
+    # 词表按哈希值排序，特征列随之重排
+    terms = sorted((term for term, column in vectorizer.vocabulary_.items() if keep[column]), key=term_hash)
+    hashes = np.array([term_hash(term) for term in terms], dtype=np.uint64)
+    if len(np.unique(hashes)) != len(hashes):
+        raise ValueError("词表哈希冲突，无法导出紧凑格式")
+    columns = np.array([vectorizer.vocabulary_[term] for term in terms], dtype=np.intp)
+    arrays = {'term_hashes': hashes}
+    if not compressed:
+        # 词项原文只用于查看与调试，打分只需要哈希；压缩导出时不保存
+        encoded = [term.encode('utf-8') for term in terms]
+        arrays['term_offsets'] = np.cumsum([0] + [len(term) for term in encoded], dtype=np.int64)
+        arrays['term_bytes'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    arrays['feature_log_prob'] = np.ascontiguousarray(
+        feature_log_prob[:, kept_column[columns]], dtype=feature_log_prob.dtype if compressed else np.float32)
+    arrays['class_log_prior'] = np.ascontiguousarray(classifier.class_log_prior_, dtype=np.float32)
+    if scale is not None:
+        arrays['feature_log_prob_scale'] = scale
+    if vectorizer_params['use_idf']:
+        arrays['idf'] = np.ascontiguousarray(vectorizer.idf_[columns], dtype=np.float16 if quantize else np.float32)
+    if stats is not None:
+        # 统计特征列位于词项特征之后，特征权重直接乘入对数概率
+        stats_log_prob = classifier.feature_log_prob_[:, n_terms:] * stats_weight
+        arrays['stats_log_prob'] = np.ascontiguousarray(stats_log_prob, dtype=np.float32)
+
+    header = {
+        'format_version': 2 if stats is not None or compressed else 1,
+        'vectorizer': vectorizer_params,
+        'classes': classifier.classes_.tolist(),
+        'arrays': {},
+    }
+    if stats is not None:
+        header['text_stats'] = stats.get_params()
+    if getattr(pipeline, FAST_PATH_ATTRIBUTE, None):
+        # 快速路径边界随模型保存
+        header['fast_path'] = getattr(pipeline, FAST_PATH_ATTRIBUTE)
+    if compressed:
+        header['compression'] = {'prune_threshold': prune_threshold, 'quantize': quantize,
+                                 'pruned_terms': int(n_terms - len(terms))}
+    # 先确定头部长度，再计算各数组偏移
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _align(len(COMPACT_MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(COMPACT_MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+    logger.success(f"✅ 紧凑推理模型已导出: {path} ({os.path.getsize(path) / 1024:.1f} KB)")
+    return path
+
+
+class CompactModel:
+    """
+    紧凑格式的推理模型
+    数组以只读内存映射方式加载，多个进程共享同一份物理页；
+    对外提供 classes_ 与 predict_proba，可直接替代 Pipeline 用于 ModelPredictor
+    """
+
+    def __init__(self, header, arrays):
+        self.header = header
+        self.classes_ = np.array(header['classes'])
+        self.term_hashes = arrays['term_hashes']
+        self.term_offsets = arrays.get('term_offsets')
+        self.term_bytes = arrays.get('term_bytes')
+        self.feature_log_prob = arrays['feature_log_prob']
+        self.class_log_prior = arrays['class_log_prior']
+        self.feature_scale = arrays.get('feature_log_prob_scale')
+        self.idf = arrays.get('idf')
+        self.stats_log_prob = arrays.get('stats_log_prob')
+        if 'fast_path' in header:
+            setattr(self, FAST_PATH_ATTRIBUTE, header['fast_path'])
+        self.stats = None
+        if 'text_stats' in header:
+            stats_params = dict(header['text_stats'])
+            stats_params['length_buckets'] = tuple(stats_params['length_buckets'])
+            self.stats = TextStatsFeaturizer(**stats_params)
+
+        params = dict(header['vectorizer'])
+        params['ngram_range'] = tuple(params['ngram_range'])
+        if params.get('tokenizer') is not None:
+            params['tokenizer'] = ChineseTokenizer(**params['tokenizer'])
+        self.norm = params['norm']
+        self.sublinear_tf = params['sublinear_tf']
+        self.binary = params['binary']
+        # 未拟合的 TfidfVectorizer 只用于构造与训练时一致的分词函数，不包含词表
+        self._analyzer = TfidfVectorizer(**params).build_analyzer()
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        加载紧凑格式模型
+        :param path: 模型文件路径
+        :param mmap: 是否以只读内存映射方式加载数组
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(COMPACT_MAGIC)) != COMPACT_MAGIC:
+                raise ValueError(f"不是紧凑格式模型文件: {path}")
+            (header_len,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_len).decode('utf-8'))
+            data_start = _align(len(COMPACT_MAGIC) + 8 + header_len)
+
+            arrays = {}
+            for name, spec in header['arrays'].items():
+                dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+                offset = data_start + spec['offset']
+                if mmap:
+                    if not int(np.prod(shape)):
+                        # 空数组无法内存映射
+                        arrays[name] = np.empty(shape, dtype=dtype)
+                        continue
+                    arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+                else:
+                    f.seek(offset)
+                    count = int(np.prod(shape))
+                    arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+        return cls(header, arrays)
+
+    @property
+    def terms(self):
+        """按特征列顺序返回词项原文"""
+        if self.term_bytes is None:
+            raise ValueError("压缩导出的模型不包含词项原文")
+        data = self.term_bytes.tobytes()
+        offsets = self.term_offsets
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    def _token_columns(self, texts):
+        """分词并在排序哈希数组上二分查找，返回命中词项的 (行, 列)"""
+        analyzer = self._analyzer
+        token_lists = [analyzer(text) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.intp, count=len(token_lists))
+        n_features = len(self.term_hashes)
+        total = int(lengths.sum())
+        if total == 0 or n_features == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        hashes = np.fromiter(
+            (term_hash(token) for tokens in token_lists for token in tokens), dtype=np.uint64, count=total
+        )
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        # 过滤不在词表中的词
+        columns = np.searchsorted(self.term_hashes, hashes)
+        columns[columns >= n_features] = 0
+        found = self.term_hashes[columns] == hashes
+        return rows[found], columns[found]
+
+    def transform(self, texts):
+        """TF-IDF 向量化，结果与原 TfidfVectorizer.transform 一致（列顺序为哈希排序后的词表，不含统计特征）"""
+        rows, columns = self._token_columns(texts)
+        n_features = len(self.term_hashes)
+        if len(columns) == 0:
+            return sp.csr_matrix((len(texts), n_features), dtype=np.float64)
+
+        X = sp.csr_matrix((np.ones(len(columns)), (rows, columns)), shape=(len(texts), n_features))
+        X.sum_duplicates()
+
+        if self.binary:
+            X.data[:] = 1.0
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if self.idf is not None:
+            X.data *= self.idf[X.indices]
+        if self.norm == 'l2':
+            row_norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        elif self.norm == 'l1':
+            row_norms = np.asarray(abs(X).sum(axis=1)).ravel()
+        else:
+            return X
+        row_norms[row_norms == 0] = 1.0
+        X.data /= np.repeat(row_norms, np.diff(X.indptr))
+        return X
+
+    def predict_proba(self, texts):
+        """计算类别概率，列顺序与 classes_ 一致；不构造稀疏矩阵，直接走原生推理内核"""
+        rows, columns = self._token_columns(texts)
+        dense = None if self.stats is None else self.stats.transform(texts)
+        return nb_predict_proba(rows, columns, len(texts), self.feature_log_prob, self.class_log_prior,
+                                idf=self.idf, norm=self.norm, sublinear_tf=self.sublinear_tf, binary=self.binary,
+                                dense=dense, dense_log_prob=self.stats_log_prob, feature_scale=self.feature_scale)
+
+    def predict(self, texts):
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
+
+def load_model(path, mmap=True):
+    """
+    按文件格式加载模型：紧凑格式返回 CompactModel，其余按 joblib pickle 加载
+    :param mmap: 是否以内存映射方式加载数组（joblib 对应 mmap_mode='r'）
+    """
+    if is_compact_model(path):
+        return CompactModel.load(path, mmap=mmap)
+    return joblib.load(path, mmap_mode='r' if mmap else None)
@@ -0,0 +1,343 @@
+# src/dataset_io.py
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from config import DATASET_FORMATS, SHUFFLE_MAX_BUCKETS
+
+# 分片数据集目录中的清单文件名；清单最后写入，存在即表示所有分片已完整写出
+MANIFEST_NAME = 'manifest.json'
+# Excel 单个工作表的最大数据行数（不含表头）
+EXCEL_MAX_ROWS = 1048575
+
+
+def is_sharded_dataset(path):
+    """判断路径是否为带清单的分片数据集目录"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+
+def read_manifest(path):
+    """读取分片数据集清单"""
+    with open(os.path.join(path, MANIFEST_NAME), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(path, manifest):
+    """原子写入分片数据集清单"""
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _part_paths(path):
+    return [os.path.join(path, part['file']) for part in read_manifest(path)['parts']]
+
+
+def file_digest(path, block_size=1 << 20):
+    """计算文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataset_digest(path):
+    """
+    数据集内容哈希：单文件为文件内容的 sha256；
+    分片数据集为清单的 sha256（清单中记录了每个分片的 sha256）
+    """
+    if is_sharded_dataset(path):
+        return file_digest(os.path.join(path, MANIFEST_NAME))
+    return file_digest(path)
+
+
+def get_dataset_format(path):
+    """
+    根据文件扩展名确定数据集格式
+    :return: 'parquet' / 'arrow' / 'csv' / 'jsonl' / 'excel'
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        return DATASET_FORMATS[ext]
+    except KeyError:
+        raise ValueError(f"不支持的数据集格式: {ext or path}，可选: {', '.join(sorted(DATASET_FORMATS))}")
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"{fmt} 格式需要安装 pyarrow: pip install pyarrow")
+
+
+def read_dataset(path, columns=None):
+    """
+    读取数据集，格式由扩展名决定
+    :param path: 数据文件路径，或带清单的分片数据集目录
+    :param columns: 只读取指定列（列式格式可跳过其余列）
+    :return: pandas.DataFrame
+    """
+    if is_sharded_dataset(path):
+        parts = _part_paths(path)
+        logger.debug(f"读取分片数据集: {path}, {len(parts)} 个分片")
+        return pd.concat([read_dataset(part, columns=columns) for part in parts], ignore_index=True)
+
+    fmt = get_dataset_format(path)
+
+    if fmt == 'parquet':
+        _require_pyarrow(fmt)
+        df = pd.read_parquet(path, columns=columns)
+    elif fmt == 'arrow':
+        _require_pyarrow(fmt)
+        df = pd.read_feather(path, columns=columns)
+    elif fmt == 'csv':
+        # 文本列按字符串读取，避免 "null"、"NA"、"123456" 等被解析为缺失值或数字
+        df = pd.read_csv(
+            path, usecols=columns, dtype={'text': str},
+            keep_default_na=False, na_values={'is_sensitive': ['']},
+        )
+    elif fmt == 'jsonl':
+        df = pd.read_json(path, lines=True, dtype=False)
+        if columns is not None:
+            df = df[columns]
+    else:
+        df = pd.read_excel(path, usecols=columns)
+
+    logger.debug(f"数据集读取完成 ({fmt}): {path}, {len(df)} 行")
+    return df
+
+
+def write_dataset(df, path):
+    """
+    写出数据集，格式由扩展名决定
+    :param df: pandas.DataFrame
+    :param path: 输出文件路径
+    """
+    fmt = get_dataset_format(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    if fmt == 'parquet':
+        _require_pyarrow(fmt)
+        df.to_parquet(path, index=False)
+    elif fmt == 'arrow':
+        _require_pyarrow(fmt)
+        df.reset_index(drop=True).to_feather(path)
+    elif fmt == 'csv':
+        df.to_csv(path, index=False, encoding='utf-8')
+    elif fmt == 'jsonl':
+        df.to_json(path, orient='records', lines=True, force_ascii=False)
+    else:
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel 单个工作表最多 {EXCEL_MAX_ROWS} 行数据，当前 {len(df)} 行，请改用 parquet/arrow/csv/jsonl")
+        df.to_excel(path, index=False)
+
+    logger.debug(f"数据集写出完成 ({fmt}): {path}, {len(df)} 行")
+
+
+def iter_dataset(path, chunk_size, columns=None):
+    """
+    按块流式读取数据集，每次只在内存中保留一个块
+    Excel 不支持流式读取，会整体读入后再切块；分片数据集按清单顺序逐个分片读取，块不跨分片
+    :param path: 数据文件路径，或带清单的分片数据集目录
+    :param chunk_size: 每块行数
+    :param columns: 只读取指定列
+    :return: 生成器，逐块产出 pandas.DataFrame
+    """
+    if is_sharded_dataset(path):
+        for part in _part_paths(path):
+            yield from iter_dataset(part, chunk_size, columns=columns)
+        return
+
+    fmt = get_dataset_format(path)
+
+    if fmt == 'parquet':
+        _require_pyarrow(fmt)
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == 'arrow':
+        _require_pyarrow(fmt)
+        import pyarrow as pa
+        # feather v2 即 Arrow IPC 文件格式，按记录批次读取后再按 chunk_size 切分
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for start in range(0, batch.num_rows, chunk_size):
+                    yield batch.slice(start, chunk_size).to_pandas()
+    elif fmt == 'csv':
+        yield from pd.read_csv(
+            path, usecols=columns, dtype={'text': str}, chunksize=chunk_size,
+            keep_default_na=False, na_values={'is_sensitive': ['']},
+        )
+    elif fmt == 'jsonl':
+        for chunk in pd.read_json(path, lines=True, dtype=False, chunksize=chunk_size):
+            yield chunk[columns] if columns is not None else chunk
+    else:
+        logger.warning(f"⚠️ Excel 不支持流式读取，将整体读入后分块: {path}")
+        df = read_dataset(path, columns=columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+class DatasetWriter:
+    """
+    按块追加写出数据集，格式由扩展名决定，内存中只保留当前块
+    Parquet / Arrow 逐块写入同一个文件的多个 row group / record batch；CSV / JSONL 逐块追加；
+    Excel 不支持追加，会在内存中累积、关闭时一次性写出，累积行数超过 EXCEL_MAX_ROWS 时立即报错；
+    先写入同目录下的临时文件，关闭时再原子改名
+    """
+
+    def __init__(self, path):
+        """
+        :param path: 输出文件路径
+        """
+        self.path = path
+        self.format = get_dataset_format(path)
+        self.rows = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # 临时文件保留原扩展名
+        self._tmp_path = os.path.join(directory, f".tmp-{os.path.basename(path)}")
+        self._writer = None
+        self._file = None
+        self._frames = []
+        if self.format in ('parquet', 'arrow'):
+            _require_pyarrow(self.format)
+        elif self.format in ('csv', 'jsonl'):
+            self._file = open(self._tmp_path, 'w', encoding='utf-8', newline='')
+        else:
+            logger.warning(f"⚠️ Excel 不支持追加写入，将在内存中累积后一次性写出: {path}")
+
+    def write(self, df):
+        """追加写出一块数据"""
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self._tmp_path, table.schema)
+            self._writer.write_table(table)
+        elif self.format == 'arrow':
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pa.ipc.new_file(self._tmp_path, table.schema)
+            self._writer.write_table(table)
+        elif self.format == 'csv':
+            df.to_csv(self._file, index=False, header=self.rows == 0)
+        elif self.format == 'jsonl':
+            if len(df):
+                text = df.to_json(orient='records', lines=True, force_ascii=False)
+                self._file.write(text if text.endswith('\n') else text + '\n')
+        else:
+            # 超出工作表上限的数据无法写出，提前报错，不在内存中继续累积
+            if self.rows + len(df) > EXCEL_MAX_ROWS:
+                raise ValueError(f"Excel 单个工作表最多 {EXCEL_MAX_ROWS} 行数据，请改用 parquet/arrow/csv/jsonl: {self.path}")
+            self._frames.append(df)
+        self.rows += len(df)
+
+    def close(self):
+        """完成写出并把临时文件改名为目标文件"""
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        if self.format == 'excel':
+            write_dataset(pd.concat(self._frames, ignore_index=True), self._tmp_path)
+        elif self.format in ('parquet', 'arrow') and self._writer is None:
+            # 没有写入任何数据块
+            write_dataset(pd.DataFrame({'text': pd.Series(dtype=str), 'is_sensitive': pd.Series(dtype='int64')}),
+                          self._tmp_path)
+        os.replace(self._tmp_path, self.path)
+        logger.debug(f"数据集流式写出完成 ({self.format}): {self.path}, {self.rows} 行")
+
+    def abort(self):
+        """放弃写出并删除临时文件"""
+        for handle in (self._writer, self._file):
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_shuffled(chunks, path, n_buckets, rng, max_buckets=None):
+    """
+    外部洗牌并流式写出：第一遍把每块的行随机分配到 n_buckets 个临时桶文件，
+    第二遍逐个桶读入内存、打乱后追加写出。结果是对全部行的均匀随机排列，内存占用约为 总行数 / n_buckets
+    临时桶文件放在输出文件所在的磁盘上，分桶时每个桶占用一个打开的文件句柄，桶数量不超过 max_buckets
+    Excel 输出本身就在内存中累积全部行，不做分桶
+    :param chunks: 可迭代的 DataFrame 块
+    :param path: 输出文件路径
+    :param n_buckets: 桶数量，为 1 时直接在内存中打乱
+    :param rng: numpy.random.Generator
+    :param max_buckets: 桶数量上限，默认使用 SHUFFLE_MAX_BUCKETS
+    :return: 写出的总行数
+    """
+    max_buckets = max_buckets or SHUFFLE_MAX_BUCKETS
+    with DatasetWriter(path) as writer:
+        if writer.format == 'excel' and n_buckets > 1:
+            logger.warning(f"⚠️ Excel 输出需要在内存中保留全部行，外部洗牌不起作用，建议改用 parquet: {path}")
+            n_buckets = 1
+        elif n_buckets > max_buckets:
+            logger.warning(f"⚠️ 洗牌桶数量 {n_buckets} 超过上限 {max_buckets}，每个桶的行数相应增加")
+            n_buckets = max_buckets
+
+        if n_buckets <= 1:
+            df = pd.concat(list(chunks), ignore_index=True)
+            writer.write(df.iloc[rng.permutation(len(df))])
+            return writer.rows
+
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.TemporaryDirectory(prefix='.shuffle-', dir=directory) as tmp_dir:
+            bucket_paths = [os.path.join(tmp_dir, f"bucket-{i:05d}.pkl") for i in range(n_buckets)]
+            handles = [open(bucket_path, 'wb') for bucket_path in bucket_paths]
+            try:
+                for chunk in chunks:
+                    assignment = rng.integers(0, n_buckets, len(chunk))
+                    order = np.argsort(assignment, kind='stable')
+                    bounds = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_buckets))])
+                    for bucket, handle in enumerate(handles):
+                        if bounds[bucket + 1] > bounds[bucket]:
+                            part = chunk.iloc[order[bounds[bucket]:bounds[bucket + 1]]]
+                            pickle.dump(part, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            finally:
+                for handle in handles:
+                    handle.close()
+
+            for bucket_path in bucket_paths:
+                frames = []
+                with open(bucket_path, 'rb') as f:
+                    while True:
+                        try:
+                            frames.append(pickle.load(f))
+                        except EOFError:
+                            break
+                os.remove(bucket_path)
+                if frames:
+                    bucket = pd.concat(frames, ignore_index=True)
+                    writer.write(bucket.iloc[rng.permutation(len(bucket))].reset_index(drop=True))
+        return writer.rows
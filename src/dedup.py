@@ -0,0 +1,141 @@
+# src/dedup.py
+import zlib
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from config import DEDUP_MINHASH_PERMUTATIONS, DEDUP_LSH_BANDS, DEDUP_NEAR_THRESHOLD, DEDUP_SHINGLE_SIZE
+
+DEDUP_MODES = ('off', 'exact', 'near')
+
+# MinHash 使用的素数模数；CRC32 取模后与系数相乘不超过 2^62，uint64 运算不会溢出
+_PRIME = (1 << 31) - 1
+
+
+def text_keys(texts):
+    """文本的 64 位哈希键（pandas 向量化哈希，碰撞概率可忽略）"""
+    return pd.util.hash_array(np.asarray(texts, dtype=object))
+
+
+def dedup_exact(texts, labels, weights=None):
+    """
+    完全重复去重：(文本, 标签) 相同的样本合并为一条，权重为合并前的权重之和
+    文本相同但标签不同的样本分别保留
+    :return: (texts, labels, weights) 均为 numpy 数组，保持首次出现的顺序
+    """
+    texts = np.asarray(texts, dtype=object)
+    labels = np.asarray(labels)
+    frame = pd.DataFrame({
+        'key': text_keys(texts),
+        'label': labels,
+        'weight': np.ones(len(texts)) if weights is None else np.asarray(weights, dtype=np.float64),
+    })
+    grouped = frame.groupby(['key', 'label'], sort=False)
+    first = np.flatnonzero(grouped.cumcount().to_numpy() == 0)
+    # sort=False 时聚合结果按首次出现的顺序排列，与 first 一一对应
+    return texts[first], labels[first], grouped['weight'].sum().to_numpy()
+
+
+class MinHashDeduplicator:
+    """
+    基于 MinHash + LSH 的近似重复检测
+    文本按字符 shingle 计算 MinHash 签名，签名分成若干 band，任一 band 完全相同的样本成为候选对，
+    候选对的签名相似度（Jaccard 估计值）达到阈值且标签相同时归入同一簇
+    """
+
+    def __init__(self, num_perm=None, bands=None, threshold=None, shingle_size=None, seed=42):
+        """
+        :param num_perm: MinHash 置换数，默认使用 DEDUP_MINHASH_PERMUTATIONS
+        :param bands: LSH band 数（需整除 num_perm），默认使用 DEDUP_LSH_BANDS
+        :param threshold: Jaccard 相似度阈值，默认使用 DEDUP_NEAR_THRESHOLD
+        :param shingle_size: 字符 shingle 长度，默认使用 DEDUP_SHINGLE_SIZE
+        :param seed: 哈希系数的随机种子
+        """
+        self.num_perm = num_perm or DEDUP_MINHASH_PERMUTATIONS
+        self.bands = bands or DEDUP_LSH_BANDS
+        self.threshold = DEDUP_NEAR_THRESHOLD if threshold is None else threshold
+        self.shingle_size = shingle_size or DEDUP_SHINGLE_SIZE
+        if self.num_perm % self.bands:
+            raise ValueError(f"band 数 {self.bands} 不能整除置换数 {self.num_perm}")
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, self.num_perm, dtype=np.uint64)
+        self._band_mult = rng.integers(1, 1 << 63, self.num_perm // self.bands, dtype=np.uint64) | np.uint64(1)
+
+    def _shingles(self, text):
+        k = self.shingle_size
+        grams = {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+        return np.fromiter((zlib.crc32(g.encode('utf-8')) % _PRIME for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signatures(self, texts):
+        """计算 MinHash 签名矩阵 (样本数, 置换数)"""
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            shingles = self._shingles(text)
+            signatures[i] = ((shingles[:, None] * self._a + self._b) % _PRIME).min(axis=0)
+        return signatures
+
+    def cluster(self, texts, labels):
+        """
+        近似重复聚类
+        :return: 每条样本所属簇的代表样本下标
+        """
+        labels = np.asarray(labels)
+        signatures = self.signatures(texts)
+        parent = np.arange(len(texts))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            block = signatures[:, band * rows:(band + 1) * rows]
+            # band 哈希中混入标签，标签不同的样本不会成为候选对
+            keys = (block * self._band_mult).sum(axis=1) ^ (labels.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15))
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            ends = np.r_[starts[1:], len(order)]
+            for start, end in zip(starts, ends):
+                if end - start < 2:
+                    continue
+                head = order[start]
+                for member in order[start + 1:end]:
+                    if np.mean(signatures[head] == signatures[member]) >= self.threshold:
+                        root_head, root_member = find(head), find(member)
+                        if root_head != root_member:
+                            parent[max(root_head, root_member)] = min(root_head, root_member)
+
+        return np.array([find(i) for i in range(len(texts))])
+
+
+def dedup(texts, labels, mode='exact', deduplicator=None):
+    """
+    去重并把重复样本合并为带权重的样本，供训练时通过 sample_weight 使用
+    对 MultinomialNB，按权重训练与在原始重复数据上训练得到的分类器参数完全相同
+    :param mode: off / exact / near（先完全去重，再合并近似重复）
+    :param deduplicator: near 模式使用的 MinHashDeduplicator，默认按配置创建
+    :return: (texts, labels, weights)
+    """
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"不支持的去重方式: {mode}，可选: {DEDUP_MODES}")
+    texts = np.asarray(texts, dtype=object)
+    labels = np.asarray(labels)
+    if mode == 'off':
+        return texts, labels, np.ones(len(texts))
+
+    unique_texts, unique_labels, weights = dedup_exact(texts, labels)
+    logger.info(f"🧹 完全去重: {len(texts)} -> {len(unique_texts)} 条")
+    if mode == 'exact':
+        return unique_texts, unique_labels, weights
+
+    representatives = (deduplicator or MinHashDeduplicator()).cluster(unique_texts, unique_labels)
+    frame = pd.DataFrame({'rep': representatives, 'weight': weights})
+    merged = frame.groupby('rep', sort=True)['weight'].sum()
+    keep = merged.index.to_numpy()
+    logger.info(f"🧹 近似去重: {len(unique_texts)} -> {len(keep)} 条")
+    return unique_texts[keep], unique_labels[keep], merged.to_numpy()
@@ -0,0 +1,183 @@
+# src/fast_path.py
+from collections import Counter
+import threading
+
+from loguru import logger
+import numpy as np
+
+from config import FAST_PATH_MARGIN, FAST_PATH_LENGTH_BOUNDS
+from src.features import DIGIT, LOWER, OTHER, SPACE, UPPER, char_class_counts
+from src.rule_filter import RULE_AMBIGUOUS, RULE_NEGATIVE
+
+# 参与边界学习的统计量，text_stats 返回矩阵的列顺序
+STAT_NAMES = ('length', 'class_entropy', 'whitespace_ratio', 'digit_ratio')
+
+# 各统计量参与判定的方向：字符类别越混杂越像密钥，类别熵只设下界；空白占比只设上界
+BOUND_DIRECTIONS = {
+    'length': ('below', 'above'),
+    'class_entropy': ('below',),
+    'whitespace_ratio': ('above',),
+    'digit_ratio': ('below', 'above'),
+}
+
+# 固定规则的原因标签
+FIXED_REASONS = ('empty', 'punctuation_only')
+
+# 边界随模型一起保存：Pipeline / CompactModel 上的属性名，值为 FastPathFilter.to_dict() 的结果
+MODEL_ATTRIBUTE = 'fast_path_bounds_'
+
+
+def text_stats(texts, counts=None):
+    """
+    批量计算文本统计量
+    字符类别熵只在非空白字符上计算，空白由 whitespace_ratio 单独描述，
+    否则 `KEY = "value"` 这类带空格的写法会因为多出一个类别而被误判为超出范围
+    :param counts: 已计算的字符类别计数矩阵，默认由 char_class_counts 计算
+    :return: (n_texts, len(STAT_NAMES)) 矩阵，列顺序与 STAT_NAMES 一致
+    """
+    counts = char_class_counts(texts) if counts is None else counts
+    lengths = counts.sum(axis=1)
+    visible = np.delete(counts, SPACE, axis=1)
+    p = visible / np.maximum(visible.sum(axis=1), 1)[:, None]
+    log_p = np.log2(p, out=np.zeros_like(p), where=p > 0)
+    stats = np.empty((len(counts), len(STAT_NAMES)))
+    stats[:, 0] = lengths
+    stats[:, 1] = 0.0 - (p * log_p).sum(axis=1)
+    stats[:, 2] = counts[:, SPACE] / np.maximum(lengths, 1)
+    stats[:, 3] = counts[:, DIGIT] / np.maximum(lengths, 1)
+    return stats
+
+
+def _normalize(texts):
+    """学习与判定使用同一种规范化：去掉首尾空白（日志、配置行常带缩进）"""
+    return [text.strip() for text in texts]
+
+
+class FastPathFilter:
+    """
+    基于文本统计量的提前判定
+    - 固定规则：空文本、只含空白与标点的文本直接判为非敏感
+    - 学习边界：在训练集敏感样本上统计长度、字符类别熵、空白占比、数字占比的取值范围，
+      任一统计量超出范围（按 margin 放宽）的文本判为非敏感；长度边界默认只记录不判定，
+      超长的行（如夹带密钥的配置行）交给模型；取值范围退化为单点的统计量（如敏感样本都不含空白）不设边界；
+      判定方向见 BOUND_DIRECTIONS
+    学习与判定都在去掉首尾空白的文本上计算统计量
+    统计量对整个批次向量化计算，每个判定都带有原因标签；
+    边界通过 attach / from_model 随模型一起保存和加载，与模型版本保持一致
+    """
+
+    def __init__(self, bounds=None, margin=None, length_bounds=None):
+        """
+        :param bounds: 已学习的边界 {统计量: [下界, 上界]}，None 表示只使用固定规则
+        :param margin: 边界放宽比例（相对取值范围），默认使用 FAST_PATH_MARGIN
+        :param length_bounds: 是否按长度边界判定，默认使用 FAST_PATH_LENGTH_BOUNDS
+        """
+        self.margin = FAST_PATH_MARGIN if margin is None else margin
+        self.length_bounds = FAST_PATH_LENGTH_BOUNDS if length_bounds is None else length_bounds
+        self._set_bounds(dict(bounds) if bounds else {})
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def _set_bounds(self, bounds):
+        """
+        更新边界并预先计算放宽后的上下界向量
+        未学习的统计量、未启用的长度边界以及取值范围退化（上下界相同）的统计量不设限：
+        单点范围说明训练集没有覆盖该维度的变化，不能据此判定非敏感
+        """
+        self.bounds = bounds
+        self._low = np.full(len(STAT_NAMES), -np.inf)
+        self._high = np.full(len(STAT_NAMES), np.inf)
+        for i, name in enumerate(STAT_NAMES):
+            if name not in bounds or (name == 'length' and not self.length_bounds):
+                continue
+            low, high = bounds[name]
+            if high > low:
+                slack = self.margin * (high - low)
+                if 'below' in BOUND_DIRECTIONS[name]:
+                    self._low[i] = low - slack
+                if 'above' in BOUND_DIRECTIONS[name]:
+                    self._high[i] = high + slack
+        self._reasons = np.array([None, *FIXED_REASONS, *(f'{name}_below' for name in STAT_NAMES),
+                                  *(f'{name}_above' for name in STAT_NAMES)], dtype=object)
+
+    def partial_fit(self, texts, labels):
+        """用一批训练数据扩展敏感样本的统计量范围"""
+        labels = np.asarray(labels)
+        positives = _normalize(text for text, label in zip(texts, labels) if label == 1)
+        if not positives:
+            return self
+        stats = text_stats(positives)
+        bounds = dict(self.bounds)
+        for i, name in enumerate(STAT_NAMES):
+            low, high = float(stats[:, i].min()), float(stats[:, i].max())
+            if name in bounds:
+                low, high = min(low, bounds[name][0]), max(high, bounds[name][1])
+            bounds[name] = [low, high]
+        self._set_bounds(bounds)
+        return self
+
+    def fit(self, texts, labels):
+        """从头学习边界"""
+        self._set_bounds({})
+        return self.partial_fit(texts, labels)
+
+    def classify(self, texts):
+        """
+        批量判定
+        :return: (labels, reasons)，labels 为 int8 数组（0 非敏感 / -1 交给后续阶段），reasons 为原因标签列表（未判定为 None）
+        """
+        if not len(texts):
+            return np.empty(0, dtype=np.int8), []
+
+        normalized = _normalize(texts)
+        counts = char_class_counts(normalized)
+        stats = text_stats(normalized, counts)
+        # 每列一个检查，顺序与 _reasons[1:] 一致；第 0 列恒为 False，argmax 为 0 表示未命中
+        checks = np.zeros((len(texts), len(self._reasons)), dtype=bool)
+        checks[:, 1] = stats[:, 0] == 0
+        checks[:, 2] = counts[:, [LOWER, UPPER, DIGIT, OTHER]].sum(axis=1) == 0
+        n_stats = len(STAT_NAMES)
+        checks[:, 3:3 + n_stats] = stats < self._low
+        checks[:, 3 + n_stats:] = stats > self._high
+
+        first = checks.argmax(axis=1)
+        labels = np.where(first > 0, RULE_NEGATIVE, RULE_AMBIGUOUS).astype(np.int8)
+        reasons = self._reasons[first].tolist()
+
+        with self._lock:
+            self._counts.update(reason or 'ambiguous' for reason in reasons)
+        return labels, reasons
+
+    def info(self):
+        """返回各原因的判定次数与提前判定占比"""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        decided = total - counts.get('ambiguous', 0)
+        return {
+            'total': total,
+            'decided': decided,
+            'decided_rate': round(decided / total, 4) if total else 0.0,
+            'reasons': counts,
+            'bounds': self.bounds,
+        }
+
+    def to_dict(self):
+        """可序列化的边界与放宽比例"""
+        return {'bounds': self.bounds, 'margin': self.margin}
+
+    def attach(self, model):
+        """把边界保存到模型对象上，随模型文件一起序列化"""
+        setattr(model, MODEL_ATTRIBUTE, self.to_dict())
+        return model
+
+    @classmethod
+    def from_model(cls, model, margin=None):
+        """
+        读取模型携带的边界；模型未携带时只使用固定规则
+        :param margin: 覆盖模型中保存的放宽比例
+        """
+        data = getattr(model, MODEL_ATTRIBUTE, None) or {}
+        if not data:
+            logger.debug("模型未携带快速路径边界，只使用固定规则")
+        return cls(data.get('bounds'), data.get('margin') if margin is None else margin)
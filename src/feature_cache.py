@@ -0,0 +1,133 @@
+# src/feature_cache.py
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+from loguru import logger
+import joblib
+import numpy as np
+import scipy.sparse as sp
+import sklearn
+
+from config import FEATURE_CACHE_DIR
+
+# 缓存格式版本，缓存布局变化时递增使旧条目失效
+_CACHE_VERSION = 1
+
+
+def feature_key(dataset_digest, steps, split_params):
+    """
+    特征缓存键：数据集内容哈希 + 特征步骤参数 + 划分参数 + sklearn 版本
+    分词器等对象参数通过 repr 参与计算，ChineseTokenizer 的 repr 包含其全部配置
+    """
+    spec = {
+        'version': _CACHE_VERSION,
+        'sklearn': sklearn.__version__,
+        'dataset': dataset_digest,
+        'steps': [(name, sorted((k, repr(v)) for k, v in step.get_params().items())) for name, step in steps],
+        'split': sorted(split_params.items()),
+    }
+    return hashlib.sha256(json.dumps(spec, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class FeatureCache:
+    """
+    训练数据与特征矩阵的内容寻址缓存
+    - 数据集条目：清洗后的文本（UTF-8 字节 + 偏移量）与标签，按数据文件内容哈希寻址
+    - 特征条目：已拟合的特征步骤与训练集稀疏特征矩阵（CSR 三个数组），按数据集哈希 + 向量化参数寻址
+    数组以 .npy 存储并内存映射读取；条目先写入临时目录再整体改名，中断不会留下不完整的条目
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        :param cache_dir: 缓存目录，默认使用 FEATURE_CACHE_DIR
+        """
+        self.cache_dir = cache_dir or FEATURE_CACHE_DIR
+
+    def _entry_path(self, kind, key):
+        return os.path.join(self.cache_dir, kind, key)
+
+    def _commit(self, tmp_dir, entry_dir):
+        """把临时目录原子改名为缓存条目；并发写入同一条目时保留先完成的那个"""
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _new_tmp_dir(self, kind):
+        tmp_dir = os.path.join(self.cache_dir, kind, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        return tmp_dir
+
+    def load_dataset(self, digest):
+        """
+        读取缓存的清洗后数据集
+        :return: (texts: list[str], labels: np.ndarray) 或 None（未命中）
+        """
+        entry_dir = self._entry_path('datasets', digest)
+        if not os.path.isdir(entry_dir):
+            return None
+        try:
+            offsets = np.load(os.path.join(entry_dir, 'text_offsets.npy'), mmap_mode='r')
+            blob = np.load(os.path.join(entry_dir, 'text_bytes.npy'), mmap_mode='r').tobytes()
+            labels = np.load(os.path.join(entry_dir, 'labels.npy'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ 数据集缓存损坏，将重新读取: {entry_dir} ({e})")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        texts = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+        return texts, labels
+
+    def save_dataset(self, digest, texts, labels):
+        """缓存清洗后的数据集"""
+        encoded = [text.encode('utf-8') for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        tmp_dir = self._new_tmp_dir('datasets')
+        np.save(os.path.join(tmp_dir, 'text_offsets.npy'), offsets)
+        np.save(os.path.join(tmp_dir, 'text_bytes.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        np.save(os.path.join(tmp_dir, 'labels.npy'), np.asarray(labels, dtype=np.int64))
+        self._commit(tmp_dir, self._entry_path('datasets', digest))
+        logger.debug(f"数据集已缓存: {digest[:12]}, {len(encoded)} 行")
+
+    def load_features(self, key):
+        """
+        读取缓存的特征步骤与训练集特征矩阵
+        :return: (steps: list[(name, estimator)], X: scipy.sparse.csr_matrix) 或 None（未命中）
+        """
+        entry_dir = self._entry_path('features', key)
+        if not os.path.isdir(entry_dir):
+            return None
+        try:
+            with open(os.path.join(entry_dir, 'meta.json'), encoding='utf-8') as f:
+                shape = tuple(json.load(f)['shape'])
+            arrays = [np.load(os.path.join(entry_dir, f'{name}.npy'), mmap_mode='r')
+                      for name in ('data', 'indices', 'indptr')]
+            steps = joblib.load(os.path.join(entry_dir, 'steps.joblib'))
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            logger.warning(f"⚠️ 特征缓存损坏，将重新拟合: {entry_dir} ({e})")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        return steps, sp.csr_matrix(tuple(arrays), shape=shape, copy=False)
+
+    def save_features(self, key, steps, X):
+        """缓存已拟合的特征步骤与训练集特征矩阵"""
+        X = sp.csr_matrix(X)
+        tmp_dir = self._new_tmp_dir('features')
+        for name in ('data', 'indices', 'indptr'):
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), getattr(X, name))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'shape': X.shape, 'steps': [name for name, _ in steps]}, f)
+        joblib.dump(steps, os.path.join(tmp_dir, 'steps.joblib'))
+        self._commit(tmp_dir, self._entry_path('features', key))
+        logger.debug(f"特征矩阵已缓存: {key[:12]}, {X.shape}")
+
+    def clear(self):
+        """清空缓存目录"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        logger.info(f"🧹 特征缓存已清空: {self.cache_dir}")
@@ -0,0 +1,227 @@
+# src/features.py
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+# 字符类别：小写字母、大写字母、数字、空白、ASCII 标点与控制字符、其他（中文等非 ASCII 字符）
+LOWER, UPPER, DIGIT, SPACE, PUNCT, OTHER = range(6)
+N_CHAR_CLASSES = 6
+
+# 码点 -> 字符类别查找表，码点截断到 128 后查表，最后一项对应全部非 ASCII 字符
+_CLASS_TABLE = np.full(129, PUNCT, dtype=np.intp)
+_CLASS_TABLE[ord('a'):ord('z') + 1] = LOWER
+_CLASS_TABLE[ord('A'):ord('Z') + 1] = UPPER
+_CLASS_TABLE[ord('0'):ord('9') + 1] = DIGIT
+_CLASS_TABLE[[9, 10, 11, 12, 13, 32]] = SPACE
+_CLASS_TABLE[128] = OTHER
+
+
+def _ascii_table(chars):
+    table = np.zeros(129, dtype=np.float64)
+    table[[ord(c) for c in chars]] = 1.0
+    return table
+
+
+# base64（标准与 URL 安全）与十六进制字符集
+_BASE64_TABLE = _ascii_table('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=-_')
+_HEX_TABLE = _ascii_table('0123456789abcdefABCDEF')
+
+
+def char_codes(texts):
+    """
+    把一批文本拼接为一个码点数组
+    :return: (lengths, codes, rows)，rows 为每个码点所属的文本下标
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.intp, count=len(texts))
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    return lengths, codes, np.repeat(np.arange(len(texts)), lengths)
+
+
+def char_class_counts(texts):
+    """
+    批量统计每条文本各字符类别的数量
+    所有文本拼接后一次编码为 UTF-32 码点数组，查表得到字符类别，再用 bincount 按行计数
+    :return: (n_texts, N_CHAR_CLASSES) int64 矩阵
+    """
+    _, codes, rows = char_codes(texts)
+    classes = _CLASS_TABLE[np.minimum(codes, 128)]
+    counts = np.bincount(rows * N_CHAR_CLASSES + classes, minlength=len(texts) * N_CHAR_CLASSES)
+    return counts.reshape(len(texts), N_CHAR_CLASSES)
+
+
+class StreamingTfidfTransformer(TransformerMixin, BaseEstimator):
+    """
+    可增量拟合的 TF-IDF 加权
+    只累计每个特征列的文档频率，配合 HashingVectorizer 使用时内存与语料词表规模无关；
+    支持 partial_fit 按数据块流式更新 IDF，IDF 计算方式与 TfidfTransformer 一致
+    """
+
+    def __init__(self, use_idf=True, smooth_idf=True, sublinear_tf=False, norm='l2'):
+        self.use_idf = use_idf
+        self.smooth_idf = smooth_idf
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+
+    def fit(self, X, y=None, sample_weight=None):
+        """从头拟合文档频率"""
+        for attr in ('document_frequency_', 'n_samples_seen_', 'idf_'):
+            if hasattr(self, attr):
+                delattr(self, attr)
+        return self.partial_fit(X, y, sample_weight=sample_weight)
+
+    def partial_fit(self, X, y=None, sample_weight=None):
+        """
+        用一个数据块更新文档频率和 IDF
+        :param sample_weight: 样本权重（如去重后合并的重复次数），文档频率与样本数按权重累计
+        """
+        X = sp.csr_matrix(X)
+        X.sum_duplicates()
+        if not hasattr(self, 'document_frequency_'):
+            self.document_frequency_ = np.zeros(X.shape[1], dtype=np.float64 if sample_weight is not None else np.int64)
+            self.n_samples_seen_ = 0
+        elif X.shape[1] != len(self.document_frequency_):
+            raise ValueError(f"特征维度不一致: {X.shape[1]} != {len(self.document_frequency_)}")
+
+        # 规范化的 CSR 每行内列索引唯一，列索引出现次数即文档频率
+        nonzero = X.data != 0
+        if sample_weight is None:
+            self.document_frequency_ += np.bincount(X.indices[nonzero], minlength=X.shape[1])
+            self.n_samples_seen_ += X.shape[0]
+        else:
+            sample_weight = np.asarray(sample_weight, dtype=np.float64)
+            row_weight = np.repeat(sample_weight, np.diff(X.indptr))[nonzero]
+            self.document_frequency_ = self.document_frequency_ + np.bincount(
+                X.indices[nonzero], weights=row_weight, minlength=X.shape[1])
+            self.n_samples_seen_ += float(sample_weight.sum())
+        if self.use_idf:
+            smooth = int(self.smooth_idf)
+            self.idf_ = np.log((self.n_samples_seen_ + smooth) / (self.document_frequency_ + smooth)) + 1
+        return self
+
+    def transform(self, X):
+        X = sp.csr_matrix(X, dtype=np.float64, copy=True)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if self.use_idf:
+            X.data *= self.idf_[X.indices]
+        if self.norm is not None:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+
+def fit_weighted_tfidf(vectorizer, texts, sample_weight):
+    """
+    按样本权重拟合 TfidfVectorizer（TfidfVectorizer.fit 不支持 sample_weight）
+    词频、文档频率与样本数均按权重累计，再按与 sklearn 相同的规则筛选词表（min_df / max_df / max_features）
+    并计算 IDF；权重为整数重复次数时，结果与在展开后的重复数据上直接 fit 相同
+    :param vectorizer: 未拟合的 TfidfVectorizer，原地写入 vocabulary_ 与 idf_
+    :return: 训练样本的 TF-IDF 特征矩阵
+    """
+    sample_weight = np.asarray(sample_weight, dtype=np.float64)
+    count_params = CountVectorizer().get_params()
+    counter = CountVectorizer(**{k: v for k, v in vectorizer.get_params().items() if k in count_params})
+    counter.set_params(max_df=1.0, min_df=1, max_features=None)
+    X = counter.fit_transform(texts).tocsr()
+
+    # 权重为整数时按整数计算，max_features 的并列排序与 sklearn 保持一致
+    integral = np.array_equal(sample_weight, np.round(sample_weight))
+    n_samples = int(sample_weight.sum()) if integral else sample_weight.sum()
+    row_weight = np.repeat(sample_weight, np.diff(X.indptr))
+    term_freq = np.bincount(X.indices, weights=row_weight * X.data, minlength=X.shape[1])
+    doc_freq = np.bincount(X.indices, weights=row_weight, minlength=X.shape[1])
+    if integral:
+        term_freq, doc_freq = np.rint(term_freq).astype(np.int64), np.rint(doc_freq).astype(np.int64)
+
+    max_df, min_df = vectorizer.max_df, vectorizer.min_df
+    high = max_df if isinstance(max_df, (int, np.integer)) else max_df * n_samples
+    low = min_df if isinstance(min_df, (int, np.integer)) else min_df * n_samples
+    mask = (doc_freq <= high) & (doc_freq >= low)
+    limit = vectorizer.max_features
+    if limit is not None and mask.sum() > limit:
+        top = (-term_freq[mask]).argsort()[:limit]
+        limited = np.zeros(len(mask), dtype=bool)
+        limited[np.flatnonzero(mask)[top]] = True
+        mask = limited
+    kept = np.flatnonzero(mask)
+    if len(kept) == 0:
+        raise ValueError("筛选后词表为空，请调低 min_df 或调高 max_df")
+
+    # 保留的列按原词表（字典序）顺序重新编号
+    new_index = np.cumsum(mask) - 1
+    vectorizer.vocabulary_ = {term: int(new_index[i]) for term, i in counter.vocabulary_.items() if mask[i]}
+    X = X[:, kept]
+
+    tfidf = StreamingTfidfTransformer(use_idf=vectorizer.use_idf, smooth_idf=vectorizer.smooth_idf,
+                                      sublinear_tf=vectorizer.sublinear_tf, norm=vectorizer.norm)
+    if vectorizer.use_idf:
+        tfidf.fit(X, sample_weight=sample_weight)
+        vectorizer.idf_ = tfidf.idf_
+    return tfidf.transform(X)
+
+
+class TextStatsFeaturizer(TransformerMixin, BaseEstimator):
+    """
+    字符级统计特征，作为 TF-IDF 之外的数值旁路
+    随机生成的 Token 几乎不会在词表中出现两次，TF-IDF 无法识别，但其字符分布特征明显：
+    - 字符 Shannon 熵（按 max_entropy 归一化）与字符类别切换率
+    - base64 / 十六进制字符占比
+    - 各字符类别占比
+    - 长度分桶（one-hot）
+    整批文本拼接为一个码点数组后向量化计算；无状态，特征均非负，可直接与 MultinomialNB 配合
+    """
+
+    def __init__(self, length_buckets=(8, 16, 24, 32, 48, 64, 128), max_entropy=6.0):
+        """
+        :param length_buckets: 长度分桶的边界
+        :param max_entropy: 熵的归一化上限（比特/字符），超出部分截断为 1
+        """
+        self.length_buckets = length_buckets
+        self.max_entropy = max_entropy
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        # 无状态转换器，无需拟合即可使用
+        return True
+
+    def get_feature_names_out(self, input_features=None):
+        names = ['entropy', 'class_transitions', 'base64_ratio', 'hex_ratio']
+        names += [f'{name}_ratio' for name in ('lower', 'upper', 'digit', 'space', 'punct', 'other')]
+        bounds = [0, *self.length_buckets]
+        names += [f'length_{low}_{high}' for low, high in zip(bounds, bounds[1:])] + [f'length_{bounds[-1]}_plus']
+        return np.asarray(names, dtype=object)
+
+    def transform(self, X):
+        texts = [str(text) for text in X]
+        n = len(texts)
+        lengths, codes, rows = char_codes(texts)
+        safe_lengths = np.maximum(lengths, 1)
+        clipped = np.minimum(codes, 128)
+        classes = _CLASS_TABLE[clipped]
+
+        # 4 项分布特征 + 各字符类别占比 + 长度分桶（含最后一个开区间桶）
+        features = np.zeros((n, 4 + N_CHAR_CLASSES + len(self.length_buckets) + 1))
+        if len(codes):
+            # 字符熵：按 (行, 码点) 计数后按行累加 -p log2 p
+            keys, counts = np.unique((rows.astype(np.int64) << 21) | codes, return_counts=True)
+            key_rows = keys >> 21
+            p = counts / safe_lengths[key_rows]
+            entropy = np.bincount(key_rows, weights=-p * np.log2(p), minlength=n)
+            features[:, 0] = np.minimum(entropy / self.max_entropy, 1.0)
+
+            # 同一行内相邻字符的类别变化次数
+            changed = (classes[1:] != classes[:-1]) & (rows[1:] == rows[:-1])
+            features[:, 1] = np.bincount(rows[1:][changed], minlength=n) / np.maximum(lengths - 1, 1)
+
+            features[:, 2] = np.bincount(rows, weights=_BASE64_TABLE[clipped], minlength=n) / safe_lengths
+            features[:, 3] = np.bincount(rows, weights=_HEX_TABLE[clipped], minlength=n) / safe_lengths
+            class_counts = np.bincount(rows * N_CHAR_CLASSES + classes, minlength=n * N_CHAR_CLASSES)
+            features[:, 4:4 + N_CHAR_CLASSES] = class_counts.reshape(n, N_CHAR_CLASSES) / safe_lengths[:, None]
+
+        buckets = np.searchsorted(np.asarray(self.length_buckets), lengths, side='right')
+        features[np.arange(n), 4 + N_CHAR_CLASSES + buckets] = 1.0
+        return features
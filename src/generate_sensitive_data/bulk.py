@@ -0,0 +1,66 @@
+"""NumPy-based bulk string generation helpers"""
+import base64
+from functools import reduce
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+# 批量生成的结果统一使用 dtype=object 的 NumPy 数组，元素为 Python str，可直接逐元素相加拼接
+
+
+def choice(rng: np.random.Generator, options: Sequence[str], n: int) -> np.ndarray:
+    """从候选列表中有放回地抽取 n 个"""
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), n)]
+
+
+def random_strings(rng: np.random.Generator, alphabet: str, n: int,
+                   length: Union[int, Tuple[int, int]]) -> np.ndarray:
+    """
+    生成 n 个随机字符串，字符从 alphabet（仅限 ASCII）中均匀抽取
+    :param length: 固定长度，或 (最小长度, 最大长度) 闭区间
+    """
+    table = np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)
+    if isinstance(length, int):
+        lengths = np.full(n, length)
+    else:
+        lengths = rng.integers(length[0], length[1] + 1, n)
+
+    out = np.empty(n, dtype=object)
+    # 按长度分组，每组一次抽取 (行数, 长度) 的字符矩阵，再按定长字节串视图整体转换为字符串
+    for size in np.unique(lengths):
+        rows = np.flatnonzero(lengths == size)
+        codes = table[rng.integers(0, len(table), (len(rows), size))]
+        out[rows] = np.ascontiguousarray(codes).view(f'S{size}').ravel().astype(f'U{size}').astype(object)
+    return out
+
+
+def random_numbers(rng: np.random.Generator, low: int, high: int, n: int) -> np.ndarray:
+    """生成 n 个 [low, high] 闭区间内随机整数的字符串形式"""
+    return rng.integers(low, high + 1, n).astype(str).astype(object)
+
+
+def concat(*parts) -> np.ndarray:
+    """逐元素拼接若干字符串数组或常量字符串"""
+    return reduce(np.add, [np.asarray(part, dtype=object) if not isinstance(part, str) else part
+                           for part in parts])
+
+
+def b64url(strings: np.ndarray) -> np.ndarray:
+    """URL 安全、不带 padding 的 base64 编码"""
+    return np.array([base64.urlsafe_b64encode(s.encode()).rstrip(b'=').decode() for s in strings],
+                    dtype=object)
+
+
+def fill_by_kind(rng: np.random.Generator, n: int, builders: Sequence, weights: Sequence[float] = None) -> np.ndarray:
+    """
+    按权重为每一行抽取一种构造方式，各构造方式对自己负责的行批量生成
+    :param builders: 可调用对象列表，签名为 builder(count) -> np.ndarray
+    :param weights: 各构造方式的概率，默认均匀
+    """
+    kinds = rng.choice(len(builders), size=n, p=weights)
+    out = np.empty(n, dtype=object)
+    for kind, builder in enumerate(builders):
+        rows = np.flatnonzero(kinds == kind)
+        if len(rows):
+            out[rows] = builder(len(rows))
+    return out
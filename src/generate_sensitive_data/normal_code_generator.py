@@ -2,8 +2,11 @@
 import random
 from typing import List
 
+import numpy as np
 from loguru import logger
 
+from .bulk import choice, fill_by_kind
+
 
 class NormalCodeGenerator:
     """
@@ -11,17 +14,9 @@ class NormalCodeGenerator:
     每条输出为一行常见代码语句，用于模拟正常开发内容
     """
 
-    def __init__(self, count: int = 1000):
-        self.count = count
-        self.languages = {
-            'python': self._generate_python,
-            'java': self._generate_java,
-            'c': self._generate_c,
-            'cpp': self._generate_cpp,
-        }
-
-    def _generate_python(self) -> str:
-        return random.choice([
+    # 各语言的常见代码行
+    SNIPPETS = {
+        'python': [
             'def hello_world():',
             'print("Hello, World!")',
             'import os',
@@ -37,10 +32,8 @@ class NormalCodeGenerator:
             'self.name = name',
             'data = [x for x in range(100)]',
             'logging.info("Process started")',
-        ])
-
-    def _generate_java(self) -> str:
-        return random.choice([
+        ],
+        'java': [
             'public class Main {',
             'public static void main(String[] args) {',
             'System.out.println("Hello, World!");',
@@ -56,10 +49,8 @@ class NormalCodeGenerator:
             '@Override',
             'import java.util.List;',
             'public class UserService {',
-        ])
-
-    def _generate_c(self) -> str:
-        return random.choice([
+        ],
+        'c': [
             '#include <stdio.h>',
             'int main() {',
             'printf("Hello, World\\n");',
@@ -75,10 +66,8 @@ class NormalCodeGenerator:
             'char buffer[256];',
             'fclose(fp);',
             'return -1;',
-        ])
-
-    def _generate_cpp(self) -> str:
-        return random.choice([
+        ],
+        'cpp': [
             '#include <iostream>',
             'using namespace std;',
             'class Animal {',
@@ -94,7 +83,29 @@ class NormalCodeGenerator:
             '} catch (const std::exception& e) {',
             'unique_ptr<Resource> res;',
             'shared_mutex mutex;',
-        ])
+        ],
+    }
+
+    def __init__(self, count: int = 1000):
+        self.count = count
+        self.languages = {
+            'python': self._generate_python,
+            'java': self._generate_java,
+            'c': self._generate_c,
+            'cpp': self._generate_cpp,
+        }
+
+    def _generate_python(self) -> str:
+        return random.choice(self.SNIPPETS['python'])
+
+    def _generate_java(self) -> str:
+        return random.choice(self.SNIPPETS['java'])
+
+    def _generate_c(self) -> str:
+        return random.choice(self.SNIPPETS['c'])
+
+    def _generate_cpp(self) -> str:
+        return random.choice(self.SNIPPETS['cpp'])
 
     def generate(self) -> List[str]:
         logger.info(f"🔄 开始生成正常代码片段（非敏感），目标 {self.count} 条...")
@@ -106,4 +117,9 @@ class NormalCodeGenerator:
             code_lines.append(line)
 
         logger.success(f"✅ 正常代码片段生成完成，共 {len(code_lines)} 条")
-        return code_lines
\ No newline at end of file
+        return code_lines
+
+    def generate_bulk(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """用 NumPy 随机数批量生成 n 条：先均匀抽取语言，再在该语言的代码行中均匀抽取"""
+        builders = [lambda m, lang=lang: choice(rng, self.SNIPPETS[lang], m) for lang in self.languages]
+        return fill_by_kind(rng, n, builders)
@@ -1,7 +1,11 @@
 import random
 from typing import List
+
+import numpy as np
 from loguru import logger
 
+from .bulk import choice, concat, fill_by_kind
+
 
 class NormalTextGenerator:
     """
@@ -87,3 +91,28 @@ class NormalTextGenerator:
 
         logger.success(f"✅ 英文普通字符串生成完成，共 {len(texts)} 条")
         return texts
+
+    def generate_bulk(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """用 NumPy 随机数批量生成 n 条，构造方式与 generate 相同"""
+        subjects = np.asarray(self.subjects, dtype=object)
+        capitalized = np.asarray([s.capitalize() for s in self.subjects], dtype=object)
+
+        def variable_names(m):
+            subject = rng.integers(0, len(subjects), m)
+            adj = choice(rng, self.adjectives, m)
+            suffix = np.where(rng.random(m) > 0.7, choice(rng, self.suffixes, m), '')
+            # lower 与 snake 风格的结果相同（词表本身均为小写）
+            base = np.where(rng.integers(0, 3, m) == 1, adj + capitalized[subject], adj + '_' + subjects[subject])
+            return base.astype(object) + suffix.astype(object)
+
+        builders = [
+            variable_names,
+            lambda m: concat(choice(rng, self.verbs, m), choice(rng, list(capitalized), m),
+                             choice(rng, ['()', '(id)', '(data, timeout)', '(config)'], m)),
+            lambda m: concat(choice(rng, list(capitalized), m), ' ', choice(rng, self.log_actions, m)),
+            lambda m: choice(rng, self.comments, m),
+            lambda m: concat('// ', choice(rng, self.comments, m)),
+            lambda m: concat('# ', choice(rng, self.comments, m)),
+            lambda m: concat('LOG: ', choice(rng, [a.capitalize() for a in self.adjectives], m), ' state detected.'),
+        ]
+        return fill_by_kind(rng, n, builders)
@@ -2,12 +2,27 @@
 import base64
 import json
 import random
+import re
 import string
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List
 
+import numpy as np
 from loguru import logger
 
+from .bulk import b64url, choice, concat, fill_by_kind, random_numbers, random_strings
+
+# base64url 字符集（JWT 各段使用）
+B64URL_CLASS = '[A-Za-z0-9_-]'
+
+# 规则中凭据键名在关键字前后允许的最大字符数
+KEY_AFFIX_MAX = 64
+
+
+def char_class(chars: str) -> str:
+    """把字符集转换为正则字符类"""
+    return '[' + re.escape(chars) + ']'
+
 
 class PasswordStyle(ABC):
     """弱密码风格抽象基类"""
@@ -16,6 +31,21 @@ class PasswordStyle(ABC):
     def generate(self) -> List[str]:
         pass
 
+    def generate_bulk(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        用 NumPy 随机数批量生成 n 条
+        默认从 generate() 的结果中有放回抽样（排序后抽样，保证同一种子结果一致），子类可覆盖为真正的批量构造
+        """
+        return choice(rng, sorted(set(self.generate())), n)
+
+    def rule_patterns(self) -> Dict[str, str]:
+        """规则预过滤使用的正则（整串匹配），键为规则名；默认没有"""
+        return {}
+
+    def rule_literals(self) -> Dict[str, List[str]]:
+        """规则预过滤使用的字面量（整串精确匹配），键为规则名；默认没有"""
+        return {}
+
 
 class CommonWeakPassword(PasswordStyle):
     """通用弱密码，支持指定生成数量"""
@@ -38,6 +68,9 @@ class CommonWeakPassword(PasswordStyle):
         passwords = passwords[:self.count]  # 截取指定数量
         return passwords
 
+    def generate_bulk(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        return choice(rng, self.patterns, n)
+
 
 class HuaweiStylePassword(PasswordStyle):
     """华为相关弱密码，支持指定生成数量"""
@@ -49,7 +82,7 @@ class HuaweiStylePassword(PasswordStyle):
                          '147', '369', '258', '963', '741', '123', '456']
         self.specials = ['@123', '@369', '#123', '!123', '.123', '_123', '@132', '.456']
 
-    def generate(self) -> List[str]:
+    def _candidates(self) -> set:
         passwords = set()
         transformations = [str.lower, str.upper, str.capitalize, lambda x: x]
 
@@ -81,9 +114,11 @@ class HuaweiStylePassword(PasswordStyle):
             'Hw@123', 'hw#123', 'hu@wei123', '123huawei', '456huawei'
         ]
         passwords.update(common_combinations)
+        return passwords
 
+    def generate(self) -> List[str]:
         # 转为列表并重复填充至 count
-        passwords = list(passwords)
+        passwords = list(self._candidates())
         while len(passwords) < self.count:
             passwords.extend(passwords)
         passwords = passwords[:self.count]
@@ -91,6 +126,9 @@ class HuaweiStylePassword(PasswordStyle):
         logger.debug(f"✅ 生成华为风格弱密码 {len(passwords)} 条")
         return passwords
 
+    def generate_bulk(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        return choice(rng, sorted(self._candidates()), n)
+
 
 class DjangoTokenStylePassword(PasswordStyle):
     """
@@ -121,6 +159,10 @@ class DjangoTokenStylePassword(PasswordStyle):
         logger.success(f"✅ Django Token 风格生成完成，共 {len(tokens)} 条")
         return list(tokens)
 
+    def generate_bulk(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        return concat(random_numbers(rng, self.user_id_min, self.user_id_max, n), '!',
+                      random_strings(rng, self.chars, n, (12, 20)))
+
 
 class TokenStylePassword(PasswordStyle):
     """
@@ -212,3 +254,57 @@ class TokenStylePassword(PasswordStyle):
 
         logger.success(f"✅ 多种 Token 风格生成完成，共 {len(tokens)} 条")
         return list(tokens)
+
+    def generate_bulk(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """批量生成，三类 Token 的比例与 generate 相同"""
+        hex_chars, chars = self.hex_chars, self.chars
+
+        traditional = [
+            lambda m: random_strings(rng, hex_chars, m, 32),
+            lambda m: random_strings(rng, chars, m, 32),
+            lambda m: concat(random_strings(rng, hex_chars, m, 8), '-', random_strings(rng, hex_chars, m, 4), '-',
+                             random_strings(rng, hex_chars, m, 4), '-', random_strings(rng, hex_chars, m, 4), '-',
+                             random_strings(rng, hex_chars, m, 12)),
+        ]
+        headers = [self._b64_encode({"alg": alg, "typ": "JWT"}) for alg in ["HS256", "HS512", "RS256"]]
+
+        def jwt(m):
+            # 与 json.dumps(separators=(',', ':')) 的输出逐字一致
+            payload = concat('{"sub":"', random_strings(rng, chars, m, (8, 16)),
+                             '","exp":', random_numbers(rng, 1700000000, 2000000000, m),
+                             ',"iat":', random_numbers(rng, 1600000000, 1700000000, m),
+                             ',"jti":"', random_strings(rng, chars, m, 16),
+                             '","scope":"', choice(rng, ["read", "write", "admin", "user"], m), '"}')
+            return concat(choice(rng, headers, m), '.', b64url(payload), '.', random_strings(rng, chars, m, 43))
+
+        oauth = [
+            lambda m: random_strings(rng, chars, m, 32),
+            lambda m: random_strings(rng, chars, m, 40),
+            lambda m: random_strings(rng, chars, m, 64),
+            lambda m: concat('token_', random_strings(rng, chars, m, 24)),
+            lambda m: concat('access_', random_strings(rng, chars, m, 32)),
+            lambda m: concat('oauth2:', random_strings(rng, chars, m, 30)),
+            lambda m: concat('sk-', random_strings(rng, chars, m, 32)),
+        ]
+        return fill_by_kind(rng, n, [
+            lambda m: fill_by_kind(rng, m, traditional),
+            jwt,
+            lambda m: fill_by_kind(rng, m, oauth),
+        ], weights=[0.3, 0.4, 0.3])
+
+    def rule_patterns(self) -> Dict[str, str]:
+        """
+        只保留格式足够独特、不会与普通文本混淆的形状；裸十六进制串、随机字符串和裸 UUID
+        （常见于请求 ID、提交哈希）交给模型判断
+        """
+        h, c = char_class(self.hex_chars), char_class(self.chars)
+        uuid = f'{h}{{8}}-{h}{{4}}-{h}{{4}}-{h}{{4}}-{h}{{12}}'
+        return {
+            'jwt': rf'eyJ{B64URL_CLASS}+\.eyJ{B64URL_CLASS}+\.{B64URL_CLASS}+',
+            'prefixed_token': f'(?:token_{c}{{24}}|access_{c}{{32}}|oauth2:{c}{{30}}|sk-{c}{{32}})',
+            # UUID 只在键名像凭据的 key=value / key: value 上下文中判定，如 api_key="<uuid>"；
+            # 键名两侧限定长度，避免长行整串匹配时回溯次数随行长平方增长
+            'uuid_credential': rf'(?i:[\w.-]{{0,{KEY_AFFIX_MAX}}}(?:token|secret|key|passw(?:or)?d|pwd|auth|credential)'
+                               rf'[\w.-]{{0,{KEY_AFFIX_MAX}}})'
+                               rf'\s*[:=]\s*["\']?{uuid}["\']?',
+        }
@@ -1,25 +1,59 @@
 """Main sensitive data generator"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import glob
 import os
 import random
-from typing import List
+import time
+from typing import Iterator, List
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
-from config import GENERATE_DATA_PATH
+from config import (
+    GENERATE_DATA_PATH, GENERATE_SENSITIVE_RATIO, GENERATE_CODE_RATIO, GENERATE_SEED, GENERATE_BATCH_SIZE,
+    GENERATE_N_JOBS, GENERATE_PART_FORMAT, GENERATE_SHUFFLE_BUFFER_ROWS
+)
+from src.dataset_io import (
+    DatasetWriter, EXCEL_MAX_ROWS, MANIFEST_NAME, file_digest, get_dataset_format, write_dataset, write_manifest,
+    write_shuffled
+)
+from .bulk import fill_by_kind
 from .password_style import PasswordStyle
 from .normal_text_generator import NormalTextGenerator
 from .normal_code_generator import NormalCodeGenerator
 
+# 分片文件扩展名
+PART_EXTENSIONS = {'parquet': '.parquet', 'jsonl': '.jsonl', 'csv': '.csv', 'arrow': '.arrow'}
+
+
+def _write_shard(generator, plan: dict, index: int, output_dir: str, part_format: str) -> dict:
+    """在工作进程中生成并写出一个分片，先写临时文件再改名"""
+    started = time.perf_counter()
+    name = f"part-{index:05d}{PART_EXTENSIONS[part_format]}"
+    path = os.path.join(output_dir, name)
+    df = generator.build_bulk_batch(plan, index)
+    tmp_path = os.path.join(output_dir, f".tmp-{name}")
+    write_dataset(df, tmp_path)
+    os.replace(tmp_path, path)
+    return {
+        'file': name,
+        'rows': len(df),
+        'sensitive': int(df['is_sensitive'].sum()),
+        'sha256': file_digest(path),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
 
 class SensitiveDataGenerator:
     """敏感数据生成器主类"""
 
-    def __init__(self, output_path: str):
+    def __init__(self, output_path: str, normal_text_count: int = 1000, normal_code_count: int = 5000):
         self.output_path = output_path
         self.password_styles: List[PasswordStyle] = []
-        self.normal_text_generator = NormalTextGenerator(count=1000)  # 统一在 __init__ 中传 count
-        self.normal_code_generator = NormalCodeGenerator(count=5000)  # ✅ 添加代码生成器
+        self.normal_text_generator = NormalTextGenerator(count=normal_text_count)  # 统一在 __init__ 中传 count
+        self.normal_code_generator = NormalCodeGenerator(count=normal_code_count)  # ✅ 添加代码生成器
         self._ensure_dir()
 
     def _ensure_dir(self):
@@ -59,33 +93,208 @@ class SensitiveDataGenerator:
         logger.success(f"✅ 弱密码生成完成，共 {len(all_passwords)} 条")
         return list(all_passwords)
 
-    def generate_dataset(self):
+    def _dataset_sources(self, weak_password_count: int = 1000):
+        """生成原有方式的三类样本：弱密码（敏感）、正常文本、正常代码，返回 [(文本列表, 标签)]"""
+        weak_passwords = self.generate_weak_passwords(target_count=weak_password_count)
+        normal_texts = self.normal_text_generator.generate()
+        normal_codes = self.normal_code_generator.generate()  # ✅ 获取代码片段
+
+        logger.info(f"📊 总样本数: {len(weak_passwords) + len(normal_texts) + len(normal_codes)}")
+        logger.info(f"🔴 弱密码 (1): {len(weak_passwords)} 条")
+        logger.info(f"🟢 正常文本 (0): {len(normal_texts)} 条")
+        logger.info(f"🟢 正常代码 (0): {len(normal_codes)} 条")
+        return [(weak_passwords, 1), (normal_texts, 0), (normal_codes, 0)]  # ✅ 代码为非敏感
+
+    @staticmethod
+    def _source_chunks(sources) -> Iterator[pd.DataFrame]:
+        """逐类样本构建 DataFrame 块，不拼出完整数据集"""
+        for texts, label in sources:
+            yield pd.DataFrame({'text': texts, 'is_sensitive': np.full(len(texts), label, dtype=np.int64)})
+
+    def build_dataset(self, weak_password_count: int = 1000) -> pd.DataFrame:
+        """生成打乱后的数据集（不写文件）"""
+        df = pd.concat(list(self._source_chunks(self._dataset_sources(weak_password_count))), ignore_index=True)
+        return df.sample(frac=1, random_state=42).reset_index(drop=True)
+
+    def generate_dataset(self, weak_password_count: int = 1000, shuffle_buffer_rows: int = None):
+        """
+        按原有方式生成数据集并写入 output_path
+        与批量模式共用 write_shuffled：逐类样本分块写出并做（必要时借助磁盘的）外部洗牌，
+        内存中不构建完整的 DataFrame
+        :param shuffle_buffer_rows: 洗牌时内存中最多保留的行数，默认使用 GENERATE_SHUFFLE_BUFFER_ROWS
+        """
         logger.info(f"🚀 开始生成敏感数据集: {self.output_path}")
 
         try:
-            weak_passwords = self.generate_weak_passwords(target_count=1000)
-            normal_texts = self.normal_text_generator.generate()
-            normal_codes = self.normal_code_generator.generate()  # ✅ 获取代码片段
-
-            data = []
-            for text in weak_passwords:
-                data.append({'text': text, 'is_sensitive': 1})
-            for text in normal_texts:
-                data.append({'text': text, 'is_sensitive': 0})
-            for code in normal_codes:
-                data.append({'text': code, 'is_sensitive': 0})  # ✅ 非敏感
-
-            df = pd.DataFrame(data)
-            df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-
-            df.to_excel(self.output_path, index=False)
+            sources = self._dataset_sources(weak_password_count)
+            n_rows = sum(len(texts) for texts, _ in sources)
+            n_buckets = -(-n_rows // (shuffle_buffer_rows or GENERATE_SHUFFLE_BUFFER_ROWS))
+            rng = np.random.default_rng(GENERATE_SEED)
+            write_shuffled(self._source_chunks(sources), self.output_path, n_buckets, rng)
             logger.success(f"🎉 敏感数据集生成成功！")
-            logger.info(f"📊 总样本数: {len(df)}")
-            logger.info(f"🔴 弱密码 (1): {len(weak_passwords)} 条")
-            logger.info(f"🟢 正常文本 (0): {len(normal_texts)} 条")
-            logger.info(f"🟢 正常代码 (0): {len(normal_codes)} 条")
             logger.info(f"📁 文件保存路径: {self.output_path}")
 
         except Exception as e:
             logger.exception(f"❌ 生成数据失败: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _build_bulk_batch(self, n_sensitive: int, n_text: int, n_code: int, rng: np.random.Generator) -> pd.DataFrame:
+        """批量生成一批打乱后的数据，敏感样本在已添加的密码风格之间均匀分配"""
+        builders = [lambda m, style=style: style.generate_bulk(m, rng) for style in self.password_styles]
+        texts = np.concatenate([
+            fill_by_kind(rng, n_sensitive, builders),
+            self.normal_text_generator.generate_bulk(n_text, rng),
+            self.normal_code_generator.generate_bulk(n_code, rng),
+        ])
+        labels = np.repeat(np.array([1, 0], dtype=np.int64), [n_sensitive, n_text + n_code])
+        order = rng.permutation(len(texts))
+        return pd.DataFrame({'text': texts[order], 'is_sensitive': labels[order]})
+
+    def _bulk_plan(self, n_rows: int, sensitive_ratio: float = None, code_ratio: float = None,
+                   seed: int = None, batch_size: int = None) -> dict:
+        """批量生成的参数与各类样本总数，供逐批生成时独立计算每批的行数和随机数流"""
+        if not self.password_styles:
+            raise ValueError("未添加任何密码风格，无法生成敏感样本")
+        sensitive_ratio = GENERATE_SENSITIVE_RATIO if sensitive_ratio is None else sensitive_ratio
+        code_ratio = GENERATE_CODE_RATIO if code_ratio is None else code_ratio
+        batch_size = batch_size or GENERATE_BATCH_SIZE
+        total_sensitive = round(n_rows * sensitive_ratio)
+        return {
+            'n_rows': n_rows,
+            'sensitive_ratio': sensitive_ratio,
+            'code_ratio': code_ratio,
+            'seed': GENERATE_SEED if seed is None else seed,
+            'batch_size': batch_size,
+            'n_batches': -(-n_rows // batch_size),
+            'total_sensitive': total_sensitive,
+            'total_code': round((n_rows - total_sensitive) * code_ratio),
+        }
+
+    def build_bulk_batch(self, plan: dict, index: int) -> pd.DataFrame:
+        """
+        生成第 index 批数据，只依赖 plan 与批次号，可在任意进程中独立计算
+        随机数流为 SeedSequence(seed, spawn_key=(index,))，与 SeedSequence(seed).spawn 派生的第 index 个子序列相同；
+        各类样本按行号比例分配到各批，总数精确等于按比例计算的结果
+        """
+        n_rows, total_sensitive, total_code = plan['n_rows'], plan['total_sensitive'], plan['total_code']
+        total_normal = n_rows - total_sensitive
+
+        def sensitive_before(row):
+            return total_sensitive * row // n_rows
+
+        def code_before(normal_row):
+            return total_code * normal_row // total_normal if total_normal else 0
+
+        start, end = index * plan['batch_size'], min(n_rows, (index + 1) * plan['batch_size'])
+        n_sensitive = sensitive_before(end) - sensitive_before(start)
+        n_code = code_before(end - sensitive_before(end)) - code_before(start - sensitive_before(start))
+        n_text = end - start - n_sensitive - n_code
+        rng = np.random.default_rng(np.random.SeedSequence(plan['seed'], spawn_key=(index,)))
+        return self._build_bulk_batch(n_sensitive, n_text, n_code, rng)
+
+    def iter_bulk_batches(self, n_rows: int, sensitive_ratio: float = None, code_ratio: float = None,
+                          seed: int = None, batch_size: int = None) -> Iterator[pd.DataFrame]:
+        """
+        用 NumPy 随机数分批生成 n_rows 行，每批为一个打乱后的 DataFrame
+        各批次的随机数流互相独立，同一种子与批大小得到完全相同的数据
+        :param sensitive_ratio: 敏感样本占比，默认使用 GENERATE_SENSITIVE_RATIO
+        :param code_ratio: 非敏感样本中代码片段的占比，默认使用 GENERATE_CODE_RATIO
+        :param seed: 随机种子，默认使用 GENERATE_SEED
+        :param batch_size: 每批行数，默认使用 GENERATE_BATCH_SIZE
+        """
+        plan = self._bulk_plan(n_rows, sensitive_ratio, code_ratio, seed, batch_size)
+        for index in range(plan['n_batches']):
+            yield self.build_bulk_batch(plan, index)
+
+    def build_dataset_bulk(self, n_rows: int, **kwargs) -> pd.DataFrame:
+        """批量生成 n_rows 行的完整数据集，参数同 iter_bulk_batches"""
+        return pd.concat(list(self.iter_bulk_batches(n_rows, **kwargs)), ignore_index=True)
+
+    def generate_dataset_bulk(self, n_rows: int, shuffle: bool = True, shuffle_buffer_rows: int = None, **kwargs):
+        """
+        批量生成 n_rows 行并流式写入 output_path，适合生成百万到千万行的压测语料
+        逐批生成、逐批写出，不在内存中拼出完整的 DataFrame，数据规模只受磁盘限制；
+        各批内部已打乱，shuffle=True 时再做跨批次的外部洗牌（见 write_shuffled），内存占用约为 shuffle_buffer_rows 行
+        :param shuffle: 是否跨批次洗牌
+        :param shuffle_buffer_rows: 洗牌时内存中最多保留的行数，默认使用 GENERATE_SHUFFLE_BUFFER_ROWS
+        :param kwargs: sensitive_ratio / code_ratio / seed / batch_size，同 iter_bulk_batches
+        """
+        logger.info(f"🚀 开始批量生成数据集: {self.output_path}, {n_rows} 行")
+        # Excel 在内存中累积全部行且有行数上限，超出时在生成前报错
+        if get_dataset_format(self.output_path) == 'excel' and n_rows > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel 单个工作表最多 {EXCEL_MAX_ROWS} 行数据，请改用 parquet/arrow/csv/jsonl: {self.output_path}")
+
+        try:
+            plan = self._bulk_plan(n_rows, **kwargs)
+            chunks = (self.build_bulk_batch(plan, index) for index in range(plan['n_batches']))
+            if shuffle:
+                n_buckets = -(-n_rows // (shuffle_buffer_rows or GENERATE_SHUFFLE_BUFFER_ROWS))
+                # 洗牌使用批次之后的下一个独立随机数流
+                rng = np.random.default_rng(np.random.SeedSequence(plan['seed'], spawn_key=(plan['n_batches'],)))
+                rows = write_shuffled(chunks, self.output_path, n_buckets, rng)
+            else:
+                with DatasetWriter(self.output_path) as writer:
+                    for chunk in chunks:
+                        writer.write(chunk)
+                rows = writer.rows
+
+            logger.success(f"🎉 数据集生成成功！")
+            logger.info(f"📊 总样本数: {rows}，敏感 (1): {plan['total_sensitive']} 条")
+            logger.info(f"📁 文件保存路径: {self.output_path}")
+
+        except Exception as e:
+            logger.exception(f"❌ 生成数据失败: {e}")
+            raise
+
+    def generate_dataset_sharded(self, output_dir: str, n_rows: int, part_format: str = None, n_jobs: int = None,
+                                 **kwargs) -> dict:
+        """
+        分片并行生成：每批（batch_size 行）作为一个分片，由进程池并行生成并各自写出分片文件，最后写出清单
+        分片内容只取决于种子、总行数和分片大小，与进程数无关，结果可复现；
+        生成的目录可直接作为 read_dataset / iter_dataset / train_model.py --data 的输入
+        :param output_dir: 输出目录
+        :param part_format: 分片文件格式（parquet / jsonl / csv / arrow），默认使用 GENERATE_PART_FORMAT
+        :param n_jobs: 并行进程数，默认使用 GENERATE_N_JOBS
+        :param kwargs: sensitive_ratio / code_ratio / seed / batch_size，同 iter_bulk_batches
+        :return: 清单 dict
+        """
+        part_format = part_format or GENERATE_PART_FORMAT
+        if part_format not in PART_EXTENSIONS:
+            raise ValueError(f"不支持的分片格式: {part_format}，可选: {list(PART_EXTENSIONS)}")
+        n_jobs = n_jobs or GENERATE_N_JOBS
+        plan = self._bulk_plan(n_rows, **kwargs)
+
+        # 先删除旧清单和旧分片，中途失败时目录中不会留下看似完整的数据集
+        os.makedirs(output_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(output_dir, MANIFEST_NAME)) + glob.glob(os.path.join(output_dir, 'part-*')):
+            os.remove(stale)
+
+        logger.info(f"🚀 开始分片生成数据集: {output_dir}, {n_rows} 行, {plan['n_batches']} 个分片, {n_jobs} 进程")
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [executor.submit(_write_shard, self, plan, index, output_dir, part_format)
+                           for index in range(plan['n_batches'])]
+                parts = []
+                for future in futures:
+                    parts.append(future.result())
+                    logger.debug(f"   → 分片 {parts[-1]['file']} 完成: {parts[-1]['rows']} 行, {parts[-1]['seconds']} 秒")
+        except Exception as e:
+            logger.exception(f"❌ 分片生成失败: {e}")
+            raise
+
+        manifest = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'n_rows': n_rows,
+            'seed': plan['seed'],
+            'shard_size': plan['batch_size'],
+            'sensitive_ratio': plan['sensitive_ratio'],
+            'code_ratio': plan['code_ratio'],
+            'part_format': part_format,
+            'parts': parts,
+        }
+        write_manifest(output_dir, manifest)
+        logger.success(f"🎉 分片数据集生成成功！用时 {time.perf_counter() - started:.1f} 秒")
+        logger.info(f"📊 总样本数: {n_rows}，敏感 (1): {sum(p['sensitive'] for p in parts)} 条")
+        logger.info(f"📁 清单文件: {os.path.join(output_dir, MANIFEST_NAME)}")
+        return manifest
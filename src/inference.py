@@ -0,0 +1,203 @@
+# src/inference.py
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import FeatureUnion
+from sklearn.utils import murmurhash3_32
+
+from src.features import StreamingTfidfTransformer, TextStatsFeaturizer
+
+
+def nb_predict_proba(rows, columns, n_rows, feature_log_prob, class_log_prior,
+                     idf=None, norm='l2', sublinear_tf=False, binary=False, dense=None, dense_log_prob=None,
+                     feature_scale=None):
+    """
+    TF-IDF 加权、归一化与朴素贝叶斯对数概率累加的向量化内核，不构造稀疏矩阵
+    由于归一化只是按行缩放，先按行累加未归一化的 w * log P(词|类) 与行范数，最后一次相除即可
+    :param rows: 每个词项所在的样本行
+    :param columns: 每个词项的特征列，同一 (行, 列) 重复出现的次数即词频
+    :param n_rows: 样本数
+    :param feature_log_prob: (n_classes, n_features) 对数条件概率
+    :param class_log_prior: (n_classes,) 类别对数先验
+    :param idf: (n_features,) IDF，None 表示不加权
+    :param dense: (n_rows, n_dense) 拼接在词项特征之后的稠密特征（如字符统计特征），None 表示没有
+    :param dense_log_prob: (n_classes, n_dense) 稠密特征的对数条件概率，已乘以特征权重
+    :param feature_scale: (n_classes,) feature_log_prob 为 int8 量化值时每个类别的缩放系数
+    :return: (n_rows, n_classes) 类别概率
+    """
+    n_classes, n_features = feature_log_prob.shape
+    jll = np.zeros((n_rows, n_classes))
+    if len(columns):
+        keys, tf = np.unique(rows.astype(np.int64) * n_features + columns, return_counts=True)
+        rows, columns = np.divmod(keys, n_features)
+        weights = np.ones(len(tf)) if binary else tf.astype(np.float64)
+        if sublinear_tf:
+            np.log(weights, weights)
+            weights += 1.0
+        if idf is not None:
+            weights *= idf[columns]
+
+        contributions = feature_log_prob[:, columns] * weights
+        for k in range(n_classes):
+            jll[:, k] = np.bincount(rows, weights=contributions[k], minlength=n_rows)
+        if feature_scale is not None:
+            jll *= feature_scale
+
+        if norm is not None:
+            if norm == 'l2':
+                row_norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_rows))
+            else:
+                row_norms = np.bincount(rows, weights=np.abs(weights), minlength=n_rows)
+            row_norms[row_norms == 0] = 1.0
+            jll /= row_norms[:, None]
+
+    if dense is not None:
+        jll += dense @ dense_log_prob.T
+    jll += class_log_prior
+    jll -= jll.max(axis=1, keepdims=True)
+    np.exp(jll, jll)
+    jll /= jll.sum(axis=1, keepdims=True)
+    return jll
+
+
+def feature_parts(pipeline):
+    """
+    拆分 Pipeline 的特征步骤，支持三种结构：
+    - TfidfVectorizer + MultinomialNB
+    - HashingVectorizer（非负、不归一化）+ StreamingTfidfTransformer + MultinomialNB
+    - FeatureUnion[TfidfVectorizer, TextStatsFeaturizer] + MultinomialNB
+    :return: (词级向量化器, 提供 IDF 与归一化参数的步骤, 统计特征转换器, 统计特征权重)，
+             不含统计特征时后两项为 None；结构不受支持时返回 None
+    """
+    steps = [step for _, step in getattr(pipeline, 'steps', [])]
+    if not steps or not isinstance(steps[-1], MultinomialNB):
+        return None
+    stats, stats_weight = None, None
+    if len(steps) == 2 and isinstance(steps[0], FeatureUnion):
+        transformers = steps[0].transformer_list
+        if len(transformers) != 2 or not isinstance(transformers[1][1], TextStatsFeaturizer):
+            return None
+        (_, vectorizer), (stats_name, stats) = transformers
+        stats_weight = (steps[0].transformer_weights or {}).get(stats_name, 1.0)
+        steps = [vectorizer, steps[-1]]
+    vectorizer = steps[0]
+    if callable(vectorizer.get_params().get('analyzer')):
+        return None
+    if len(steps) == 2 and isinstance(vectorizer, TfidfVectorizer):
+        return vectorizer, vectorizer, stats, stats_weight
+    if (len(steps) == 3 and isinstance(vectorizer, HashingVectorizer) and isinstance(steps[1], StreamingTfidfTransformer)
+            and not vectorizer.alternate_sign and vectorizer.norm is None):
+        return vectorizer, steps[1], stats, stats_weight
+    return None
+
+
+def supports_native_inference(pipeline):
+    """判断 Pipeline 是否可以使用原生推理内核，支持的结构见 feature_parts"""
+    return feature_parts(pipeline) is not None
+
+
+class NBInferenceEngine:
+    """
+    TF-IDF + MultinomialNB 的原生推理引擎
+    由训练好的 Pipeline 的 tfidf 与 classifier 步骤构建，分词后逐词查词表（或特征哈希）得到特征列，
+    其余的 TF-IDF 加权、L2 归一化和对数概率累加在一次 NumPy 向量化计算中完成，
+    绕过 sklearn Pipeline 每次调用的参数校验与稀疏矩阵构造，主要降低小批量的延迟；
+    拼接了字符统计特征的模型，统计特征整批计算后以一次矩阵乘法计入对数概率；
+    对外提供 classes_ 与 predict_proba，可直接替代 Pipeline 用于 ModelPredictor
+    """
+
+    def __init__(self, analyzer, lookup, feature_log_prob, class_log_prior, classes,
+                 idf=None, norm='l2', sublinear_tf=False, binary=False, stats=None, stats_log_prob=None):
+        """
+        :param analyzer: 分词函数 text -> list[str]，与训练时的向量化器一致
+        :param lookup: 词项 -> 特征列，不在词表中返回 -1
+        :param feature_log_prob: 词项特征的对数条件概率
+        :param stats: 统计特征转换器，None 表示不使用
+        :param stats_log_prob: 统计特征的对数条件概率，已乘以 FeatureUnion 中的特征权重
+        """
+        self.classes_ = np.asarray(classes)
+        self._analyzer = analyzer
+        self._lookup = lookup
+        self.feature_log_prob = np.ascontiguousarray(feature_log_prob, dtype=np.float64)
+        self.class_log_prior = np.asarray(class_log_prior, dtype=np.float64)
+        self.idf = None if idf is None else np.asarray(idf, dtype=np.float64)
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.stats = stats
+        self.stats_log_prob = None if stats_log_prob is None else np.ascontiguousarray(stats_log_prob, dtype=np.float64)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """由已训练的 Pipeline 构建推理引擎"""
+        parts = feature_parts(pipeline)
+        if parts is None:
+            raise ValueError(
+                f"原生推理仅支持 TfidfVectorizer + MultinomialNB、HashingVectorizer + StreamingTfidfTransformer + "
+                f"MultinomialNB 或 FeatureUnion[TfidfVectorizer, TextStatsFeaturizer] + MultinomialNB，"
+                f"当前为 {' + '.join(type(step).__name__ for _, step in pipeline.steps)}"
+            )
+        vectorizer, tfidf, stats, stats_weight = parts
+        classifier = pipeline[-1]
+        if isinstance(vectorizer, TfidfVectorizer):
+            lookup = _vocabulary_lookup(vectorizer.vocabulary_)
+            n_terms = len(vectorizer.vocabulary_)
+        else:
+            lookup = _hashing_lookup(vectorizer.n_features)
+            n_terms = vectorizer.n_features
+
+        feature_log_prob = classifier.feature_log_prob_
+        return cls(
+            analyzer=vectorizer.build_analyzer(),
+            lookup=lookup,
+            feature_log_prob=feature_log_prob[:, :n_terms],
+            class_log_prior=classifier.class_log_prior_,
+            classes=classifier.classes_,
+            idf=tfidf.idf_ if tfidf.use_idf else None,
+            norm=tfidf.norm,
+            sublinear_tf=tfidf.sublinear_tf,
+            binary=vectorizer.binary,
+            stats=stats,
+            stats_log_prob=None if stats is None else feature_log_prob[:, n_terms:] * stats_weight,
+        )
+
+    def _token_columns(self, texts):
+        """分词并查词表，返回命中词项的 (行, 列)"""
+        analyzer, lookup = self._analyzer, self._lookup
+        columns = []
+        lengths = np.empty(len(texts), dtype=np.intp)
+        for i, text in enumerate(texts):
+            tokens = analyzer(text)
+            lengths[i] = len(tokens)
+            columns.extend(map(lookup, tokens))
+        columns = np.array(columns, dtype=np.int64)
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        found = columns >= 0
+        return rows[found], columns[found]
+
+    def predict_proba(self, texts):
+        """计算类别概率，列顺序与 classes_ 一致"""
+        rows, columns = self._token_columns(texts)
+        dense = None if self.stats is None else self.stats.transform(texts)
+        return nb_predict_proba(rows, columns, len(texts), self.feature_log_prob, self.class_log_prior,
+                                idf=self.idf, norm=self.norm, sublinear_tf=self.sublinear_tf, binary=self.binary,
+                                dense=dense, dense_log_prob=self.stats_log_prob)
+
+    def predict(self, texts):
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
+
+def _vocabulary_lookup(vocabulary):
+    """词表查找，不在词表中的词返回 -1"""
+    get = vocabulary.get
+
+    def lookup(term):
+        return get(term, -1)
+    return lookup
+
+
+def _hashing_lookup(n_features):
+    """与 HashingVectorizer（alternate_sign=False）一致的特征哈希：murmurhash3_32 取绝对值后对特征数取模"""
+    def lookup(term):
+        return abs(murmurhash3_32(term, seed=0)) % n_features
+    return lookup
@@ -0,0 +1,413 @@
+# src/model_registry.py
+from contextlib import closing
+from datetime import datetime
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import uuid
+
+from loguru import logger
+import joblib
+import numpy as np
+import scipy.sparse as sp
+
+from config import (
+    LATEST_MODEL_PATH, LATEST_COMPACT_MODEL_PATH, LATEST_COMPRESSED_MODEL_PATH, REGISTRY_DIR, REGISTRY_KEEP
+)
+from src.compact_model import COMPACT_MAGIC
+from src.dataset_io import file_digest
+
+# 可排序的指标列及其方向（True 表示越大越好）
+METRICS = {'accuracy': True, 'latency_p50_ms': False, 'size_bytes': False}
+
+# 随模型版本一起保存的附属文件及发布时的链接路径：紧凑格式导出、压缩导出
+ARTIFACT_PATHS = {'compact': LATEST_COMPACT_MODEL_PATH, 'compressed': LATEST_COMPRESSED_MODEL_PATH}
+
+# 与模型参数无关、每个进程取值不同的运行期属性（如 sklearn 记录的停用词对象地址），不参与哈希
+_RUNTIME_ATTRIBUTES = frozenset({'_stop_words_id'})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    digest TEXT PRIMARY KEY,
+    size_bytes INTEGER NOT NULL,
+    accuracy REAL,
+    latency_p50_ms REAL,
+    dataset_hash TEXT,
+    config TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_models_accuracy ON models (accuracy);
+CREATE INDEX IF NOT EXISTS idx_models_latency ON models (latency_p50_ms);
+CREATE INDEX IF NOT EXISTS idx_models_size ON models (size_bytes);
+CREATE INDEX IF NOT EXISTS idx_models_created ON models (created_at);
+CREATE TABLE IF NOT EXISTS promotions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    digest TEXT NOT NULL,
+    promoted_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    digest TEXT NOT NULL,
+    name TEXT NOT NULL,
+    blob TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    PRIMARY KEY (digest, name)
+);
+"""
+
+
+def _canonical_update(hasher, obj):
+    """
+    把对象的规范形式写入哈希：只包含类型、参数与拟合得到的数组，字典按键排序，
+    与 pickle 字节、对象地址、字典插入顺序无关
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        hasher.update(f'{type(obj).__name__}:{obj!r};'.encode('utf-8'))
+    elif isinstance(obj, bytes):
+        hasher.update(f'bytes:{len(obj)};'.encode('utf-8'))
+        hasher.update(obj)
+    elif isinstance(obj, np.generic):
+        hasher.update(f'{obj.dtype.str}:{obj.item()!r};'.encode('utf-8'))
+    elif isinstance(obj, np.dtype):
+        hasher.update(f'dtype:{obj.str};'.encode('utf-8'))
+    elif isinstance(obj, np.ndarray):
+        hasher.update(f'ndarray:{obj.dtype.str}:{obj.shape};'.encode('utf-8'))
+        if obj.dtype == object:
+            for item in obj.ravel():
+                _canonical_update(hasher, item)
+        else:
+            hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif sp.issparse(obj):
+        matrix = obj.tocsr(copy=True)
+        matrix.sort_indices()
+        hasher.update(f'sparse:{matrix.shape};'.encode('utf-8'))
+        for array in (matrix.data, matrix.indices, matrix.indptr):
+            _canonical_update(hasher, array)
+    elif isinstance(obj, dict):
+        hasher.update(f'dict:{len(obj)};'.encode('utf-8'))
+        for key, value in sorted(obj.items(), key=lambda item: repr(item[0])):
+            _canonical_update(hasher, key)
+            _canonical_update(hasher, value)
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(f'{type(obj).__name__}:{len(obj)};'.encode('utf-8'))
+        for item in obj:
+            _canonical_update(hasher, item)
+    elif isinstance(obj, (set, frozenset)):
+        _canonical_update(hasher, sorted(obj, key=repr))
+    elif isinstance(obj, type) or (callable(obj) and not hasattr(obj, 'get_config') and hasattr(obj, '__qualname__')):
+        # 类型与函数按名称引用，例如 TfidfVectorizer 的 dtype 参数
+        hasher.update(f'ref:{obj.__module__}.{obj.__qualname__};'.encode('utf-8'))
+    elif hasattr(obj, 'get_config'):
+        hasher.update(f'object:{type(obj).__module__}.{type(obj).__qualname__};'.encode('utf-8'))
+        _canonical_update(hasher, obj.get_config())
+    elif hasattr(obj, '__dict__'):
+        # sklearn 估计器的构造参数与拟合属性都保存在实例字典中
+        hasher.update(f'object:{type(obj).__module__}.{type(obj).__qualname__};'.encode('utf-8'))
+        _canonical_update(hasher, {key: value for key, value in vars(obj).items() if key not in _RUNTIME_ATTRIBUTES})
+    else:
+        raise TypeError(f"无法计算规范哈希的对象类型: {type(obj).__name__}")
+
+
+def model_digest(model=None, path=None, config=None):
+    """
+    模型版本哈希：模型规范形式（参数与拟合数组，见 _canonical_update）与训练配置的 sha256
+    joblib 序列化的字节在不同进程间并不稳定，因此不直接对模型文件取哈希；
+    紧凑格式文件的内容由导出过程确定，直接使用文件内容哈希
+    :param model: 模型对象，与 path 二选一
+    :param path: 模型文件路径（pickle 或紧凑格式）
+    :param config: 训练配置，一并参与哈希
+    """
+    hasher = hashlib.sha256()
+    if model is None:
+        with open(path, 'rb') as f:
+            compact = f.read(len(COMPACT_MAGIC)) == COMPACT_MAGIC
+        if compact:
+            _canonical_update(hasher, {'compact': file_digest(path)})
+        else:
+            model = joblib.load(path)
+    if model is not None:
+        _canonical_update(hasher, model)
+    _canonical_update(hasher, config or {})
+    return hasher.hexdigest()
+
+
+class ModelRegistry:
+    """
+    模型注册表
+    - 模型按版本哈希（模型参数与拟合数组的规范形式 + 训练配置，见 model_digest）存放在 blobs/ 下，
+      相同的模型只保存一份，与 joblib 序列化字节是否稳定无关
+    - 紧凑格式与压缩导出作为同一版本的附属文件（artifacts 表）按文件内容哈希存放，注册时与模型一起写入；
+      快速路径边界保存在模型文件内部，随模型版本一起切换
+    - SQLite 索引记录每个模型的准确率、单条预测延迟、文件大小、数据集哈希与训练配置，
+      最优 / 最新模型通过索引查询得到，无需扫描目录
+    - latest 为 promotions 表中最近一次发布的模型，LATEST_MODEL_PATH 及各附属文件的 latest 路径以硬链接指向
+      对应的 blob，发布与回滚同时替换全部链接，不复制文件，预测服务的热加载照常生效
+    - 每次注册后自动清理：保留最近 keep 个模型、最近两次发布的模型与准确率最高的模型
+    """
+
+    def __init__(self, root=None, keep=None, latest_path=None, artifact_paths=None):
+        """
+        :param root: 注册表目录，默认使用 REGISTRY_DIR
+        :param keep: 自动清理时保留的最近模型数，默认使用 REGISTRY_KEEP
+        :param latest_path: latest 链接路径，默认使用 LATEST_MODEL_PATH
+        :param artifact_paths: 附属文件名 -> latest 链接路径，默认使用 ARTIFACT_PATHS
+        """
+        self.root = root or REGISTRY_DIR
+        self.keep = REGISTRY_KEEP if keep is None else keep
+        self.latest_path = latest_path or LATEST_MODEL_PATH
+        self.artifact_paths = ARTIFACT_PATHS if artifact_paths is None else artifact_paths
+        self.blob_dir = os.path.join(self.root, 'blobs')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.index_path = os.path.join(self.root, 'registry.db')
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _now():
+        return datetime.now().isoformat(timespec='microseconds')
+
+    @staticmethod
+    def _record(row):
+        if row is None:
+            return None
+        record = dict(row)
+        record['config'] = json.loads(record['config']) if record['config'] else {}
+        return record
+
+    def blob_path(self, digest):
+        """内容哈希对应的文件路径（模型与附属文件共用 blobs/ 目录）"""
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _store_blob(self, digest, write):
+        """
+        写入内容寻址的 blob：先由 write(tmp_path) 写临时文件，再原子改名；已存在时跳过
+        :return: blob 路径
+        """
+        blob_path = self.blob_path(digest)
+        if os.path.exists(blob_path):
+            return blob_path
+        tmp_path = os.path.join(self.blob_dir, f".{uuid.uuid4().hex}.tmp")
+        try:
+            write(tmp_path)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(tmp_path, blob_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return blob_path
+
+    def register(self, model=None, path=None, accuracy=None, latency_p50_ms=None, dataset_hash=None, config=None,
+                 artifacts=None, promote=True):
+        """
+        注册模型：写入 blob 与附属文件并记录元数据；版本哈希相同的模型只保存一份，元数据以本次为准
+        附属文件在发布之前写入，发布后 latest 模型与其附属文件始终属于同一版本
+        :param model: 已训练的模型对象，以 joblib 序列化
+        :param path: 已有的模型文件（pickle 或紧凑格式），与 model 二选一
+        :param artifacts: 附属文件 {名称: 文件路径}，名称见 ARTIFACT_PATHS
+        :param promote: 是否同时发布为 latest
+        :return: 模型版本哈希
+        """
+        if (model is None) == (path is None):
+            raise ValueError("model 与 path 必须且只能指定一个")
+        unknown = set(artifacts or {}) - set(self.artifact_paths)
+        if unknown:
+            raise ValueError(f"未知的附属文件: {sorted(unknown)}，可选: {list(self.artifact_paths)}")
+
+        digest = model_digest(model, path, config)
+        if os.path.exists(self.blob_path(digest)):
+            logger.info(f"♻️ 注册表中已有相同模型: {digest[:12]}")
+        if model is not None:
+            blob_path = self._store_blob(digest, lambda tmp_path: joblib.dump(model, tmp_path))
+        else:
+            blob_path = self._store_blob(digest, lambda tmp_path: shutil.copyfile(path, tmp_path))
+        stored = {}
+        for name, artifact_path in (artifacts or {}).items():
+            blob = file_digest(artifact_path)
+            self._store_blob(blob, lambda tmp_path, src=artifact_path: shutil.copyfile(src, tmp_path))
+            stored[name] = (blob, os.path.getsize(artifact_path))
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO models (digest, size_bytes, accuracy, latency_p50_ms, dataset_hash, config, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (digest) DO UPDATE SET "
+                "accuracy = excluded.accuracy, latency_p50_ms = excluded.latency_p50_ms, "
+                "dataset_hash = excluded.dataset_hash, config = excluded.config, created_at = excluded.created_at",
+                (digest, os.path.getsize(blob_path), accuracy, latency_p50_ms, dataset_hash,
+                 json.dumps(config or {}, ensure_ascii=False, sort_keys=True), self._now()),
+            )
+            conn.executemany(
+                "INSERT INTO artifacts (digest, name, blob, size_bytes) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (digest, name) DO UPDATE SET blob = excluded.blob, size_bytes = excluded.size_bytes",
+                [(digest, name, blob, size) for name, (blob, size) in stored.items()],
+            )
+        logger.info(f"📁 模型已注册: {digest[:12]} (准确率 {accuracy}, p50 {latency_p50_ms} ms"
+                    f"{', 附属文件 ' + '/'.join(stored) if stored else ''})")
+
+        if promote:
+            self.promote(digest)
+        self.cleanup()
+        return digest
+
+    def artifacts(self, digest):
+        """模型版本的附属文件 {名称: {'blob': 内容哈希, 'size_bytes': 大小}}"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT name, blob, size_bytes FROM artifacts WHERE digest = ? ORDER BY name",
+                                (digest,)).fetchall()
+        return {row['name']: {'blob': row['blob'], 'size_bytes': row['size_bytes']} for row in rows}
+
+    def artifact_path(self, digest, name):
+        """模型版本某个附属文件的 blob 路径"""
+        artifact = self.artifacts(digest).get(name)
+        if artifact is None:
+            raise KeyError(f"模型 {digest[:12]} 没有附属文件: {name}")
+        return self.blob_path(artifact['blob'])
+
+    def resolve(self, ref):
+        """
+        把模型引用解析为完整版本哈希
+        :param ref: latest / best / 版本哈希（可为前缀）
+        """
+        if ref == 'latest':
+            record = self.latest()
+        elif ref == 'best':
+            record = self.best()
+        else:
+            # 十六进制哈希不含 'g'，前缀匹配转换为主键上的范围查询
+            with closing(self._connect()) as conn:
+                rows = conn.execute("SELECT digest FROM models WHERE digest >= ? AND digest < ? LIMIT 2",
+                                    (ref, ref + 'g')).fetchall()
+            if len(rows) > 1:
+                raise ValueError(f"模型哈希前缀不唯一: {ref}")
+            record = {'digest': rows[0]['digest']} if rows else None
+        if record is None:
+            raise KeyError(f"注册表中没有模型: {ref}")
+        return record['digest']
+
+    def get(self, digest):
+        """按版本哈希查询模型元数据（含附属文件）"""
+        with closing(self._connect()) as conn:
+            record = self._record(conn.execute("SELECT * FROM models WHERE digest = ?", (digest,)).fetchone())
+        if record is not None:
+            record['artifacts'] = self.artifacts(digest)
+        return record
+
+    def latest(self):
+        """当前发布的模型"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT models.* FROM promotions JOIN models USING (digest) ORDER BY promotions.id DESC LIMIT 1"
+            ).fetchone()
+        return self._record(row)
+
+    def best(self, metric='accuracy'):
+        """按指标选出最优模型（走索引排序）"""
+        if metric not in METRICS:
+            raise ValueError(f"不支持的指标: {metric}，可选 {list(METRICS)}")
+        order = 'DESC' if METRICS[metric] else 'ASC'
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT * FROM models WHERE {metric} IS NOT NULL ORDER BY {metric} {order}, created_at DESC LIMIT 1"
+            ).fetchone()
+        return self._record(row)
+
+    def list_models(self, limit=None):
+        """按注册时间倒序列出模型"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM models ORDER BY created_at DESC LIMIT ?",
+                                (-1 if limit is None else limit,)).fetchall()
+        return [self._record(row) for row in rows]
+
+    @staticmethod
+    def _link(blob_path, target):
+        """让 target 以硬链接指向 blob：先建临时链接再原子替换；不支持硬链接时退化为复制"""
+        if os.path.exists(target) and os.path.samefile(blob_path, target):
+            # 已经指向该 blob；对同一文件的两个链接 rename 不做任何事，临时链接会残留
+            return
+        tmp_path = f"{target}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError as e:
+            logger.warning(f"⚠️ 无法创建硬链接，改为复制文件: {e}")
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, target)
+
+    def _link_latest(self, digest):
+        """
+        切换 latest：先链接附属文件，最后链接模型文件；该版本没有的附属文件删除其 latest 链接，
+        避免留下其他版本的导出
+        """
+        artifacts = self.artifacts(digest)
+        for name, target in self.artifact_paths.items():
+            if name in artifacts:
+                self._link(self.blob_path(artifacts[name]['blob']), target)
+            elif os.path.exists(target):
+                os.remove(target)
+                logger.info(f"🧹 模型 {digest[:12]} 没有附属文件 {name}，已删除旧链接: {target}")
+        self._link(self.blob_path(digest), self.latest_path)
+
+    def promote(self, ref):
+        """
+        把模型及其附属文件发布为 latest
+        :param ref: latest / best / 版本哈希（可为前缀）
+        :return: 发布的模型版本哈希
+        """
+        digest = self.resolve(ref)
+        self._link_latest(digest)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT INTO promotions (digest, promoted_at) VALUES (?, ?)", (digest, self._now()))
+        logger.success(f"✅ 模型已发布为最新版: {digest[:12]} -> {self.latest_path}")
+        return digest
+
+    def rollback(self):
+        """
+        回滚到上一次发布的模型：删除最近一条发布记录并重新链接模型及其附属文件
+        :return: 回滚后的模型版本哈希
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT id, digest FROM promotions ORDER BY id DESC LIMIT 2").fetchall()
+        if len(rows) < 2:
+            raise ValueError("没有可回滚的历史版本")
+        current, previous = rows
+        self._link_latest(previous['digest'])
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM promotions WHERE id = ?", (current['id'],))
+        logger.success(f"↩️ 已回滚: {current['digest'][:12]} -> {previous['digest'][:12]}")
+        return previous['digest']
+
+    def cleanup(self):
+        """
+        按保留策略清理：保留最近 keep 个模型、当前与上一次发布的模型（保证可以回滚）以及准确率最高的模型，
+        其余模型的 blob、附属文件、元数据与发布记录一并删除
+        :return: 删除的模型数
+        """
+        keep = {record['digest'] for record in self.list_models(self.keep)}
+        best = self.best('accuracy')
+        if best is not None:
+            keep.add(best['digest'])
+        with closing(self._connect()) as conn, conn:
+            keep.update(row['digest'] for row in
+                        conn.execute("SELECT digest FROM promotions ORDER BY id DESC LIMIT 2"))
+            stale = [row['digest'] for row in conn.execute("SELECT digest FROM models")
+                     if row['digest'] not in keep]
+            conn.executemany("DELETE FROM models WHERE digest = ?", [(digest,) for digest in stale])
+            conn.executemany("DELETE FROM promotions WHERE digest = ?", [(digest,) for digest in stale])
+            stale_blobs = {row['blob'] for digest in stale
+                           for row in conn.execute("SELECT blob FROM artifacts WHERE digest = ?", (digest,))}
+            conn.executemany("DELETE FROM artifacts WHERE digest = ?", [(digest,) for digest in stale])
+            # 附属文件按内容寻址，可能被保留的模型共用
+            stale_blobs -= {row['blob'] for row in conn.execute("SELECT blob FROM artifacts")}
+        for blob in [*stale, *stale_blobs]:
+            blob_path = self.blob_path(blob)
+            if os.path.exists(blob_path):
+                os.remove(blob_path)
+        if stale:
+            logger.info(f"🧹 注册表清理: 删除 {len(stale)} 个旧模型")
+        return len(stale)
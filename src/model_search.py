@@ -0,0 +1,299 @@
+# src/model_search.py
+from concurrent.futures import ProcessPoolExecutor
+import json
+import math
+import pickle
+import time
+
+from loguru import logger
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.naive_bayes import ComplementNB, MultinomialNB
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+
+from config import (
+    SEARCH_VECTORIZER_GRID, SEARCH_CLASSIFIERS, SEARCH_CV_FOLDS, SEARCH_N_JOBS, SEARCH_SCORING,
+    SEARCH_HALVING_FACTOR, SEARCH_MIN_RESOURCES, SEARCH_FINALISTS, SEARCH_RECALL_TARGET,
+    SEARCH_VALIDATION_SIZE, SEARCH_LEADERBOARD_PATH, TRAIN_DEDUP
+)
+from src.dedup import dedup
+
+# 候选分类器；均提供 predict_proba，可直接用于 ModelPredictor
+CLASSIFIER_FACTORIES = {
+    'nb': lambda: MultinomialNB(),
+    'complement_nb': lambda: ComplementNB(),
+    # LinearSVC 本身没有 predict_proba，通过概率校准包装
+    'linear_svc': lambda: CalibratedClassifierCV(LinearSVC(), cv=3),
+    'logistic_regression': lambda: LogisticRegression(max_iter=1000),
+}
+
+_SCORERS = {
+    'accuracy': accuracy_score,
+    'f1': lambda y, p: f1_score(y, p, zero_division=0),
+    'recall': lambda y, p: recall_score(y, p, zero_division=0),
+    'precision': lambda y, p: precision_score(y, p, zero_division=0),
+}
+
+
+def build_search_feature_steps(params):
+    """
+    根据搜索配置构建特征步骤：与训练器使用同一个工厂（ModelTrainer.build_feature_steps），
+    搜索配置只覆盖 TF-IDF 参数，TEXT_STATS_FEATURES 开启时同样拼接字符统计特征
+    """
+    from src.trainer import ModelTrainer
+
+    return ModelTrainer.build_feature_steps('tfidf', params)
+
+
+def _fit_features(vectorizer_params, texts, labels, dedup_mode):
+    """
+    与训练器相同的方式拟合特征：先按 dedup_mode 去重，再按样本权重拟合特征步骤
+    :return: (已拟合的特征步骤, 特征矩阵, 标签, 样本权重)
+    """
+    from src.trainer import ModelTrainer
+
+    texts, labels, weights = dedup(texts, labels, dedup_mode)
+    feature_steps, features = ModelTrainer._fit_feature_steps(
+        build_search_feature_steps(vectorizer_params), texts, weights)
+    return feature_steps, features, labels, weights
+
+
+def _describe(vectorizer_params):
+    params = dict(vectorizer_params)
+    ngram = tuple(params.get('ngram_range', (1, 1)))
+    return f"{params.get('analyzer', 'word')}{ngram}/{params.get('max_features')}"
+
+
+def _cross_validate_group(vectorizer_params, classifier_names, texts, labels, n_folds, scoring, dedup_mode):
+    """
+    对一个向量化配置做交叉验证：每折只向量化一次，特征矩阵在该组所有分类器之间复用
+    每折只对训练部分去重，验证部分保持原样
+    :return: dict 分类器名 -> 平均得分
+    """
+    scorer = _SCORERS[scoring]
+    scores = {name: [] for name in classifier_names}
+    folds = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+
+    for train_idx, val_idx in folds.split(texts, labels):
+        feature_steps, X_train, y_train, weights = _fit_features(
+            vectorizer_params, texts[train_idx], labels[train_idx], dedup_mode)
+        X_val = Pipeline(feature_steps).transform(texts[val_idx])
+        for name in classifier_names:
+            classifier = CLASSIFIER_FACTORIES[name]()
+            classifier.fit(X_train, y_train, sample_weight=weights)
+            scores[name].append(scorer(labels[val_idx], classifier.predict(X_val)))
+
+    return {name: float(np.mean(values)) for name, values in scores.items()}
+
+
+def measure_latency(pipeline, texts, repeats=200):
+    """测量单条预测延迟分位数与批量吞吐"""
+    samples = [texts[i % len(texts)] for i in range(min(repeats, len(texts)))]
+    single = []
+    for text in samples:
+        started = time.perf_counter()
+        pipeline.predict_proba([text])
+        single.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    pipeline.predict_proba(texts)
+    batch_seconds = time.perf_counter() - started
+    return {
+        'latency_p50_ms': round(float(np.percentile(single, 50)), 4),
+        'latency_p99_ms': round(float(np.percentile(single, 99)), 4),
+        'throughput_per_s': round(len(texts) / batch_seconds, 1) if batch_seconds > 0 else None,
+    }
+
+
+def _fit_and_benchmark_group(vectorizer_params, classifier_names, X_train, y_train, X_val, y_val, dedup_mode):
+    """
+    在拟合集上拟合一个向量化配置下的所有分类器，并在验证集上评估准确率、延迟和模型大小
+    特征步骤只拟合一次，各分类器共享同一份特征矩阵
+    """
+    feature_steps, features_train, y_train, weights = _fit_features(vectorizer_params, X_train, y_train, dedup_mode)
+    features_val = Pipeline(feature_steps).transform(X_val)
+
+    rows = []
+    for name in classifier_names:
+        classifier = CLASSIFIER_FACTORIES[name]()
+        started = time.perf_counter()
+        classifier.fit(features_train, y_train, sample_weight=weights)
+        fit_seconds = time.perf_counter() - started
+
+        y_pred = classifier.predict(features_val)
+        pipeline = Pipeline(feature_steps + [('classifier', classifier)])
+        row = {
+            'vectorizer': vectorizer_params,
+            'classifier': name,
+            'accuracy': round(accuracy_score(y_val, y_pred), 4),
+            'precision': round(precision_score(y_val, y_pred, zero_division=0), 4),
+            'recall': round(recall_score(y_val, y_pred, zero_division=0), 4),
+            'f1': round(f1_score(y_val, y_pred, zero_division=0), 4),
+            'fit_seconds': round(fit_seconds, 4),
+            'model_size_kb': round(len(pickle.dumps(pipeline)) / 1024, 1),
+        }
+        row.update(measure_latency(pipeline, list(X_val)))
+        rows.append(row)
+    return rows
+
+
+class ModelSearch:
+    """
+    向量化配置与分类器族的并行搜索
+    支持网格搜索（grid）和逐次减半（halving）；按向量化配置分组并行，
+    同一配置下每折特征只计算一次并在所有分类器间复用；
+    候选与训练器使用同一个特征工厂和去重方式，最终输出验证集上准确率 / 召回率 / 推理延迟 / 模型大小的排行榜
+    """
+
+    def __init__(self, vectorizer_grid=None, classifiers=None, n_folds=None, n_jobs=None,
+                 scoring=None, mode='grid', dedup_mode=None):
+        """
+        :param vectorizer_grid: 向量化配置列表，默认使用 SEARCH_VECTORIZER_GRID
+        :param classifiers: 分类器名列表（见 CLASSIFIER_FACTORIES），默认使用 SEARCH_CLASSIFIERS
+        :param n_folds: 交叉验证折数，默认使用 SEARCH_CV_FOLDS
+        :param n_jobs: 并行进程数，默认使用 SEARCH_N_JOBS
+        :param scoring: 交叉验证评分（accuracy / f1 / recall / precision），默认使用 SEARCH_SCORING
+        :param mode: grid 或 halving
+        :param dedup_mode: 拟合候选前的去重方式（off / exact / near），默认使用 TRAIN_DEDUP
+        """
+        self.vectorizer_grid = vectorizer_grid or SEARCH_VECTORIZER_GRID
+        self.classifiers = classifiers or SEARCH_CLASSIFIERS
+        self.n_folds = n_folds or SEARCH_CV_FOLDS
+        self.n_jobs = n_jobs or SEARCH_N_JOBS
+        self.scoring = scoring or SEARCH_SCORING
+        if mode not in ('grid', 'halving'):
+            raise ValueError(f"不支持的搜索模式: {mode}")
+        if self.scoring not in _SCORERS:
+            raise ValueError(f"不支持的评分方式: {self.scoring}，可选: {list(_SCORERS)}")
+        unknown = set(self.classifiers) - set(CLASSIFIER_FACTORIES)
+        if unknown:
+            raise ValueError(f"未知分类器: {sorted(unknown)}，可选: {list(CLASSIFIER_FACTORIES)}")
+        self.mode = mode
+        self.dedup_mode = dedup_mode or TRAIN_DEDUP
+        self.leaderboard = []
+
+    def _cross_validate(self, executor, candidates, texts, labels):
+        """按向量化配置分组并行交叉验证，返回 {(配置下标, 分类器名): 得分}"""
+        groups = {}
+        for vec_index, name in candidates:
+            groups.setdefault(vec_index, []).append(name)
+
+        futures = {
+            vec_index: executor.submit(
+                _cross_validate_group, self.vectorizer_grid[vec_index], names,
+                texts, labels, self.n_folds, self.scoring, self.dedup_mode
+            )
+            for vec_index, names in groups.items()
+        }
+        scores = {}
+        for vec_index, future in futures.items():
+            for name, score in future.result().items():
+                scores[(vec_index, name)] = score
+        return scores
+
+    def _halving(self, executor, candidates, texts, labels):
+        """逐次减半：小样本上评估全部候选，每轮保留前 1/factor，样本量按 factor 倍增长"""
+        factor = SEARCH_HALVING_FACTOR
+        n_rounds = max(1, math.ceil(math.log(max(len(candidates) / SEARCH_FINALISTS, 1), factor)) + 1)
+        resources = max(SEARCH_MIN_RESOURCES, len(texts) // factor ** (n_rounds - 1))
+        order = np.random.default_rng(42).permutation(len(texts))
+
+        scores = {}
+        for round_index in range(n_rounds):
+            n_samples = min(len(texts), resources * factor ** round_index)
+            subset = order[:n_samples]
+            scores = self._cross_validate(executor, candidates, texts[subset], labels[subset])
+            logger.info(f"🔁 第 {round_index + 1}/{n_rounds} 轮: {len(candidates)} 个候选, 样本 {n_samples} 条")
+
+            if len(candidates) <= SEARCH_FINALISTS:
+                break
+            keep = max(SEARCH_FINALISTS, math.ceil(len(candidates) / factor))
+            candidates = sorted(candidates, key=lambda c: scores[c], reverse=True)[:keep]
+        return candidates, scores
+
+    def run(self, texts, labels):
+        """
+        执行搜索
+        只应传入训练集：内部再按 SEARCH_VALIDATION_SIZE 划出验证集，交叉验证在其余部分上进行，
+        排行榜指标与模型选择都基于验证集，调用方的测试集不参与搜索，评估结果不会偏高
+        :param texts: 训练集文本序列
+        :param labels: 训练集标签序列
+        :return: list[dict] 排行榜，按验证集召回率降序、其次单条延迟升序排列
+        """
+        texts = np.asarray(texts, dtype=object)
+        labels = np.asarray(labels).astype(int)
+        X_train, X_val, y_train, y_val = train_test_split(
+            texts, labels, test_size=SEARCH_VALIDATION_SIZE, random_state=42, stratify=labels
+        )
+        candidates = [(i, name) for i in range(len(self.vectorizer_grid)) for name in self.classifiers]
+        logger.info(
+            f"🔎 开始模型搜索 ({self.mode}): {len(self.vectorizer_grid)} 个向量化配置 × "
+            f"{len(self.classifiers)} 个分类器, {self.n_jobs} 进程"
+        )
+
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            if self.mode == 'halving':
+                candidates, cv_scores = self._halving(executor, candidates, X_train, y_train)
+            else:
+                cv_scores = self._cross_validate(executor, candidates, X_train, y_train)
+
+            # 在拟合集上拟合候选，验证集评估准确率、延迟与模型大小
+            groups = {}
+            for vec_index, name in candidates:
+                groups.setdefault(vec_index, []).append(name)
+            futures = [
+                (vec_index, executor.submit(
+                    _fit_and_benchmark_group, self.vectorizer_grid[vec_index], names,
+                    X_train, y_train, X_val, y_val, self.dedup_mode
+                ))
+                for vec_index, names in groups.items()
+            ]
+            rows = []
+            for vec_index, future in futures:
+                for row in future.result():
+                    row[f'cv_{self.scoring}'] = round(cv_scores[(vec_index, row['classifier'])], 4)
+                    rows.append(row)
+
+        self.leaderboard = sorted(rows, key=lambda r: (-r['recall'], r['latency_p50_ms']))
+        self._log_leaderboard()
+        return self.leaderboard
+
+    def _log_leaderboard(self):
+        logger.info("🏆 模型搜索排行榜:")
+        logger.info(f"   {'向量化':<24}{'分类器':<22}{'准确率':>8}{'召回率':>8}{'p50(ms)':>10}{'大小(KB)':>10}")
+        for row in self.leaderboard:
+            logger.info(
+                f"   {_describe(row['vectorizer']):<24}{row['classifier']:<22}{row['accuracy']:>8.4f}"
+                f"{row['recall']:>8.4f}{row['latency_p50_ms']:>10.3f}{row['model_size_kb']:>10.1f}"
+            )
+
+    def select(self, recall_target=None):
+        """
+        按验证集指标选出满足召回率要求的最快模型；都不满足时返回召回率最高的模型
+        :param recall_target: 召回率要求，默认使用 SEARCH_RECALL_TARGET
+        """
+        if not self.leaderboard:
+            raise RuntimeError("尚未执行搜索")
+        recall_target = SEARCH_RECALL_TARGET if recall_target is None else recall_target
+        qualified = [row for row in self.leaderboard if row['recall'] >= recall_target]
+        if qualified:
+            return min(qualified, key=lambda r: (r['latency_p50_ms'], -r['accuracy']))
+        logger.warning(f"⚠️ 没有模型达到召回率要求 {recall_target}，选择召回率最高的模型")
+        return max(self.leaderboard, key=lambda r: (r['recall'], r['accuracy']))
+
+    def build_pipeline(self, row):
+        """根据排行榜中的一行构建未训练的 Pipeline，特征步骤与训练器一致"""
+        return Pipeline(build_search_feature_steps(row['vectorizer'])
+                        + [('classifier', CLASSIFIER_FACTORIES[row['classifier']]())])
+
+    def save_leaderboard(self, path=None):
+        """把排行榜写入 JSON 文件"""
+        path = path or SEARCH_LEADERBOARD_PATH
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.leaderboard, f, ensure_ascii=False, indent=2)
+        logger.info(f"📁 排行榜已保存: {path}")
+        return path
@@ -20,7 +20,8 @@ class PackageConfig:
     MAIN_SCRIPTS = [
         "generate_data.py",
         "train_model.py", 
-        "predict.py"
+        "predict.py",
+        "serve.py"
     ]
     
     # 构建目录配置
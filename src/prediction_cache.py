@@ -0,0 +1,81 @@
+# src/prediction_cache.py
+from collections import OrderedDict
+import hashlib
+import threading
+
+
+class PredictionCache:
+    """
+    预测结果 LRU 缓存
+    以原文的哈希为键缓存概率行，容量有界；
+    缓存绑定到一个模型令牌，模型切换后旧令牌的读写全部失效
+    """
+
+    def __init__(self, maxsize):
+        if maxsize <= 0:
+            raise ValueError(f"缓存容量必须为正整数: {maxsize}")
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._token = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text):
+        """文本哈希键，长文本也只占用固定 16 字节"""
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def reset(self, token):
+        """清空缓存并绑定新的模型令牌"""
+        with self._lock:
+            self._data.clear()
+            self._token = token
+
+    def get_many(self, keys, token):
+        """
+        批量查询
+        :return: list，与 keys 一一对应，未命中为 None
+        """
+        with self._lock:
+            if token != self._token:
+                self.misses += len(keys)
+                return [None] * len(keys)
+
+            found = []
+            for key in keys:
+                value = self._data.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                found.append(value)
+            return found
+
+    def put_many(self, keys, values, token):
+        """批量写入；令牌已过期（模型已切换）时忽略"""
+        with self._lock:
+            if token != self._token:
+                return
+            for key, value in zip(keys, values):
+                self._data[key] = value
+                self._data.move_to_end(key)
+            overflow = len(self._data) - self.maxsize
+            for _ in range(max(overflow, 0)):
+                self._data.popitem(last=False)
+            self.evictions += max(overflow, 0)
+
+    def info(self):
+        """返回缓存计数"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,275 @@
+# src/prediction_server.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import signal
+import time
+
+from loguru import logger
+
+from config import (
+    SERVER_HOST, SERVER_PORT, SERVER_MAX_BATCH_SIZE, SERVER_BATCH_WINDOW_MS, SERVER_WORKERS
+)
+
+_STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+# 单个请求体大小上限（字节）
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+class PredictionServer:
+    """
+    常驻预测服务
+    模型只在启动时加载一次，通过 HTTP（TCP 或 Unix Socket）对外提供预测；
+    asyncio 前端把一个时间窗口内的并发请求合并成微批次，交给工作线程池执行
+
+    接口：
+      POST /predict  请求体 {"texts": [...]} 或 {"text": "..."}，返回 {"results": [...]}
+      GET  /health   健康检查
+      GET  /stats    预测聚合统计
+    """
+
+    def __init__(self, predictor, host=None, port=None, unix_socket=None,
+                 max_batch_size=None, batch_window_ms=None, workers=None):
+        """
+        :param predictor: 已加载模型的 ModelPredictor
+        :param host: TCP 监听地址，默认 SERVER_HOST
+        :param port: TCP 监听端口，默认 SERVER_PORT
+        :param unix_socket: Unix Socket 路径，指定后不再监听 TCP
+        :param max_batch_size: 单个微批次的最大条数，默认 SERVER_MAX_BATCH_SIZE
+        :param batch_window_ms: 微批次合并等待窗口（毫秒），默认 SERVER_BATCH_WINDOW_MS
+        :param workers: 执行预测的工作线程数，默认 SERVER_WORKERS；线程共享 GIL，多核扩展需启动多个服务进程
+        """
+        self.predictor = predictor
+        self.host = host or SERVER_HOST
+        self.port = SERVER_PORT if port is None else port
+        self.unix_socket = unix_socket
+        self.max_batch_size = max_batch_size or SERVER_MAX_BATCH_SIZE
+        self.batch_window = (SERVER_BATCH_WINDOW_MS if batch_window_ms is None else batch_window_ms) / 1000
+        self.workers = workers or SERVER_WORKERS
+
+        self._queue = None
+        self._executor = None
+        self._server = None
+        self._batcher_task = None
+        # 执行中的微批次任务：保留引用避免被垃圾回收，停止服务时等待其完成
+        self._batch_tasks = set()
+
+    # ------------------------------------------------------------------
+    # 微批次调度
+    # ------------------------------------------------------------------
+    async def submit(self, texts):
+        """提交一组文本，等待其所在微批次完成后返回预测结果"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _batch_loop(self):
+        """从队列中收集请求，在时间窗口或批大小达到上限时打包下发"""
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.batch_window
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            # 不等待批次完成，继续收集下一批，多个批次可在线程池中并发执行
+            task = loop.create_task(self._run_batch(pending))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, pending):
+        """在工作线程池中执行一个微批次，并把结果按请求拆分回去"""
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, self.predictor.predict, texts)
+        except Exception as e:
+            logger.error(f"❌ 微批次预测失败: {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future in pending:
+            count = len(request_texts)
+            if not future.done():
+                future.set_result(results[offset:offset + count])
+            offset += count
+
+    # ------------------------------------------------------------------
+    # HTTP 协议处理
+    # ------------------------------------------------------------------
+    async def _handle_connection(self, reader, writer):
+        """处理一个连接，支持 HTTP/1.1 keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write_response(writer, 400, {'error': '请求行格式错误'}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                length = self._content_length(headers)
+                if length is None:
+                    await self._write_response(writer, 400, {'error': 'Content-Length 格式错误'}, keep_alive=False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._write_response(writer, 413, {'error': '请求体过大'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self._dispatch(method, path, body)
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ 连接处理异常，已关闭连接: {e}")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _content_length(headers):
+        """解析 Content-Length，缺省为 0；非十进制非负整数时返回 None"""
+        value = headers.get('content-length', '') or '0'
+        if not (value.isascii() and value.isdigit()):
+            return None
+        return int(value)
+
+    async def _dispatch(self, method, path, body):
+        """按路径分发请求，返回 (状态码, 响应体)"""
+        if path == '/health':
+            return 200, {'status': 'ok', 'model_path': self.predictor.model_path}
+        if path == '/stats':
+            snapshot = self.predictor.stats.snapshot()
+            snapshot['cache'] = self.predictor.cache_info()
+            snapshot['rules'] = self.predictor.rule_info()
+            snapshot['fast_path'] = self.predictor.fast_path_info()
+            return 200, snapshot
+        if path != '/predict':
+            return 404, {'error': f'未知路径: {path}'}
+        if method != 'POST':
+            return 405, {'error': '仅支持 POST'}
+
+        try:
+            data = json.loads(body or b'{}')
+            texts = data['texts'] if 'texts' in data else [data['text']]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            return 400, {'error': '请求体应为 {"texts": [...]} 或 {"text": "..."}'}
+
+        if not texts:
+            return 200, {'results': []}
+        try:
+            return 200, {'results': await self.submit(texts)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    @staticmethod
+    async def _write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False, default=float).encode('utf-8')
+        header = (
+            f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(header.encode('latin-1') + body)
+        await writer.drain()
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    async def start(self):
+        """启动监听和微批次调度任务"""
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='predict')
+        self._batcher_task = asyncio.get_running_loop().create_task(self._batch_loop())
+
+        if self.unix_socket:
+            if os.path.exists(self.unix_socket):
+                os.remove(self.unix_socket)
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=self.unix_socket)
+            address = f"unix:{self.unix_socket}"
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            address = f"http://{self.host}:{self.port}"
+
+        logger.success(
+            f"🚀 预测服务已启动: {address} "
+            f"(微批次上限 {self.max_batch_size} 条, 合并窗口 {self.batch_window * 1000:g} ms, 工作线程 {self.workers})"
+        )
+
+    async def stop(self):
+        """停止服务并释放资源"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher_task is not None:
+            self._batcher_task.cancel()
+            self._batcher_task = None
+        if self._batch_tasks:
+            # 已下发的微批次执行完毕，等待中的请求都能得到响应
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.remove(self.unix_socket)
+        self.predictor.log_stats()
+        logger.info("🛑 预测服务已停止")
+
+    async def serve_forever(self):
+        """启动服务并持续运行直到被取消"""
+        await self.start()
+        started = time.time()
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, task.cancel)
+            except (NotImplementedError, RuntimeError):
+                # Windows 事件循环不支持 add_signal_handler，依赖 KeyboardInterrupt 退出
+                pass
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            logger.info(f"服务运行时长: {time.time() - started:.1f} s")
+            await self.stop()
@@ -0,0 +1,65 @@
+# src/prediction_stats.py
+from collections import deque
+import threading
+
+import numpy as np
+
+
+class PredictionStats:
+    """
+    预测聚合统计
+    按批次累计处理条数、敏感命中数，并保留最近若干批次的延迟用于计算分位数
+    """
+
+    def __init__(self, window=10000):
+        self._lock = threading.Lock()
+        self._window = window
+        self.reset()
+
+    def reset(self):
+        """清空全部计数"""
+        with self._lock:
+            self.batches = 0
+            self.items = 0
+            self.hits = 0
+            self._batch_latencies = deque(maxlen=self._window)
+            self._item_latencies = deque(maxlen=self._window)
+
+    def record(self, n_items, n_hits, latency_ms):
+        """
+        记录一个批次
+        :param n_items: 批次条数
+        :param n_hits: 批次内判定为敏感的条数
+        :param latency_ms: 批次耗时（毫秒）
+        """
+        with self._lock:
+            self.batches += 1
+            self.items += n_items
+            self.hits += n_hits
+            self._batch_latencies.append(latency_ms)
+            if n_items:
+                self._item_latencies.append(latency_ms / n_items)
+
+    @staticmethod
+    def _percentiles(values):
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        p50, p95, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 95, 99])
+        return {'p50': round(float(p50), 4), 'p95': round(float(p95), 4), 'p99': round(float(p99), 4)}
+
+    def snapshot(self):
+        """
+        返回当前统计快照
+        :return: dict 包含批次数、条数、命中数、命中率及批次/单条延迟分位数（毫秒）
+        """
+        with self._lock:
+            batch_latencies = list(self._batch_latencies)
+            item_latencies = list(self._item_latencies)
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'hits': self.hits,
+                'hit_rate': round(self.hits / self.items, 4) if self.items else 0.0,
+                'batch_latency_ms': self._percentiles(batch_latencies),
+                'item_latency_ms': self._percentiles(item_latencies),
+            }
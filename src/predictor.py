@@ -1,8 +1,64 @@
 # src/predictor.py
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import io
+from itertools import islice
+import multiprocessing
+import random
+import threading
+import time
 from loguru import logger
 import joblib
+import numpy as np
 import os
-from config import LATEST_MODEL_PATH
+from config import (
+    LATEST_MODEL_PATH, PREDICT_BATCH_SIZE, PREDICT_N_JOBS, PREDICT_CHUNK_SIZE,
+    PREDICT_ITEM_LOG_MODE, PREDICT_LOG_SAMPLE_RATE, PREDICT_STATS_WINDOW,
+    MODEL_WATCH_INTERVAL, MODEL_CANARY_TEXTS, PREDICT_CACHE_SIZE, PREDICT_RULE_FILTER, PREDICT_NATIVE_ENGINE,
+    PREDICT_FAST_PATH
+)
+from sklearn.pipeline import Pipeline
+from src.compact_model import COMPACT_MAGIC, CompactModel, load_model
+from src.fast_path import FastPathFilter
+from src.inference import NBInferenceEngine, supports_native_inference
+from src.prediction_cache import PredictionCache
+from src.prediction_stats import PredictionStats
+from src.rule_filter import RULE_AMBIGUOUS, RuleFilter
+
+# 逐条日志模式：off 不输出；hits 仅输出敏感命中（INFO）；all 输出全部（DEBUG）
+ITEM_LOG_MODES = ('off', 'hits', 'all')
+
+# 工作进程内的模型实例，每个进程只加载一次
+_worker_pipeline = None
+
+# 模型快照：一次预测调用使用的全部模型状态，热更新时整体替换，不会出现新旧版本混用
+ModelState = namedtuple('ModelState', ['pipeline', 'fast_path', 'version', 'digest', 'cache_token'])
+
+
+def _inference_model(model, native):
+    """支持时把 TF-IDF + MultinomialNB 的 Pipeline 替换为原生推理引擎，其余模型原样返回"""
+    if native and supports_native_inference(model):
+        return NBInferenceEngine.from_pipeline(model)
+    return model
+
+
+def _init_worker(model_path, pipeline=None, native=True):
+    """
+    工作进程初始化：每个进程只加载一次模型
+    fork 模式下直接继承父进程已加载的 pipeline（写时复制）；
+    其他启动方式下以 mmap 方式加载，多个进程共享模型中的数组页
+    """
+    global _worker_pipeline
+    if pipeline is not None:
+        _worker_pipeline = pipeline
+    else:
+        _worker_pipeline = _inference_model(load_model(model_path, mmap=True), native)
+
+
+def _predict_chunk(texts):
+    """工作进程中对一个分片执行单次向量化并返回概率矩阵"""
+    return ModelPredictor._predict_proba_matrix(_worker_pipeline, texts)
 
 
 class ModelPredictor:
@@ -11,11 +67,93 @@ class ModelPredictor:
     负责加载模型并执行预测
     """
 
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, item_log_mode=None, log_sample_rate=None, cache_size=None, use_rules=None,
+                 native=None, fast_path=None):
+        """
+        :param model_path: 模型路径，默认使用 LATEST_MODEL_PATH
+        :param item_log_mode: 逐条日志模式，off / hits / all，默认使用 PREDICT_ITEM_LOG_MODE
+        :param log_sample_rate: 逐条日志采样率 (0, 1]，默认使用 PREDICT_LOG_SAMPLE_RATE
+        :param cache_size: 结果缓存容量（条），0 表示关闭，默认使用 PREDICT_CACHE_SIZE
+        :param use_rules: 是否在模型前执行规则预过滤，默认使用 PREDICT_RULE_FILTER
+        :param native: TF-IDF + MultinomialNB 模型是否使用原生推理引擎，默认使用 PREDICT_NATIVE_ENGINE
+        :param fast_path: 是否按文本统计量提前判定明显非敏感的文本，默认使用 PREDICT_FAST_PATH
+        """
         self.model_path = model_path or LATEST_MODEL_PATH
-        self.pipeline = None
+        self.item_log_mode = item_log_mode or PREDICT_ITEM_LOG_MODE
+        self.log_sample_rate = PREDICT_LOG_SAMPLE_RATE if log_sample_rate is None else log_sample_rate
+        if self.item_log_mode not in ITEM_LOG_MODES:
+            raise ValueError(f"不支持的逐条日志模式: {self.item_log_mode}，可选: {ITEM_LOG_MODES}")
+        if not 0 < self.log_sample_rate <= 1:
+            raise ValueError(f"log_sample_rate 必须在 (0, 1] 区间内: {self.log_sample_rate}")
+        self.stats = PredictionStats(window=PREDICT_STATS_WINDOW)
+        cache_size = PREDICT_CACHE_SIZE if cache_size is None else cache_size
+        self.cache = PredictionCache(cache_size) if cache_size else None
+        use_rules = PREDICT_RULE_FILTER if use_rules is None else use_rules
+        self.rule_filter = RuleFilter() if use_rules else None
+        self.native = PREDICT_NATIVE_ENGINE if native is None else native
+        self.use_fast_path = PREDICT_FAST_PATH if fast_path is None else fast_path
+        # 当前模型快照，快速路径边界随模型文件保存，加载模型时一并读取
+        self._state = ModelState(None, None, 0, None, None)
+        self._model_signature = None
+        self._rejected_signature = None
+        self._reload_lock = threading.Lock()
+        self._watch_thread = None
+        self._watch_stop = None
+        self._executor = None
+        self._executor_workers = None
+        self._executor_pipeline = None
         self._load_model()
 
+    @property
+    def pipeline(self):
+        """当前模型"""
+        return self._state.pipeline
+
+    @property
+    def fast_path(self):
+        """当前模型携带的快速路径"""
+        return self._state.fast_path
+
+    @property
+    def model_version(self):
+        """当前模型版本号，每次加载或热更新递增"""
+        return self._state.version
+
+    @property
+    def model_hash(self):
+        """当前模型文件内容哈希"""
+        return self._state.digest
+
+    def _swap_state(self, pipeline, fast_path, digest):
+        """以单次引用赋值切换模型快照，并使旧模型的缓存结果失效"""
+        version = self._state.version + 1
+        # 版本号单调递增，作为缓存令牌不会与旧模型冲突
+        self._state = ModelState(pipeline, fast_path, version, digest, version)
+        if self.cache is not None:
+            self.cache.reset(version)
+
+    def _file_signature(self):
+        """模型文件的 (mtime, size)，用于低成本判断文件是否变化"""
+        try:
+            stat = os.stat(self.model_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_model_file(self):
+        """一次读取模型文件，返回 (pipeline, 快速路径, 内容哈希, 文件签名)，快速路径使用模型携带的边界"""
+        signature = self._file_signature()
+        with open(self.model_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if data.startswith(COMPACT_MAGIC):
+            # 紧凑格式以内存映射方式加载，多个预测进程共享同一份物理页
+            model = CompactModel.load(self.model_path)
+        else:
+            model = joblib.load(io.BytesIO(data))
+        fast_path = FastPathFilter.from_model(model) if self.use_fast_path else None
+        return _inference_model(model, self.native), fast_path, digest, signature
+
     def _load_model(self):
         """加载训练好的模型"""
         if not os.path.exists(self.model_path):
@@ -23,45 +161,431 @@ class ModelPredictor:
             raise FileNotFoundError(f"模型未找到，请先运行训练脚本。")
 
         try:
-            self.pipeline = joblib.load(self.model_path)
+            pipeline, fast_path, digest, self._model_signature = self._read_model_file()
+            # 金丝雀样本校验同时完成预热（如加载分词词典），避免首个请求出现延迟尖峰
+            self._validate_pipeline(pipeline)
+            self._swap_state(pipeline, fast_path, digest)
             logger.success(f"✅ 模型加载成功: {self.model_path}")
         except Exception as e:
             logger.error(f"❌ 模型加载失败: {e}")
             raise
 
-    def predict(self, texts):
+    def _validate_pipeline(self, pipeline):
+        """在金丝雀样本上校验新模型，校验失败抛出 ValueError"""
+        current = self.pipeline
+        if current is not None and list(pipeline.classes_) != list(current.classes_):
+            raise ValueError(f"类别不一致: {list(pipeline.classes_)} != {list(current.classes_)}")
+
+        probabilities = self._predict_proba_matrix(pipeline, list(MODEL_CANARY_TEXTS))
+        if probabilities.shape != (len(MODEL_CANARY_TEXTS), len(pipeline.classes_)):
+            raise ValueError(f"概率矩阵形状异常: {probabilities.shape}")
+        if not np.all(np.isfinite(probabilities)) or not np.allclose(probabilities.sum(axis=1), 1.0):
+            raise ValueError("概率矩阵包含非法值")
+
+    def reload(self):
         """
-        预测文本是否为敏感信息
-        :param texts: str 或 list[str]
-        :return: list[dict] 包含文本、标签、置信度等信息
+        重新加载模型文件：后台加载并在金丝雀样本上校验通过后原子替换
+        正在执行的预测持有旧模型的引用，不受替换影响
+        :return: bool 是否完成替换
+        """
+        with self._reload_lock:
+            try:
+                pipeline, fast_path, digest, signature = self._read_model_file()
+                self._validate_pipeline(pipeline)
+            except Exception as e:
+                self._rejected_signature = self._file_signature()
+                logger.error(f"❌ 新模型加载或校验失败，继续使用当前模型: {e}")
+                return False
+
+            # 模型、快速路径边界与缓存令牌组成同一个快照，单次引用赋值即完成切换
+            self._swap_state(pipeline, fast_path, digest)
+            self._model_signature = signature
+            self._rejected_signature = None
+            # 持有旧模型的工作进程在完成已提交任务后退出，下次并行预测时按新模型重建
+            self._shutdown_executor(wait=False)
+            logger.success(f"🔄 模型热更新完成: {self.model_path} (版本 {self.model_version}, {digest[:12]})")
+            return True
+
+    def check_for_update(self):
+        """
+        检查模型文件是否被替换（先比较 mtime/大小，再比较内容哈希），有变化则重新加载
+        :return: bool 是否完成替换
+        """
+        signature = self._file_signature()
+        if signature is None or signature in (self._model_signature, self._rejected_signature):
+            return False
+
+        with open(self.model_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if digest == self.model_hash:
+            # 仅时间戳变化，内容未变
+            self._model_signature = signature
+            return False
+
+        logger.info(f"🔍 检测到模型文件变化: {self.model_path}")
+        return self.reload()
+
+    def _watch_loop(self, interval):
+        while not self._watch_stop.wait(interval):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                logger.warning(f"⚠️ 模型文件检查失败: {e}")
+
+    def start_watching(self, interval=None):
+        """
+        启动后台线程监视模型文件，文件更新后自动热加载
+        :param interval: 轮询间隔（秒），默认使用 MODEL_WATCH_INTERVAL
+        """
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        interval = interval or MODEL_WATCH_INTERVAL
+        self._watch_stop = threading.Event()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(interval,), name='model-watcher', daemon=True
+        )
+        self._watch_thread.start()
+        logger.info(f"👀 已开启模型热更新监视: {self.model_path} (间隔 {interval}s)")
+
+    def stop_watching(self):
+        """停止模型文件监视"""
+        if self._watch_thread is not None:
+            self._watch_stop.set()
+            self._watch_thread.join()
+            self._watch_thread = None
+            self._watch_stop = None
+
+    def _prepare_texts(self, texts):
+        """
+        统一输入格式，并取得本次调用使用的模型快照
+        整个调用过程只使用该快照，热更新不会影响进行中的预测
         """
         if isinstance(texts, str):
             texts = [texts]
 
         # 确保模型已加载
-        if self.pipeline is None:
+        state = self._state
+        if state.pipeline is None:
             logger.error("❌ 模型未加载")
             raise RuntimeError("模型未加载，请先加载模型。")
 
+        return texts, state
+
+    @staticmethod
+    def _predict_proba_matrix(pipeline, texts):
+        """
+        单次向量化得到概率矩阵
+        特征提取只执行一次，避免 predict + predict_proba 重复计算 TF-IDF
+        """
+        if not isinstance(pipeline, Pipeline):
+            # 紧凑格式模型与原生推理引擎一次完成向量化和打分
+            return pipeline.predict_proba(texts)
+        features = pipeline[:-1].transform(texts)
+        return pipeline[-1].predict_proba(features)
+
+    def _score(self, state, texts, compute):
+        """
+        计算概率矩阵：批内去重后只对每个唯一文本打分一次；
+        去重与缓存均以原文为键、对原文打分，首尾空白会影响字符统计特征与快速路径，不做规范化，
+        保证结果与直接调用模型一致；
+        依次经过规则预过滤和快速路径，提前判定的文本和命中缓存的文本都不再向量化
+        :param state: 本次调用的模型快照
+        :param compute: callable(pipeline, texts) -> 概率矩阵，实际执行打分
+        :return: (概率矩阵, 判定原因)，原因为 rule:<规则名> / fast:<原因> / model
+        """
+        index = {}
+        inverse = np.empty(len(texts), dtype=np.intp)
+        for i, text in enumerate(texts):
+            inverse[i] = index.setdefault(text, len(index))
+        unique_texts = list(index)
+
+        labels = np.full(len(unique_texts), RULE_AMBIGUOUS, dtype=np.int8)
+        reasons = np.full(len(unique_texts), 'model', dtype=object)
+        pending = np.arange(len(unique_texts))
+        for prefix, stage in (('rule', self.rule_filter), ('fast', state.fast_path)):
+            if stage is None or not len(pending):
+                continue
+            stage_labels, stage_reasons = stage.classify([unique_texts[i] for i in pending])
+            decided = stage_labels != RULE_AMBIGUOUS
+            labels[pending[decided]] = stage_labels[decided]
+            reasons[pending[decided]] = [f'{prefix}:{reason}' for reason, hit in zip(stage_reasons, decided) if hit]
+            pending = pending[~decided]
+
+        if len(pending) == len(unique_texts):
+            return self._score_cached(state, unique_texts, compute)[inverse], reasons[inverse]
+
+        # 提前判定的文本置信度为 1
+        probabilities = (state.pipeline.classes_ == labels[:, None]).astype(np.float64)
+        if len(pending):
+            probabilities[pending] = self._score_cached(state, [unique_texts[i] for i in pending], compute)
+        return probabilities[inverse], reasons[inverse]
+
+    def _score_cached(self, state, texts, compute):
+        """对唯一文本打分，命中缓存的文本直接使用缓存结果"""
+        pipeline = state.pipeline
+        cache = self.cache
+        if cache is None:
+            return compute(pipeline, texts)
+
+        # 以快照的缓存令牌区分模型版本，热更新后旧模型的结果不会被读取或写入
+        token = state.cache_token
+        keys = [cache.make_key(text) for text in texts]
+        rows = cache.get_many(keys, token)
+        missing = [i for i, row in enumerate(rows) if row is None]
+
+        if missing:
+            computed = compute(pipeline, [texts[i] for i in missing])
+            # 复制为独立的行，避免缓存项引用整个批次矩阵
+            new_rows = [row.copy() for row in computed]
+            cache.put_many([keys[i] for i in missing], new_rows, token)
+            for i, row in zip(missing, new_rows):
+                rows[i] = row
+
+        return np.vstack(rows)
+
+    def cache_info(self):
+        """返回结果缓存的命中/未命中/淘汰计数，未启用缓存时返回 None"""
+        return self.cache.info() if self.cache is not None else None
+
+    def rule_info(self):
+        """返回规则预过滤的各规则命中次数，未启用时返回 None"""
+        return self.rule_filter.info() if self.rule_filter is not None else None
+
+    def fast_path_info(self):
+        """返回快速路径各原因的判定次数，未启用时返回 None"""
+        return self.fast_path.info() if self.fast_path is not None else None
+
+    def predict_proba_only(self, texts):
+        """
+        仅返回原始概率矩阵，不构造逐条结果字典，适合高吞吐扫描场景
+        :param texts: str 或 list[str]
+        :return: numpy.ndarray, 形状 (n_samples, n_classes)，列顺序与 self.pipeline.classes_ 一致
+        """
+        texts, state = self._prepare_texts(texts)
+
         try:
-            predictions = self.pipeline.predict(texts)
-            probabilities = self.pipeline.predict_proba(texts)
-
-            results = []
-            for text, pred, prob in zip(texts, predictions, probabilities):
-                label = "敏感" if pred == 1 else "非敏感"
-                confidence = max(prob)
-                result = {
-                    'text': text,
-                    'label': label,
-                    'confidence': round(confidence, 4),
-                    'is_sensitive': int(pred)
-                }
-                results.append(result)
-                logger.info(f"📝 '{text}' -> {label} (置信度: {confidence:.4f})")
-
-            return results
+            started = time.perf_counter()
+            probabilities, _ = self._score(state, texts, self._predict_proba_matrix)
+            self._observe(state.pipeline, texts, probabilities, started)
+            return probabilities
+        except Exception as e:
+            logger.error(f"❌ 预测过程中发生错误: {e}")
+            raise
+
+    def _observe(self, pipeline, texts, probabilities, started):
+        """
+        记录批次聚合统计，并按配置输出逐条日志
+        :return: numpy.ndarray 由概率矩阵推导出的预测标签
+        """
+        # 由概率矩阵直接推导标签，与 pipeline.predict 的结果一致
+        predictions = pipeline.classes_[probabilities.argmax(axis=1)]
+        hit_mask = predictions == 1
+        n_hits = int(hit_mask.sum())
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        self.stats.record(len(texts), n_hits, latency_ms)
+        logger.debug("📦 批次完成: {} 条, 命中 {} 条, 耗时 {:.2f} ms", len(texts), n_hits, latency_ms)
+
+        if self.item_log_mode != 'off':
+            self._log_items(texts, predictions, probabilities, hit_mask)
+        return predictions
+
+    def _log_items(self, texts, predictions, probabilities, hit_mask):
+        """按日志模式和采样率输出逐条预测日志"""
+        if self.item_log_mode == 'all':
+            level, indices = "DEBUG", range(len(texts))
+        else:
+            level, indices = "INFO", np.flatnonzero(hit_mask)
+
+        if self.log_sample_rate < 1:
+            indices = [i for i in indices if random.random() < self.log_sample_rate]
+
+        for i in indices:
+            label = "敏感" if predictions[i] == 1 else "非敏感"
+            # 使用 loguru 的延迟格式化，消息未被输出时不产生格式化开销
+            logger.log(level, "📝 '{}' -> {} (置信度: {:.4f})", texts[i], label, probabilities[i].max())
+
+    def _build_results(self, texts, predictions, probabilities, reasons):
+        """根据预测标签、概率矩阵和判定原因构造逐条预测结果"""
+        results = []
+        for text, pred, prob, reason in zip(texts, predictions, probabilities, reasons):
+            results.append({
+                'text': text,
+                'label': "敏感" if pred == 1 else "非敏感",
+                'confidence': round(max(prob), 4),
+                'is_sensitive': int(pred),
+                'reason': reason
+            })
+        return results
+
+    def predict(self, texts):
+        """
+        预测文本是否为敏感信息
+        :param texts: str 或 list[str]
+        :return: list[dict] 包含文本、标签、置信度及判定原因（rule:<规则名> / fast:<原因> / model）等信息
+        """
+        texts, state = self._prepare_texts(texts)
+
+        try:
+            started = time.perf_counter()
+            probabilities, reasons = self._score(state, texts, self._predict_proba_matrix)
+            predictions = self._observe(state.pipeline, texts, probabilities, started)
+            return self._build_results(texts, predictions, probabilities, reasons)
 
         except Exception as e:
             logger.error(f"❌ 预测过程中发生错误: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def predict_stream(self, iterable, batch_size=None):
+        """
+        流式批量预测：惰性读取输入，按固定大小分块向量化并逐条产出结果
+        内存占用只与 batch_size 相关，与输入总量无关
+        :param iterable: 任意可迭代的文本序列（如文件对象、生成器）
+        :param batch_size: 每批向量化的条数，默认使用 PREDICT_BATCH_SIZE
+        :return: 生成器，逐条产出与 predict 相同结构的 dict
+        """
+        batch_size = batch_size or PREDICT_BATCH_SIZE
+        if batch_size <= 0:
+            raise ValueError(f"batch_size 必须为正整数: {batch_size}")
+
+        iterator = iter(iterable)
+        total = 0
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+            yield from self.predict(batch)
+            total += len(batch)
+
+        logger.debug(f"流式预测完成，共 {total} 条")
+
+    def _get_executor(self, n_jobs, pipeline):
+        """获取（必要时创建）进程池，进程池在多次调用之间复用，模型更新后重建"""
+        if (self._executor is not None and self._executor_workers == n_jobs
+                and self._executor_pipeline is pipeline):
+            return self._executor
+        # 旧进程池中已提交的任务继续执行，不阻塞当前调用
+        self._shutdown_executor(wait=False)
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # fork 模式：子进程通过写时复制共享父进程中已加载的模型
+            context = multiprocessing.get_context('fork')
+            initargs = (self.model_path, pipeline)
+        else:
+            context = multiprocessing.get_context('spawn')
+            initargs = (self.model_path, None, self.native)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=initargs,
+        )
+        self._executor_workers = n_jobs
+        self._executor_pipeline = pipeline
+        logger.info(f"⚙️ 并行预测进程池已启动，进程数: {n_jobs}")
+        return self._executor
+
+    def predict_proba_parallel(self, texts, n_jobs=None, chunk_size=None):
+        """
+        多进程并行计算概率矩阵
+        输入按 chunk_size 分片后分发到进程池，结果按输入顺序拼接
+        :param texts: str 或 list[str]
+        :param n_jobs: 工作进程数，默认使用 PREDICT_N_JOBS
+        :param chunk_size: 每个分片的条数，默认使用 PREDICT_CHUNK_SIZE
+        :return: numpy.ndarray, 形状 (n_samples, n_classes)
+        """
+        texts, state = self._prepare_texts(texts)
+        started = time.perf_counter()
+        probabilities, _ = self._score(
+            state, texts, lambda p, batch: self._proba_parallel(p, batch, n_jobs, chunk_size)
+        )
+        self._observe(state.pipeline, texts, probabilities, started)
+        return probabilities
+
+    def _proba_parallel(self, pipeline, texts, n_jobs, chunk_size):
+        """并行计算概率矩阵（不记录统计）"""
+        n_jobs = n_jobs or PREDICT_N_JOBS
+        chunk_size = chunk_size or PREDICT_CHUNK_SIZE
+        if n_jobs <= 0 or chunk_size <= 0:
+            raise ValueError(f"n_jobs 和 chunk_size 必须为正整数: {n_jobs}, {chunk_size}")
+
+        # 数据量不足一个分片或只有一个进程时，直接在当前进程计算
+        if n_jobs == 1 or len(texts) <= chunk_size:
+            return self._predict_proba_matrix(pipeline, texts)
+
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        try:
+            executor = self._get_executor(n_jobs, pipeline)
+            # executor.map 按提交顺序返回结果
+            return np.vstack(list(executor.map(_predict_chunk, chunks)))
+        except Exception as e:
+            logger.error(f"❌ 并行预测过程中发生错误: {e}")
+            raise
+
+    def predict_parallel(self, texts, n_jobs=None, chunk_size=None):
+        """
+        多进程并行预测，返回结构与 predict 相同，顺序与输入一致
+        :param texts: str 或 list[str]
+        :param n_jobs: 工作进程数，默认使用 PREDICT_N_JOBS
+        :param chunk_size: 每个分片的条数，默认使用 PREDICT_CHUNK_SIZE
+        :return: list[dict]
+        """
+        texts, state = self._prepare_texts(texts)
+        started = time.perf_counter()
+        probabilities, reasons = self._score(
+            state, texts, lambda p, batch: self._proba_parallel(p, batch, n_jobs, chunk_size)
+        )
+        predictions = self._observe(state.pipeline, texts, probabilities, started)
+        return self._build_results(texts, predictions, probabilities, reasons)
+
+    def log_stats(self):
+        """以 INFO 级别输出当前聚合统计"""
+        snapshot = self.stats.snapshot()
+        logger.info(
+            "📊 预测统计: 批次 {batches}, 条数 {items}, 命中 {hits} (命中率 {hit_rate:.2%}), "
+            "批次延迟 p50/p95/p99 = {b[p50]}/{b[p95]}/{b[p99]} ms, "
+            "单条延迟 p50/p99 = {i[p50]}/{i[p99]} ms",
+            b=snapshot['batch_latency_ms'], i=snapshot['item_latency_ms'], **snapshot
+        )
+        cache_info = self.cache_info()
+        if cache_info is not None:
+            logger.info(
+                "🗃️ 结果缓存: {size}/{maxsize}, 命中 {hits}, 未命中 {misses}, 淘汰 {evictions} (命中率 {hit_rate:.2%})",
+                **cache_info
+            )
+            snapshot['cache'] = cache_info
+        rule_info = self.rule_info()
+        if rule_info is not None:
+            logger.info(
+                "🧭 规则预过滤: 判定 {decided}/{total} (占比 {decided_rate:.2%}), 各规则命中 {rules}",
+                **rule_info
+            )
+            snapshot['rules'] = rule_info
+        fast_path_info = self.fast_path_info()
+        if fast_path_info is not None:
+            logger.info(
+                "⚡ 快速路径: 判定 {decided}/{total} (占比 {decided_rate:.2%}), 各原因 {reasons}",
+                **fast_path_info
+            )
+            snapshot['fast_path'] = fast_path_info
+        return snapshot
+
+    def _shutdown_executor(self, wait=True):
+        """关闭进程池；wait=False 时已提交的任务仍会执行完毕"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            self._executor_workers = None
+            self._executor_pipeline = None
+
+    def close(self):
+        """停止模型监视并关闭并行预测进程池"""
+        self.stop_watching()
+        self._shutdown_executor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
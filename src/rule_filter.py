@@ -0,0 +1,105 @@
+# src/rule_filter.py
+from collections import Counter
+import re
+import threading
+
+import numpy as np
+
+from src.generate_sensitive_data.normal_code_generator import NormalCodeGenerator
+from src.generate_sensitive_data.password_style import (
+    CommonWeakPassword, HuaweiStylePassword, TokenStylePassword, DjangoTokenStylePassword
+)
+
+# 规则判定结果：敏感 / 非敏感 / 交给模型
+RULE_POSITIVE, RULE_NEGATIVE, RULE_AMBIGUOUS = 1, 0, -1
+
+# 明显非敏感的形状 {规则名: 正则}；默认不设，按字符类别整体放行会让全角字符写成的密钥绕过模型
+NEGATIVE_PATTERNS = {}
+
+
+def default_styles():
+    """与数据生成使用相同定义的密码风格"""
+    return [CommonWeakPassword(), HuaweiStylePassword(), TokenStylePassword(), DjangoTokenStylePassword()]
+
+
+class RuleFilter:
+    """
+    模型前的规则预过滤
+    由密码风格定义（PasswordStyle.rule_patterns / rule_literals）构建：
+    - 字面量（已知代码片段）放入一张哈希表，一次查表完成全部字面量的精确匹配
+    - 正则形状（JWT、带前缀的 Token、凭据键名后的 UUID）合并为一个带命名分组的正则，一次整串匹配同时尝试全部规则
+    只对格式独特的文本直接给出结论；弱密码等需要结合上下文判断的文本一律交给模型
+    """
+
+    def __init__(self, styles=None, negative_patterns=None):
+        """
+        :param styles: 提供规则的 PasswordStyle 列表，默认使用 default_styles()
+        :param negative_patterns: 非敏感形状的正则 {规则名: 正则}，默认使用 NEGATIVE_PATTERNS
+        """
+        styles = default_styles() if styles is None else styles
+        negative_patterns = NEGATIVE_PATTERNS if negative_patterns is None else negative_patterns
+
+        self._literals = {}
+        for snippets in NormalCodeGenerator.SNIPPETS.values():
+            self._literals.update((snippet, (RULE_NEGATIVE, 'code_snippet')) for snippet in snippets)
+        # 敏感字面量后写入，与代码片段冲突时以敏感为准
+        for style in styles:
+            for name, literals in style.rule_literals().items():
+                self._literals.update((literal, (RULE_POSITIVE, name)) for literal in literals)
+
+        rules = [(name, RULE_POSITIVE, pattern) for style in styles for name, pattern in style.rule_patterns().items()]
+        rules += [(name, RULE_NEGATIVE, pattern) for name, pattern in negative_patterns.items()]
+        # 分组名用序号，避免规则名不是合法标识符；lastgroup 即命中的规则
+        self._groups = {f'r{i}': (label, name) for i, (name, label, _) in enumerate(rules)}
+        self._regex = re.compile('|'.join(f'(?P<r{i}>{pattern})' for i, (_, _, pattern) in enumerate(rules))) \
+            if rules else None
+
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    @property
+    def rule_names(self):
+        """全部规则名"""
+        return sorted({name for _, name in self._literals.values()} | {name for _, name in self._groups.values()})
+
+    def match(self, text):
+        """
+        对单条文本执行规则匹配
+        :return: (判定结果, 规则名)，未命中时为 (RULE_AMBIGUOUS, None)
+        """
+        hit = self._literals.get(text)
+        if hit is not None:
+            return hit
+        m = self._regex.fullmatch(text) if self._regex is not None else None
+        if m is None:
+            return RULE_AMBIGUOUS, None
+        return self._groups[m.lastgroup]
+
+    def classify(self, texts):
+        """
+        批量规则判定
+        :return: (labels, rules)，labels 为 int8 数组（1 敏感 / 0 非敏感 / -1 交给模型），rules 为命中的规则名列表
+        """
+        labels = np.empty(len(texts), dtype=np.int8)
+        rules = []
+        counts = Counter()
+        for i, text in enumerate(texts):
+            labels[i], rule = self.match(text)
+            rules.append(rule)
+            counts[rule or 'ambiguous'] += 1
+        with self._lock:
+            self._counts.update(counts)
+        return labels, rules
+
+    def info(self):
+        """返回各规则命中次数与规则判定占比"""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        decided = total - counts.get('ambiguous', 0)
+        return {
+            'total': total,
+            'decided': decided,
+            'decided_rate': round(decided / total, 4) if total else 0.0,
+            'rules': counts,
+        }
@@ -0,0 +1,102 @@
+# src/tokenizer.py
+from functools import lru_cache
+import logging
+import os
+import re
+import threading
+
+from loguru import logger
+
+from config import CACHE_DIR, TOKENIZER_CACHE_SIZE
+
+try:
+    import jieba
+except ImportError:
+    # jieba 缺失时中文片段退化为字符 n-gram
+    jieba = None
+
+# 中日韩统一表意文字（含扩展 A 与兼容区）
+_CJK_RUN = re.compile(r'([\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+)')
+# 与 TfidfVectorizer 默认 token_pattern 一致
+_WORD = re.compile(r'(?u)\b\w\w+\b')
+
+_jieba_lock = threading.Lock()
+_jieba_ready = False
+
+
+def preload_dictionary():
+    """
+    预加载 jieba 词典
+    前缀词典缓存固定写在 CACHE_DIR 下，进程再次启动时直接反序列化，不会重新构建
+    :return: bool jieba 是否可用
+    """
+    global _jieba_ready
+    if jieba is None:
+        return False
+    if _jieba_ready:
+        return True
+
+    with _jieba_lock:
+        if not _jieba_ready:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            jieba.dt.tmp_dir = CACHE_DIR
+            jieba.setLogLevel(logging.WARNING)
+            jieba.initialize()
+            _jieba_ready = True
+            logger.debug(f"jieba 词典已加载，缓存目录: {CACHE_DIR}")
+    return True
+
+
+def _char_ngrams(run, n):
+    """字符 n-gram，长度不足 n 时返回整段"""
+    if len(run) <= n:
+        return [run]
+    return [run[i:i + n] for i in range(len(run) - n + 1)]
+
+
+@lru_cache(maxsize=TOKENIZER_CACHE_SIZE)
+def _segment_cjk(run, use_jieba, char_ngram):
+    """对一段连续中文分词，结果按 (文本, 配置) 记忆化"""
+    if use_jieba and preload_dictionary():
+        return tuple(word for word in jieba.lcut(run, HMM=True) if word.strip())
+    return tuple(_char_ngrams(run, char_ngram))
+
+
+class ChineseTokenizer:
+    """
+    中英文混合分词器，供 TfidfVectorizer(tokenizer=...) 使用
+    连续中文片段交给 jieba 分词（未安装 jieba 时退化为字符 n-gram），
+    其余片段沿用 TfidfVectorizer 默认的 \\b\\w\\w+\\b 规则；
+    中文片段的分词结果带有进程内 LRU 缓存
+    """
+
+    def __init__(self, use_jieba=True, char_ngram=2):
+        """
+        :param use_jieba: 是否使用 jieba 分词
+        :param char_ngram: 不使用 jieba 时中文片段的字符 n-gram 长度
+        """
+        self.use_jieba = use_jieba
+        self.char_ngram = char_ngram
+
+    def get_config(self):
+        return {'use_jieba': self.use_jieba, 'char_ngram': self.char_ngram}
+
+    def __call__(self, text):
+        tokens = []
+        # re.split 带捕获组时，奇数位置为中文片段
+        for i, part in enumerate(_CJK_RUN.split(text)):
+            if not part:
+                continue
+            if i % 2:
+                tokens.extend(_segment_cjk(part, self.use_jieba, self.char_ngram))
+            else:
+                tokens.extend(_WORD.findall(part))
+        return tokens
+
+    def __repr__(self):
+        return f"ChineseTokenizer(use_jieba={self.use_jieba}, char_ngram={self.char_ngram})"
+
+
+def segmentation_cache_info():
+    """返回中文分词缓存的命中统计"""
+    return _segment_cjk.cache_info()
@@ -1,13 +1,36 @@
 # src/trainer.py
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
+from sklearn.pipeline import FeatureUnion, Pipeline
 from sklearn.metrics import classification_report, accuracy_score
 from loguru import logger
-import pandas as pd
+from itertools import islice
 import joblib
-from config import DATA_PATH, LATEST_MODEL_PATH, get_timestamped_model_path
+import numpy as np
+import os
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+import tempfile
+from config import (
+    DATA_PATH, LATEST_MODEL_PATH, COMPRESS_PRUNE_THRESHOLD,
+    COMPRESS_QUANTIZE, TFIDF_TOKENIZER, FEATURE_MODE,
+    TFIDF_MAX_FEATURES, TEXT_STATS_FEATURES, TEXT_STATS_WEIGHT, HASHING_N_FEATURES, HASHING_USE_IDF,
+    INCREMENTAL_CHUNK_SIZE, INCREMENTAL_CHECKPOINT_PATH, INCREMENTAL_CHECKPOINT_EVERY, INCREMENTAL_TEST_SIZE,
+    INCREMENTAL_EVAL_MAX_ROWS, INCREMENTAL_CLASSES,
+    FEATURE_CACHE_ENABLED, TRAIN_DEDUP, DEDUP_MINHASH_PERMUTATIONS, DEDUP_LSH_BANDS, DEDUP_NEAR_THRESHOLD,
+    DEDUP_SHINGLE_SIZE
+)
+from src.compact_model import CompactModel, export_compact_model, supports_compact_export
+from src.dataset_io import dataset_digest, read_dataset, iter_dataset
+from src.dedup import dedup
+from src.fast_path import FastPathFilter
+from src.feature_cache import FeatureCache, feature_key
+from src.features import StreamingTfidfTransformer, TextStatsFeaturizer, fit_weighted_tfidf
+from src.inference import NBInferenceEngine, supports_native_inference
+from src.model_registry import ModelRegistry
+from src.tokenizer import ChineseTokenizer
 
 
 class ModelTrainer:
@@ -16,46 +39,134 @@ class ModelTrainer:
     负责加载数据、训练、评估和保存模型
     """
 
-    def __init__(self):
+    # 训练集 / 测试集划分参数，同时参与特征缓存键的计算
+    SPLIT_PARAMS = {'test_size': 0.2, 'random_state': 42}
+
+    def __init__(self, data_path=None, use_cache=None, dedup_mode=None):
+        """
+        :param data_path: 训练数据路径，格式由扩展名决定（parquet/arrow/csv/jsonl/xlsx），默认使用 DATA_PATH
+        :param use_cache: 是否缓存清洗后的数据集与训练集特征矩阵，默认使用 FEATURE_CACHE_ENABLED
+        :param dedup_mode: 训练集去重方式（off / exact / near），默认使用 TRAIN_DEDUP
+        """
+        self.data_path = data_path or DATA_PATH
+        self.dedup_mode = dedup_mode or TRAIN_DEDUP
+        use_cache = FEATURE_CACHE_ENABLED if use_cache is None else use_cache
+        self.feature_cache = FeatureCache() if use_cache else None
+        self.dataset_digest = None
         self.pipeline = None
+        self.fast_path = None
         self.X_test = None
         self.y_test = None
+        self.accuracy = None
         logger.info("ModelTrainer 初始化完成")
 
     def load_data(self):
         """加载并清洗训练数据"""
         try:
-            logger.info(f"正在加载数据: {DATA_PATH}")
-            df = pd.read_excel(DATA_PATH)
+            logger.info(f"正在加载数据: {self.data_path}")
+            if self.feature_cache is not None:
+                self.dataset_digest = dataset_digest(self.data_path)
+                cached = self.feature_cache.load_dataset(self.dataset_digest)
+                if cached is not None:
+                    texts, labels = cached
+                    logger.success(f"✅ 命中数据集缓存，共 {len(texts)} 条记录")
+                    return pd.Series(texts, name='text'), pd.Series(labels, name='is_sensitive')
+
+            df = read_dataset(self.data_path, columns=['text', 'is_sensitive'])
             logger.success(f"✅ 数据加载成功，共 {len(df)} 条记录")
 
             # 清洗
             df.dropna(subset=['text', 'is_sensitive'], inplace=True)
             logger.debug(f"数据清洗完成，剩余 {len(df)} 条有效数据")
 
-            return df['text'].astype(str), df['is_sensitive']
+            X, y = df['text'].astype(str), df['is_sensitive'].astype(int)
+            if self.feature_cache is not None:
+                self.feature_cache.save_dataset(self.dataset_digest, X.tolist(), y.to_numpy())
+            return X, y
         except Exception as e:
             logger.error(f"❌ 数据加载失败: {e}")
             raise
 
+    @staticmethod
+    def _tokenizer_params():
+        """分词相关参数，分词方式由 TFIDF_TOKENIZER 决定"""
+        if TFIDF_TOKENIZER == 'chinese':
+            return {'tokenizer': ChineseTokenizer(), 'token_pattern': None}
+        if TFIDF_TOKENIZER == 'default':
+            return {}
+        raise ValueError(f"不支持的分词方式: {TFIDF_TOKENIZER}")
+
+    @classmethod
+    def build_vectorizer(cls, params=None):
+        """
+        构建 TF-IDF 向量化器
+        :param params: 覆盖默认参数（如模型搜索中的 analyzer / ngram_range / max_features）；
+                       word 分词沿用 TFIDF_TOKENIZER，char / char_wb 使用字符 n-gram
+        """
+        params = {'ngram_range': (1, 2), 'max_features': TFIDF_MAX_FEATURES, **(params or {})}
+        params['ngram_range'] = tuple(params['ngram_range'])
+        if params.get('analyzer', 'word') == 'word':
+            params.update(cls._tokenizer_params())
+        return TfidfVectorizer(**params)
+
+    @classmethod
+    def build_hashing_vectorizer(cls):
+        """
+        构建特征哈希向量化器：无状态、不保存词表，内存与语料词表规模无关
+        MultinomialNB 要求特征非负，因此关闭 alternate_sign；归一化交给后续的 TF-IDF 步骤
+        """
+        return HashingVectorizer(ngram_range=(1, 2), n_features=HASHING_N_FEATURES,
+                                 alternate_sign=False, norm=None, **cls._tokenizer_params())
+
+    @classmethod
+    def build_feature_steps(cls, mode=None, vectorizer_params=None):
+        """
+        构建特征提取步骤，默认由 FEATURE_MODE 决定
+        :param vectorizer_params: tfidf 模式下覆盖 TF-IDF 向量化器的参数
+        """
+        mode = mode or FEATURE_MODE
+        if mode == 'tfidf':
+            if not TEXT_STATS_FEATURES:
+                return [('tfidf', cls.build_vectorizer(vectorizer_params))]
+            # 词级 TF-IDF 与字符级统计特征横向拼接，统计特征弥补随机 Token 在词表中无法命中的问题
+            return [('features', FeatureUnion(
+                [('tfidf', cls.build_vectorizer(vectorizer_params)), ('stats', TextStatsFeaturizer())],
+                transformer_weights={'stats': TEXT_STATS_WEIGHT},
+            ))]
+        if mode == 'hashing':
+            return [
+                ('hashing', cls.build_hashing_vectorizer()),
+                ('tfidf', StreamingTfidfTransformer(use_idf=HASHING_USE_IDF)),
+            ]
+        raise ValueError(f"不支持的特征模式: {mode}")
+
     def build_pipeline(self):
         """构建机器学习 Pipeline"""
-        self.pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(ngram_range=(1, 2), max_features=5000)),
+        self.pipeline = Pipeline(self.build_feature_steps() + [
             ('classifier', MultinomialNB())
         ])
-        logger.info("Pipeline 构建完成: TF-IDF + 朴素贝叶斯")
+        stats = ' + 字符统计' if FEATURE_MODE == 'tfidf' and TEXT_STATS_FEATURES else ''
+        logger.info(f"Pipeline 构建完成: {FEATURE_MODE} 特征{stats} ({TFIDF_TOKENIZER} 分词) + 朴素贝叶斯")
 
     def train(self):
         """训练模型"""
         X, y = self.load_data()
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y, **self.SPLIT_PARAMS)
+        # 快速路径边界在去重前的训练集上学习
+        self.fast_path = FastPathFilter().fit(X_train, y_train)
+
+        # 只对训练集去重，测试集保持原样用于评估
+        X_train, y_train, weights = dedup(X_train, y_train, self.dedup_mode)
 
         self.build_pipeline()
         logger.info("开始模型训练...")
-        self.pipeline.fit(X_train, y_train)
+        if self.feature_cache is None:
+            _, features = self._fit_feature_steps(self.pipeline.steps[:-1], X_train, weights)
+            self.pipeline[-1].fit(features, y_train, sample_weight=weights)
+        else:
+            self._fit_with_feature_cache(X_train, y_train, weights)
+        # 快速路径边界随模型一起保存
+        self.fast_path.attach(self.pipeline)
 
         # 保留测试集用于评估
         self.X_test = X_test
@@ -63,6 +174,202 @@ class ModelTrainer:
 
         logger.success("🎉 模型训练完成！")
 
+    @staticmethod
+    def _fit_feature_steps(feature_steps, X_train, weights):
+        """
+        按样本权重拟合特征步骤，返回 (已拟合的特征步骤, 训练集特征矩阵)
+        TfidfVectorizer 的词表与 IDF 按权重计算，流式 IDF 通过 sample_weight 累计文档频率，
+        因此去重后训练得到的特征与在原始重复数据上训练相同
+        """
+        if len(feature_steps) == 1 and isinstance(feature_steps[0][1], (TfidfVectorizer, FeatureUnion)):
+            return feature_steps, ModelTrainer._fit_weighted_transform(feature_steps[0][1], X_train, weights)
+
+        feature_pipeline = Pipeline(feature_steps)
+        params = {f'{name}__sample_weight': weights for name, step in feature_steps
+                  if isinstance(step, StreamingTfidfTransformer)}
+        return feature_pipeline.steps, feature_pipeline.fit_transform(X_train, **params)
+
+    @staticmethod
+    def _fit_weighted_transform(step, X_train, weights):
+        """
+        原地拟合单个特征步骤并返回训练集特征矩阵
+        FeatureUnion 逐个拟合其中的转换器（TfidfVectorizer 按权重拟合），乘以 transformer_weights 后横向拼接，
+        与 FeatureUnion.fit_transform 的结果一致
+        """
+        if isinstance(step, TfidfVectorizer):
+            return fit_weighted_tfidf(step, X_train, weights)
+        if isinstance(step, FeatureUnion):
+            transformer_weights = step.transformer_weights or {}
+            blocks = []
+            for name, transformer in step.transformer_list:
+                block = sp.csr_matrix(ModelTrainer._fit_weighted_transform(transformer, X_train, weights))
+                blocks.append(block * transformer_weights[name] if name in transformer_weights else block)
+            return sp.hstack(blocks, format='csr')
+        return step.fit_transform(X_train)
+
+    def _dedup_params(self):
+        """去重配置，参与特征缓存键的计算"""
+        params = {'dedup': self.dedup_mode}
+        if self.dedup_mode == 'near':
+            params.update(permutations=DEDUP_MINHASH_PERMUTATIONS, bands=DEDUP_LSH_BANDS,
+                          threshold=DEDUP_NEAR_THRESHOLD, shingle_size=DEDUP_SHINGLE_SIZE)
+        return params
+
+    def _fit_with_feature_cache(self, X_train, y_train, weights):
+        """
+        特征步骤命中缓存时直接复用已拟合的向量化器和训练集特征矩阵，只拟合分类器；
+        未命中时正常拟合特征步骤并写入缓存
+        """
+        feature_steps = self.pipeline.steps[:-1]
+        key = feature_key(self.dataset_digest, feature_steps, {**self.SPLIT_PARAMS, **self._dedup_params()})
+        cached = self.feature_cache.load_features(key)
+        if cached is not None:
+            feature_steps, features = cached
+            logger.info(f"♻️ 命中特征缓存，跳过向量化: {features.shape}")
+        else:
+            feature_steps, features = self._fit_feature_steps(feature_steps, X_train, weights)
+            self.feature_cache.save_features(key, feature_steps, features)
+
+        self.pipeline = Pipeline(feature_steps + [self.pipeline.steps[-1]])
+        self.pipeline[-1].fit(features, y_train, sample_weight=weights)
+
+    def train_with_search(self, mode='grid', recall_target=None):
+        """
+        先并行搜索向量化配置与分类器，再用满足召回率要求的最快组合训练模型
+        :param mode: grid 或 halving
+        :param recall_target: 敏感类召回率要求，默认使用 SEARCH_RECALL_TARGET
+        :return: 选中的排行榜记录
+        """
+        from src.model_search import ModelSearch
+
+        X, y = self.load_data()
+        # 与 train() 相同的划分；搜索只使用训练集（内部再划出验证集），测试集只用于最终评估
+        X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y, **self.SPLIT_PARAMS)
+        search = ModelSearch(mode=mode, dedup_mode=self.dedup_mode)
+        search.run(X_train, y_train)
+        search.save_leaderboard()
+        best = search.select(recall_target)
+        logger.info(f"🥇 选中模型: {best['vectorizer']} + {best['classifier']}, "
+                    f"验证集召回率 {best['recall']:.4f}, p50 {best['latency_p50_ms']:.3f} ms")
+
+        self.fast_path = FastPathFilter().fit(X_train, y_train)
+        X_train, y_train, weights = dedup(X_train, y_train, self.dedup_mode)
+        self.pipeline = search.build_pipeline(best)
+        feature_steps, features = self._fit_feature_steps(self.pipeline.steps[:-1], X_train, weights)
+        self.pipeline = Pipeline(feature_steps + [self.pipeline.steps[-1]])
+        self.pipeline[-1].fit(features, y_train, sample_weight=weights)
+        self.fast_path.attach(self.pipeline)
+        self.X_test = X_test
+        self.y_test = y_test
+        logger.success("🎉 模型训练完成！")
+        return best
+
+    def _new_incremental_state(self, chunk_size, base_model_path=None):
+        """创建增量训练状态；指定 base_model_path 时在已有增量模型上继续训练"""
+        if base_model_path:
+            pipeline = joblib.load(base_model_path)
+            if not (isinstance(pipeline[0], HashingVectorizer) and isinstance(pipeline[1], StreamingTfidfTransformer)
+                    and isinstance(pipeline[-1], MultinomialNB)):
+                raise ValueError(f"基础模型不是特征哈希 + 流式 IDF + MultinomialNB 的增量模型: {base_model_path}")
+            logger.info(f"在已有模型基础上增量训练: {base_model_path}")
+        else:
+            pipeline = Pipeline(self.build_feature_steps('hashing') + [('classifier', MultinomialNB())])
+
+        return {
+            'pipeline': pipeline,
+            'data_path': os.path.abspath(self.data_path),
+            'chunk_size': chunk_size,
+            'chunks_done': 0,
+            'rows_seen': 0,
+            'X_test': [],
+            'y_test': [],
+            # 在已有模型上继续训练时，从模型携带的边界继续扩展
+            'fast_path_bounds': FastPathFilter.from_model(pipeline).bounds,
+        }
+
+    @staticmethod
+    def _save_checkpoint(state, checkpoint_path):
+        tmp_path = f"{checkpoint_path}.tmp"
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, checkpoint_path)
+        logger.info(f"💾 检查点已保存: 已完成 {state['chunks_done']} 块, {state['rows_seen']} 行")
+
+    def train_incremental(self, chunk_size=None, checkpoint_path=None, resume=False, base_model_path=None):
+        """
+        增量训练：按块流式读取数据集，通过 partial_fit 更新特征哈希 + 流式 IDF + MultinomialNB
+        内存占用只与块大小有关，可训练远大于内存的数据集；每处理若干块保存一次检查点
+        注意：IDF 随数据块逐步更新，早期数据块按当时的 IDF 计入模型，结果与全量训练近似但不完全相同
+        :param chunk_size: 每块行数，默认使用 INCREMENTAL_CHUNK_SIZE
+        :param checkpoint_path: 检查点路径，默认使用 INCREMENTAL_CHECKPOINT_PATH
+        :param resume: 是否从检查点继续（数据路径和块大小需一致）
+        :param base_model_path: 在已有增量模型基础上继续训练，用于合入新增标注数据
+        """
+        chunk_size = chunk_size or INCREMENTAL_CHUNK_SIZE
+        checkpoint_path = checkpoint_path or INCREMENTAL_CHECKPOINT_PATH
+
+        if resume and os.path.exists(checkpoint_path):
+            state = joblib.load(checkpoint_path)
+            if state['data_path'] != os.path.abspath(self.data_path) or state['chunk_size'] != chunk_size:
+                raise ValueError(
+                    f"检查点与当前任务不一致: {state['data_path']} (块大小 {state['chunk_size']}) "
+                    f"!= {os.path.abspath(self.data_path)} (块大小 {chunk_size})"
+                )
+            logger.info(f"♻️ 从检查点继续: 已完成 {state['chunks_done']} 块, {state['rows_seen']} 行")
+        else:
+            state = self._new_incremental_state(chunk_size, base_model_path)
+
+        pipeline = state['pipeline']
+        hashing, tfidf, classifier = pipeline[0], pipeline[1], pipeline[-1]
+        fast_path = FastPathFilter(state.get('fast_path_bounds'))
+        logger.info(f"开始增量训练: {self.data_path}, 每块 {chunk_size} 行")
+
+        try:
+            chunks = iter_dataset(self.data_path, chunk_size, columns=['text', 'is_sensitive'])
+            for chunk in islice(chunks, state['chunks_done'], None):
+                chunk = chunk.dropna(subset=['text', 'is_sensitive'])
+                texts = chunk['text'].astype(str).to_numpy()
+                labels = chunk['is_sensitive'].astype(int).to_numpy()
+
+                # 每块使用独立且确定的随机种子划分测试集，保证中断续训后划分不变
+                rng = np.random.default_rng(42 + state['chunks_done'])
+                test_mask = rng.random(len(texts)) < INCREMENTAL_TEST_SIZE
+                room = INCREMENTAL_EVAL_MAX_ROWS - len(state['X_test'])
+                test_mask[np.flatnonzero(test_mask)[max(room, 0):]] = False
+                state['X_test'].extend(texts[test_mask].tolist())
+                state['y_test'].extend(labels[test_mask].tolist())
+
+                train_mask = ~test_mask
+                fast_path.partial_fit(texts[train_mask], labels[train_mask])
+                state['fast_path_bounds'] = fast_path.bounds
+                if train_mask.any():
+                    # 块内去重，按权重更新 IDF 与分类器
+                    train_texts, train_labels, weights = dedup(texts[train_mask], labels[train_mask], self.dedup_mode)
+                    hashed = hashing.transform(train_texts)
+                    tfidf.partial_fit(hashed, sample_weight=weights)
+                    classifier.partial_fit(tfidf.transform(hashed), train_labels, classes=INCREMENTAL_CLASSES,
+                                           sample_weight=weights)
+
+                state['chunks_done'] += 1
+                state['rows_seen'] += len(texts)
+                logger.debug(f"第 {state['chunks_done']} 块完成，累计 {state['rows_seen']} 行")
+                if state['chunks_done'] % INCREMENTAL_CHECKPOINT_EVERY == 0:
+                    self._save_checkpoint(state, checkpoint_path)
+        except Exception as e:
+            logger.error(f"❌ 增量训练失败，可使用 resume 从最近的检查点继续: {e}")
+            raise
+
+        if state['rows_seen'] == 0:
+            raise ValueError(f"数据集为空: {self.data_path}")
+
+        self.pipeline = fast_path.attach(pipeline)
+        self.fast_path = fast_path
+        self.X_test = state['X_test']
+        self.y_test = state['y_test']
+        # 训练完成后检查点不再需要
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        logger.success(f"🎉 增量训练完成！共 {state['chunks_done']} 块, {state['rows_seen']} 行")
+
     def evaluate(self):
         """评估模型性能"""
         if not self.pipeline or self.X_test is None:
@@ -78,20 +385,141 @@ class ModelTrainer:
                                                  zero_division=0  # 可选：0, 1, 'warn'（默认行为）
                                                  ))
 
+        self.accuracy = acc
         return acc
 
-    def save_model(self):
-        """保存模型到文件系统"""
-        try:
-            # 保存带时间戳的版本
-            timestamped_path = get_timestamped_model_path()
-            joblib.dump(self.pipeline, timestamped_path)
-            logger.info(f"📁 模型已保存（历史版本）: {timestamped_path}")
+    def _measure_latency(self, sample_size=1000):
+        """在测试集样本上测量单条预测 p50 延迟（毫秒），支持时按预测服务的方式使用原生推理引擎"""
+        from src.model_search import measure_latency
+
+        if not len(self.X_test):
+            return None
+        model = self.pipeline
+        if supports_native_inference(model):
+            model = NBInferenceEngine.from_pipeline(model)
+        return measure_latency(model, list(self.X_test)[:sample_size])['latency_p50_ms']
+
+    def _model_config(self):
+        """训练配置，随模型记录到注册表"""
+        return {
+            'data_path': os.path.abspath(self.data_path),
+            'steps': [f'{name}:{type(step).__name__}' for name, step in self.pipeline.steps],
+            'feature_mode': FEATURE_MODE,
+            'tokenizer': TFIDF_TOKENIZER,
+            'tfidf_max_features': TFIDF_MAX_FEATURES,
+            'text_stats': TEXT_STATS_FEATURES,
+            **self._dedup_params(),
+            'sklearn': sklearn.__version__,
+        }
 
-            # 保存为最新版
-            joblib.dump(self.pipeline, LATEST_MODEL_PATH)
-            logger.success(f"✅ 模型已更新至最新版: {LATEST_MODEL_PATH}")
+    @staticmethod
+    def _strip_runtime_state(pipeline):
+        """
+        去掉 sklearn 向量化器 transform 时记录的 _stop_words_id（停用词对象的内存地址），
+        否则同一个模型每个进程序列化出的字节都不同，注册表无法按内容去重；缺失时 sklearn 会重新检查，不影响预测
+        """
+        for estimator in [pipeline, *pipeline.get_params().values()]:
+            if hasattr(estimator, '_stop_words_id'):
+                del estimator._stop_words_id
+
+    def save_model(self, registry=None, compress=False, prune_threshold=None, quantize=None):
+        """
+        把模型注册到模型注册表并发布为最新版
+        注册表按版本哈希保存模型文件（相同模型只存一份），同时记录准确率、延迟、大小、数据集哈希与训练配置；
+        紧凑格式（及 compress=True 时的压缩模型）作为同一版本的附属文件在发布前一并写入，
+        LATEST_MODEL_PATH 与各附属文件的 latest 路径以硬链接指向发布的版本，预测进程热加载不受影响
+        :param registry: ModelRegistry 实例，默认使用 REGISTRY_DIR 下的注册表
+        :param compress: 是否同时导出压缩模型，参数见 compress_model
+        :return: 模型版本哈希
+        """
+        try:
+            registry = registry or ModelRegistry()
+            latency = self._measure_latency() if self.X_test is not None else None
+            with tempfile.TemporaryDirectory(prefix='.artifacts-', dir=registry.root) as tmp_dir:
+                artifacts = {}
+                if self.export_compact_model(os.path.join(tmp_dir, 'model.cmodel')):
+                    artifacts['compact'] = os.path.join(tmp_dir, 'model.cmodel')
+                if compress and self.compress_model(os.path.join(tmp_dir, 'model.min.cmodel'),
+                                                    prune_threshold, quantize):
+                    artifacts['compressed'] = os.path.join(tmp_dir, 'model.min.cmodel')
+                self._strip_runtime_state(self.pipeline)
+                digest = registry.register(
+                    self.pipeline,
+                    accuracy=self.accuracy,
+                    latency_p50_ms=latency,
+                    dataset_hash=self.dataset_digest or dataset_digest(self.data_path),
+                    config=self._model_config(),
+                    artifacts=artifacts,
+                )
+            logger.success(f"✅ 模型已更新至最新版: {LATEST_MODEL_PATH} ({digest[:12]})")
+            return digest
 
         except Exception as e:
             logger.error(f"❌ 模型保存失败: {e}")
             raise
+
+    def export_compact_model(self, path):
+        """
+        导出面向推理的紧凑格式模型（可内存映射，加载更快）
+        发布到 latest 的紧凑格式模型由 save_model 作为注册表附属文件写入
+        :param path: 输出路径
+        :return: 输出文件路径，当前模型不支持时返回 None
+        """
+        if self.pipeline is None:
+            logger.warning("⚠️ 模型未训练，跳过紧凑格式导出")
+            return None
+        if not supports_compact_export(self.pipeline):
+            logger.warning(f"⚠️ 当前 Pipeline 不支持紧凑格式，跳过导出: {[name for name, _ in self.pipeline.steps]}")
+            return None
+
+        try:
+            return export_compact_model(self.pipeline, path)
+        except Exception as e:
+            logger.error(f"❌ 紧凑格式模型导出失败: {e}")
+            raise
+
+    def compress_model(self, path, prune_threshold=None, quantize=None):
+        """
+        训练后压缩：裁剪类别间对数概率差异可忽略的词项，量化剩余权重，导出为紧凑格式，
+        并在测试集上对比压缩前后的准确率
+        :param path: 输出路径
+        :param prune_threshold: 词项裁剪阈值，默认使用 COMPRESS_PRUNE_THRESHOLD
+        :param quantize: 量化方式（float16 / int8 / none），默认使用 COMPRESS_QUANTIZE
+        :return: 压缩报告 dict，无法压缩时返回 None
+        """
+        if self.pipeline is None or self.X_test is None:
+            logger.warning("⚠️ 模型未训练或测试集为空，跳过压缩")
+            return None
+        if not supports_compact_export(self.pipeline):
+            logger.warning(f"⚠️ 当前 Pipeline 不支持压缩导出，跳过: {[name for name, _ in self.pipeline.steps]}")
+            return None
+
+        prune_threshold = COMPRESS_PRUNE_THRESHOLD if prune_threshold is None else prune_threshold
+        quantize = quantize or COMPRESS_QUANTIZE
+        quantize = None if quantize == 'none' else quantize
+        try:
+            export_compact_model(self.pipeline, path, prune_threshold=prune_threshold, quantize=quantize)
+            compressed = CompactModel.load(path)
+        except Exception as e:
+            logger.error(f"❌ 模型压缩失败: {e}")
+            raise
+
+        X_test = list(self.X_test)
+        baseline = accuracy_score(self.y_test, self.pipeline.predict(X_test))
+        accuracy = accuracy_score(self.y_test, compressed.predict(X_test))
+        compression = compressed.header['compression']
+        report = {
+            'path': path,
+            'prune_threshold': prune_threshold,
+            'quantize': quantize,
+            'terms': len(compressed.term_hashes),
+            'pruned_terms': compression['pruned_terms'],
+            'size_bytes': os.path.getsize(path),
+            'accuracy': accuracy,
+            'baseline_accuracy': baseline,
+            'accuracy_delta': accuracy - baseline,
+        }
+        logger.info(f"🗜️ 模型压缩: 保留 {report['terms']} 个词项（裁剪 {report['pruned_terms']}），"
+                    f"量化 {quantize or 'float32'}，{report['size_bytes'] / 1024:.1f} KB")
+        logger.info(f"   准确率: {baseline:.4f} -> {accuracy:.4f} ({report['accuracy_delta']:+.4f})")
+        return report
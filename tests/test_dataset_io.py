@@ -0,0 +1,59 @@
+# tests/test_dataset_io.py
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src import dataset_io
+from src.dataset_io import DatasetWriter, read_dataset, write_shuffled
+
+
+def _chunks(n_chunks, chunk_rows):
+    for k in range(n_chunks):
+        start = k * chunk_rows
+        yield pd.DataFrame({'text': [f't{i}' for i in range(start, start + chunk_rows)],
+                            'is_sensitive': np.arange(start, start + chunk_rows) % 2})
+
+
+class WriteShuffledTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def test_bucket_count_is_capped(self):
+        path = os.path.join(self.workdir, 'out.csv')
+        opened = []
+        real_open = open
+
+        def tracking_open(file, mode='r', *args, **kwargs):
+            if str(file).endswith('.pkl') and 'w' in mode:
+                opened.append(file)
+            return real_open(file, mode, *args, **kwargs)
+
+        with mock.patch('builtins.open', tracking_open):
+            rows = write_shuffled(_chunks(10, 100), path, 5000, np.random.default_rng(0), max_buckets=8)
+
+        self.assertEqual(len(opened), 8)
+        df = read_dataset(path)
+        self.assertEqual(rows, 1000)
+        self.assertEqual(sorted(df['text']), sorted(f't{i}' for i in range(1000)))
+
+    def test_excel_writer_rejects_rows_over_sheet_limit(self):
+        path = os.path.join(self.workdir, 'out.xlsx')
+        with mock.patch.object(dataset_io, 'EXCEL_MAX_ROWS', 150):
+            with self.assertRaises(ValueError):
+                with DatasetWriter(path) as writer:
+                    for chunk in _chunks(2, 100):
+                        writer.write(chunk)
+        self.assertEqual(os.listdir(self.workdir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# tests/test_fast_path.py
+import unittest
+
+import numpy as np
+
+from src.fast_path import FastPathFilter, STAT_NAMES
+from src.rule_filter import RULE_AMBIGUOUS, RULE_NEGATIVE
+
+# 与训练数据同形的敏感样本：不含空白的弱密码与 Token
+POSITIVES = ['123456', 'huawei@123', 'P@ssw0rd', 'Hw2024!', 'sk-4f9c2a7e1b8d3f6a0c5e9b2d7a1f4c8e',
+             'abc123', '1q2w3e', '123!a1b2c3d4e5f6g7h8']
+NEGATIVES = ['今天天气真好', 'for i in range(10):', 'print("Hello, World!")']
+
+
+class FastPathFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.filter = FastPathFilter(margin=0.1).fit(POSITIVES + NEGATIVES,
+                                                      [1] * len(POSITIVES) + [0] * len(NEGATIVES))
+
+    def test_degenerate_range_has_no_bound(self):
+        # 敏感样本都不含空白，空白占比的范围退化为 [0, 0]，不能据此判定
+        self.assertEqual(self.filter.bounds['whitespace_ratio'], [0.0, 0.0])
+        index = STAT_NAMES.index('whitespace_ratio')
+        self.assertEqual(self.filter._low[index], -np.inf)
+        self.assertEqual(self.filter._high[index], np.inf)
+
+    def test_padded_positives_reach_model(self):
+        labels, reasons = self.filter.classify(['123456 ', '  huawei@123  ', '\tP@ssw0rd\n'])
+        self.assertTrue((labels == RULE_AMBIGUOUS).all(), reasons)
+
+    def test_key_value_positives_reach_model(self):
+        labels, reasons = self.filter.classify(['DB_PASSWORD = "P@ssw0rd123"', 'password: huawei@123',
+                                                '    api_key = "abc123"'])
+        self.assertTrue((labels == RULE_AMBIGUOUS).all(), reasons)
+
+    def test_fixed_rules(self):
+        labels, reasons = self.filter.classify(['', '   ', '...', '!? --'])
+        self.assertTrue((labels == RULE_NEGATIVE).all())
+        self.assertEqual(reasons, ['empty', 'empty', 'punctuation_only', 'punctuation_only'])
+
+    def test_round_trip_through_model_attribute(self):
+        class Model:
+            pass
+
+        restored = FastPathFilter.from_model(self.filter.attach(Model()))
+        self.assertEqual(restored.bounds, self.filter.bounds)
+        self.assertEqual(restored.margin, self.filter.margin)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_predictor.py
+import os
+import shutil
+import tempfile
+import unittest
+
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from src.fast_path import FastPathFilter
+from src.predictor import ModelPredictor
+
+TEXTS = ['123456', 'huawei@123', 'P@ssw0rd', '今天天气真好', 'for i in range(10):', 'print("Hello")']
+LABELS = [1, 1, 1, 0, 0, 0]
+
+
+def _build_model(alpha):
+    pipeline = Pipeline([
+        ('tfidf', TfidfVectorizer(analyzer='char', ngram_range=(1, 2))),
+        ('clf', MultinomialNB(alpha=alpha)),
+    ]).fit(TEXTS, LABELS)
+    return FastPathFilter().fit(TEXTS, LABELS).attach(pipeline)
+
+
+class ModelPredictorReloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.workdir, 'model.pkl')
+        joblib.dump(_build_model(1.0), self.model_path)
+        self.predictor = ModelPredictor(self.model_path, cache_size=16, use_rules=False, fast_path=True)
+
+    def tearDown(self):
+        self.predictor.close()
+        shutil.rmtree(self.workdir)
+
+    def test_reload_swaps_whole_snapshot(self):
+        _, before = self.predictor._prepare_texts('123456')
+        joblib.dump(_build_model(0.1), self.model_path)
+        self.assertTrue(self.predictor.reload())
+
+        _, after = self.predictor._prepare_texts('123456')
+        self.assertEqual(after.version, before.version + 1)
+        self.assertIsNot(after.pipeline, before.pipeline)
+        self.assertIsNot(after.fast_path, before.fast_path)
+        self.assertNotEqual(after.cache_token, before.cache_token)
+        # 进行中的调用持有的旧快照保持不变
+        self.assertNotAlmostEqual(before.pipeline.predict_proba(['123456'])[0, 1],
+                                  after.pipeline.predict_proba(['123456'])[0, 1])
+
+    def test_cached_results_follow_model_version(self):
+        first = self.predictor.predict_proba_only(['123456'])
+        joblib.dump(_build_model(0.1), self.model_path)
+        self.predictor.reload()
+        second = self.predictor.predict_proba_only(['123456'])
+        self.assertNotAlmostEqual(first[0, 1], second[0, 1])
+        self.assertEqual(self.predictor.cache_info()['hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
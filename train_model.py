@@ -1,18 +1,62 @@
 # -*- coding: utf-8 -*-
 # train_model.py
+import argparse
+
 from src.trainer import ModelTrainer
+from config import (
+    DATA_PATH, INCREMENTAL_CHUNK_SIZE, SEARCH_RECALL_TARGET, COMPRESS_PRUNE_THRESHOLD, COMPRESS_QUANTIZE
+)
 from loguru import logger
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="训练敏感信息分类模型")
+    parser.add_argument("-d", "--data", default=DATA_PATH,
+                        help="训练数据路径，格式由扩展名决定（.parquet/.arrow/.csv/.jsonl/.xlsx）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="增量训练：按块流式读取数据并 partial_fit（特征哈希 + 流式 IDF + 朴素贝叶斯）")
+    parser.add_argument("--chunk-size", type=int, default=INCREMENTAL_CHUNK_SIZE,
+                        help=f"增量训练每块行数（默认 {INCREMENTAL_CHUNK_SIZE}）")
+    parser.add_argument("--checkpoint", help="增量训练检查点路径")
+    parser.add_argument("--resume", action="store_true", help="从检查点继续增量训练")
+    parser.add_argument("--base-model", help="在已有增量模型基础上继续训练（合入新增标注数据）")
+    parser.add_argument("--search", choices=["grid", "halving"],
+                        help="训练前并行搜索向量化配置与分类器：grid 为网格搜索，halving 为逐次减半")
+    parser.add_argument("--recall-target", type=float, default=SEARCH_RECALL_TARGET,
+                        help=f"搜索时要求的敏感类召回率，选出达标模型中延迟最低者（默认 {SEARCH_RECALL_TARGET}）")
+    parser.add_argument("--dedup", choices=["off", "exact", "near"],
+                        help="训练集去重方式：off 不去重，exact 合并完全重复，near 再合并 MinHash 近似重复（默认见 config.TRAIN_DEDUP）")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="不使用特征缓存，重新读取数据并拟合向量化器")
+    parser.add_argument("--compress", action="store_true",
+                        help="训练后额外导出压缩模型（裁剪词项 + 量化），并报告测试集准确率变化")
+    parser.add_argument("--prune-threshold", type=float, default=COMPRESS_PRUNE_THRESHOLD,
+                        help=f"压缩时裁剪类别间对数概率差异小于该值的词项（默认 {COMPRESS_PRUNE_THRESHOLD}）")
+    parser.add_argument("--quantize", choices=["float16", "int8", "none"], default=COMPRESS_QUANTIZE,
+                        help=f"压缩时的量化方式（默认 {COMPRESS_QUANTIZE}）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     logger.add("logs/train_log_{time:YYYY-MM-DD}.log", rotation="1 day", level="INFO")
     logger.info("🔧 开始执行模型巡检任务...")
 
-    trainer = ModelTrainer()
+    trainer = ModelTrainer(data_path=args.data, use_cache=not args.no_cache, dedup_mode=args.dedup)
     try:
-        trainer.train()
+        if args.incremental:
+            trainer.train_incremental(
+                chunk_size=args.chunk_size,
+                checkpoint_path=args.checkpoint,
+                resume=args.resume,
+                base_model_path=args.base_model,
+            )
+        elif args.search:
+            trainer.train_with_search(mode=args.search, recall_target=args.recall_target)
+        else:
+            trainer.train()
         accuracy = trainer.evaluate()
-        trainer.save_model()
+        trainer.save_model(compress=args.compress, prune_threshold=args.prune_threshold, quantize=args.quantize)
         logger.success("✅ 模型巡检任务完成！")
         return accuracy
     except Exception as e: